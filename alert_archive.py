@@ -0,0 +1,285 @@
+"""Append-only red-alert archive.
+
+Every alert the poller ingests is appended to three column files under the
+archive directory, one fixed-width value per alert:
+
+- ``time.bin``: epoch seconds (``'q'``), non-decreasing
+- ``category.bin``: Oref category (``'h'``, -1 when missing)
+- ``location.bin``: location id (``'i'``), an index into ``locations.txt``
+
+The columns are loaded into ``array``s at startup. Because times only grow,
+a time range is two bisections, and each location keeps the row numbers of
+its alerts in order, so a per-city range is two bisections on that list.
+Per-day counts bisect the day boundaries instead of scanning the rows.
+
+Alerts older than the newest archived one are not appended, and neither are
+alerts at exactly that second for a (location, category) already archived,
+so re-ingesting the full history after a restart does not duplicate rows.
+
+Appends take an exclusive ``flock`` on the directory's ``.lock`` file and
+first read whatever another process appended since, so two writers on the
+same directory (a reloader, a second worker) neither duplicate rows nor hand
+out a location id twice. Without ``fcntl`` (Windows) one writer per
+directory is assumed.
+"""
+
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from alert_areas import area_parts, normalize_area
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+_COLUMNS = (("time", "q"), ("category", "h"), ("location", "i"))
+
+
+class AlertArchive:
+    """Columnar store of alert events (anything with ``time``, ``location`` and ``category``)."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._cols = {name: array(code) for name, code in _COLUMNS}
+        self._times = self._cols["time"]
+        self._names = []
+        self._names_size = 0  # bytes of locations.txt already read
+        self._ids = {}
+        self._parts = []  # normalized, for ?city= prefix matches
+        self._rows_by_location = {}  # location id -> array of row numbers
+        self._at_last = set()  # (location, category) archived at the newest time
+        with self._lock, self._file_lock():
+            self._load()
+
+    def _path(self, column: str) -> Path:
+        return self.directory / f"{column}.bin"
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the archive across processes, where ``fcntl`` exists."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _add_names(self, names):
+        for name in names:
+            self._ids[name] = len(self._names)
+            self._names.append(name)
+            self._parts.append(area_parts(name))
+
+    def _load(self):
+        """Read the rows and location names appended to the files since the last load.
+
+        Called with both locks held. An interrupted write can leave the columns at
+        different lengths: only their common prefix is kept, and the files are cut
+        back to it.
+        """
+        names_path = self.directory / "locations.txt"
+        size = names_path.stat().st_size if names_path.exists() else 0
+        if size > self._names_size:
+            with open(names_path, "rb") as f:
+                f.seek(self._names_size)
+                data = f.read()
+            data = data[:data.rfind(b"\n") + 1]  # a name being written has no newline yet
+            self._add_names(data.decode("utf-8").splitlines())
+            self._names_size += len(data)
+
+        n = len(self._times)
+        tails = {}
+        for name, code in _COLUMNS:
+            col = array(code)
+            path = self._path(name)
+            if path.exists():
+                with open(path, "rb") as f:
+                    f.seek(n * col.itemsize)
+                    data = f.read()
+                col.frombytes(data[:len(data) - len(data) % col.itemsize])
+            tails[name] = col
+        m = min(len(c) for c in tails.values())
+        for name, col in tails.items():
+            path = self._path(name)
+            if path.exists() and path.stat().st_size != (n + m) * col.itemsize:
+                os.truncate(path, (n + m) * col.itemsize)
+            del col[m:]
+            self._cols[name].extend(col)
+        if not m:
+            return
+        for row, loc in enumerate(tails["location"], n):
+            self._rows_by_location.setdefault(loc, array("I")).append(row)
+        self._at_last = set()
+        for row in range(len(self._times) - 1, -1, -1):
+            if self._times[row] != self._times[-1]:
+                break
+            self._at_last.add((self._names[self._cols["location"][row]], self._cols["category"][row]))
+
+    def _refresh(self):
+        """Pick up rows another process appended (``self._lock`` held)."""
+        path = self._path("time")
+        if path.exists() and path.stat().st_size != len(self._times) * self._times.itemsize:
+            with self._file_lock():
+                self._load()
+
+    def append(self, events) -> int:
+        """Archive ``events`` (oldest first); returns how many were new."""
+        with self._lock, self._file_lock():
+            self._load()
+            last = self._times[-1] if self._times else None
+            rows = {name: array(code) for name, code in _COLUMNS}
+            new_names = []
+            for e in events:
+                t = int(e.time.timestamp())
+                category = e.category if isinstance(e.category, int) and -1 <= e.category < 2 ** 15 else -1
+                key = (e.location, category)
+                if last is not None and (t < last or (t == last and key in self._at_last)):
+                    continue
+                if t != last:
+                    last, self._at_last = t, set()
+                self._at_last.add(key)
+                loc = self._ids.get(e.location)
+                if loc is None:
+                    loc = len(self._names)
+                    self._add_names([e.location])
+                    new_names.append(e.location)
+                rows["time"].append(t)
+                rows["category"].append(category)
+                rows["location"].append(loc)
+            if not rows["time"]:
+                return 0
+            if new_names:
+                data = "".join(n.replace("\n", " ") + "\n" for n in new_names).encode("utf-8")
+                with open(self.directory / "locations.txt", "ab") as f:
+                    f.write(data)
+                self._names_size += len(data)
+            for name, _ in _COLUMNS:
+                with open(self._path(name), "ab") as f:
+                    f.write(rows[name].tobytes())
+            first = len(self._times)
+            for name, _ in _COLUMNS:
+                self._cols[name].extend(rows[name])
+            for k, loc in enumerate(rows["location"]):
+                self._rows_by_location.setdefault(loc, array("I")).append(first + k)
+            return len(rows["time"])
+
+    def _range(self, start: float, end: float) -> tuple[int, int]:
+        return bisect_left(self._times, start), bisect_left(self._times, end)
+
+    def _location_ids(self, city: str) -> list[int]:
+        """Ids of archived locations with a part starting with ``city`` (normalized)."""
+        key = normalize_area(city)
+        return [i for i, parts in enumerate(self._parts) if any(p.startswith(key) for p in parts)]
+
+    def _rows(self, start: float, end: float, city: str | None):
+        """Row numbers in [start, end), oldest first, optionally only for ``city``."""
+        lo, hi = self._range(start, end)
+        if not city:
+            return range(lo, hi)
+        out = []
+        for loc in self._location_ids(city):
+            rows = self._rows_by_location.get(loc, ())
+            a = bisect_left(rows, lo)
+            out.extend(rows[a:bisect_left(rows, hi, a)])
+        out.sort()
+        return out
+
+    def history(self, start: datetime, end: datetime, city: str | None = None, limit: int = 500) -> dict:
+        """Alerts in [start, end), newest first, at most ``limit``."""
+        with self._lock:
+            self._refresh()
+            rows = self._rows(start.timestamp(), end.timestamp(), city)
+            times, cats, locs = self._times, self._cols["category"], self._cols["location"]
+            zones = {}  # UTC day (or hour, on DST change days) -> fixed offset; converting with one is much faster
+
+            def offset(t):
+                return timezone(datetime.fromtimestamp(t, start.tzinfo).utcoffset())
+
+            def local(t):
+                day = t // 86400
+                zone = zones.get(day)
+                if zone is None:
+                    first, last = offset(day * 86400), offset(day * 86400 + 86399)
+                    zone = zones[day] = first if first == last else False
+                if zone is False:
+                    zone = zones.get(("h", t // 3600)) or zones.setdefault(("h", t // 3600), offset(t))
+                return datetime.fromtimestamp(t, zone).isoformat()
+
+            events = [{
+                "time": local(times[r]),
+                "location": self._names[locs[r]],
+                "category": cats[r] if cats[r] >= 0 else None,
+            } for r in reversed(rows[-limit:])] if limit > 0 else []
+        return {"count": len(rows), "events": events, "truncated": len(rows) > len(events)}
+
+    def stats(self, start: datetime, end: datetime, city: str | None = None, top: int = 50) -> dict:
+        """Alert counts per local day (in ``start``'s timezone) and per location over [start, end).
+
+        The range is clamped to the archived span first, so the day walk is bounded by the data
+        rather than by the request. Only the snapshot is taken under the lock: rows below the
+        snapshot length never change, so counting runs without blocking ``append``.
+        """
+        tzinfo = start.tzinfo
+        with self._lock:
+            self._refresh()
+            n = len(self._times)
+            if n:
+                first, last = self._times[0], self._times[-1]
+                ids = self._location_ids(city) if city else list(self._rows_by_location)
+                locations = [(self._names[loc], self._rows_by_location[loc]) for loc in ids
+                             if loc in self._rows_by_location]
+        empty = {"total": 0, "per_day": {}, "per_city": [], "cities": 0}
+        if not n:
+            return empty
+        start = max(start, datetime.fromtimestamp(first, tzinfo))
+        end = min(end, datetime.fromtimestamp(last + 1, tzinfo))
+        if start >= end:
+            return empty
+        times = self._times
+        lo = bisect_left(times, start.timestamp(), 0, n)
+        hi = bisect_left(times, end.timestamp(), lo, n)
+
+        per_city = []
+        city_rows = []
+        for name, rows in locations:
+            a = bisect_left(rows, lo)
+            b = bisect_left(rows, hi, a)
+            if b > a:
+                per_city.append((b - a, name))
+                if city:
+                    city_rows.extend(rows[a:b])
+        if city:
+            city_rows.sort()
+            times = [times[r] for r in city_rows]
+            lo, hi = 0, len(times)
+
+        per_day = {}
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            nxt = day + timedelta(days=1)  # aware arithmetic is wall-clock: midnight across DST changes
+            a = bisect_left(times, max(day, start).timestamp(), lo, hi)
+            b = bisect_left(times, min(nxt, end).timestamp(), a, hi)
+            if b > a:
+                per_day[day.date().isoformat()] = b - a
+            day = nxt
+        per_city.sort(key=lambda c: (-c[0], c[1]))
+        return {
+            "total": hi - lo,
+            "per_day": per_day,
+            "per_city": [{"city": name, "count": n} for n, name in per_city[:top]],
+            "cities": len(per_city),
+        }
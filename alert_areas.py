@@ -0,0 +1,260 @@
+"""Oref alert areas: Hebrew name normalisation, an area-name index and
+per-screen subscriptions.
+
+Area names are compared after ``normalize_area``: niqqud and cantillation
+are removed, final letters map to their regular forms, geresh/gershayim and
+dashes count as spaces and whitespace is collapsed, so "תל-אביב" and
+"תֵּל אָבִיב" reach the same key. Oref names often list several localities
+("שדרות, איבים, ניר עם"); each comma-separated part is matched on its own.
+
+A subscription is a set of normalised prefixes per screen. Matching a
+location walks the prefixes of its parts through a prefix -> screens map,
+so the cost depends on the length of the name, not on how many screens or
+subscriptions exist; results are memoised per location name.
+"""
+
+import bisect
+import re
+import threading
+
+_MARKS_RE = re.compile("[\u0591-\u05c7]")  # cantillation and niqqud (maqaf handled below)
+_FINALS = str.maketrans({"ך": "כ", "ם": "מ", "ן": "נ", "ף": "פ", "ץ": "צ"})
+_PUNCT = str.maketrans({
+    "\u05be": "-", "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-",  # maqaf, dashes
+    "\u05f3": "'", "\u2019": "'", "`": "'",  # geresh
+    "\u05f4": '"', "\u201c": '"', "\u201d": '"',  # gershayim
+})
+_SPACE_RE = re.compile(r"\s+")
+_ZONE_RE = re.compile(r"\s+[-\u05be\u2010-\u2014]\s+")  # "city - zone"
+
+# Areas known before any alert has been seen; names from the live feed are added as they arrive
+AREAS = (
+    "אבשלום",
+    "אופקים",
+    "אילת",
+    "ארז",
+    "אשדוד - א,ב,ד,ה",
+    "אשדוד - ג,ו,ז",
+    "אשדוד - ח,ט,י,יג,יד,טז",
+    "אשדוד - יא,יב,טו,יז,מרינה,סיטי",
+    "אשקלון - דרום",
+    "אשקלון - צפון",
+    "באר שבע - דרום",
+    "באר שבע - מזרח",
+    "באר שבע - מערב",
+    "באר שבע - צפון",
+    "בארי",
+    "בית שאן",
+    "בית שמש",
+    "בני ברק",
+    "בת ים",
+    "גבעתיים",
+    "גן יבנה",
+    "דימונה",
+    "דקל",
+    "הוד השרון",
+    "הרצליה - מערב",
+    "הרצליה - מרכז וגליל ים",
+    "זיקים",
+    "חדרה - מזרח",
+    "חדרה - מערב",
+    "חולון",
+    "חולית",
+    "חיפה - כרמל ועיר תחתית",
+    "חיפה - מערב",
+    "חיפה - מפרץ",
+    "חיפה - נווה שאנן ורמות כרמל",
+    "טבריה",
+    "יבנה",
+    "יד מרדכי",
+    "ירוחם",
+    "ירושלים - אזור תעשייה עטרות",
+    "ירושלים - דרום",
+    "ירושלים - מזרח",
+    "ירושלים - מערב",
+    "ירושלים - מרכז",
+    "ירושלים - צפון",
+    "יתד",
+    "כיסופים",
+    "כפר מימון",
+    "כפר סבא",
+    "כפר עזה",
+    "כרם שלום",
+    "כרמיאל",
+    "כרמיה",
+    "לוד",
+    "מבשרת ציון",
+    "מגדל העמק",
+    "מגן",
+    "מודיעין מכבים רעות",
+    "מטולה",
+    "מעלות תרשיחא",
+    "מצפה רמון",
+    "נהריה",
+    "נחל עוז",
+    "ניר יצחק",
+    "ניר עוז",
+    "נס ציונה",
+    "נצרת",
+    "נתיב העשרה",
+    "נתיבות",
+    "נתניה - מזרח",
+    "נתניה - מערב",
+    "סופה",
+    "סעד",
+    "עין השלושה",
+    "עכו",
+    "עלומים",
+    "עפולה",
+    "ערד",
+    "פתח תקווה",
+    "צפת - עיר",
+    "קריית אתא",
+    "קריית ביאליק",
+    "קריית גת, כרמי גת",
+    "קריית ים",
+    "קריית מוצקין",
+    "קריית מלאכי",
+    "קריית שמונה",
+    "ראש העין",
+    "ראש פינה",
+    "ראשון לציון - מזרח",
+    "ראשון לציון - מערב",
+    "רחובות",
+    "רמלה",
+    "רמת גן - מזרח",
+    "רמת גן - מערב",
+    "רעים",
+    "רעננה",
+    "שדרות, איבים, ניר עם",
+    "שובה",
+    "שלומי",
+    "שער הנגב",
+    "תל אביב - דרום העיר ויפו",
+    "תל אביב - מזרח",
+    "תל אביב - מרכז העיר",
+    "תל אביב - עבר הירקון",
+    "תקומה",
+)
+
+
+def normalize_area(name: str) -> str:
+    """Comparison key for an area name (see module docstring)."""
+    text = _MARKS_RE.sub("", name.translate(_PUNCT)).translate(_FINALS).lower()
+    text = text.replace("-", " ")
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def area_parts(name: str) -> list[str]:
+    """Normalised keys a name can be matched by: the whole name and each locality it lists.
+
+    Only a list of localities is split ("שדרות, איבים, ניר עם"), never the
+    sub-zone list after " - " ("אשדוד - א,ב,ד,ה"), and only into parts of at
+    least two words or three letters, so single-letter zone codes are never
+    keys of their own.
+    """
+    key = normalize_area(name)
+    head = _ZONE_RE.split(name, maxsplit=1)[0]
+    parts = [normalize_area(p) for p in head.split(",")] if "," in head else []
+    return list(dict.fromkeys([key] + [p for p in parts if " " in p or len(p) >= 3]))
+
+
+class AreaIndex:
+    """Sorted index of area names for prefix lookups (autocomplete, subscription checks)."""
+
+    def __init__(self, names=()):
+        self._display = {}  # normalised part -> set of display names
+        self._keys = []  # sorted normalised parts
+        self._lock = threading.Lock()
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> bool:
+        """Index ``name``; returns False if it was already known."""
+        with self._lock:
+            added = False
+            for part in area_parts(name):
+                names = self._display.get(part)
+                if names is None:
+                    names = self._display[part] = set()
+                    bisect.insort(self._keys, part)
+                if name not in names:
+                    names.add(name)
+                    added = True
+            return added
+
+    def search(self, prefix: str, limit: int = 20) -> list[str]:
+        """Display names with a part starting with ``prefix`` (normalised), alphabetically."""
+        key = normalize_area(prefix)
+        out = set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i].startswith(key) and len(out) < limit * 4:
+                out |= self._display[self._keys[i]]
+                i += 1
+        return sorted(out)[:limit]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+
+class Subscriptions:
+    """Which screens care about which areas."""
+
+    def __init__(self):
+        self._by_screen = {}  # screen -> list of area specs as given
+        self._by_prefix = {}  # normalised prefix -> set of screens
+        self._memo = {}  # location -> frozenset of screens
+        self._lock = threading.Lock()
+
+    def set(self, screen: str, areas: list[str]):
+        with self._lock:
+            self._by_screen[screen] = list(dict.fromkeys(a.strip() for a in areas if a and a.strip()))
+            self._rebuild_locked()
+
+    def remove(self, screen: str):
+        with self._lock:
+            if self._by_screen.pop(screen, None) is not None:
+                self._rebuild_locked()
+
+    def areas(self, screen: str) -> list[str] | None:
+        with self._lock:
+            return self._by_screen.get(screen)
+
+    def all(self) -> dict:
+        with self._lock:
+            return {s: list(a) for s, a in self._by_screen.items()}
+
+    def _rebuild_locked(self):
+        by_prefix = {}
+        for screen, areas in self._by_screen.items():
+            for area in areas:
+                by_prefix.setdefault(normalize_area(area), set()).add(screen)
+        self._by_prefix = by_prefix
+        self._memo = {}
+
+    def screens_for(self, location: str) -> frozenset:
+        """Screens subscribed to ``location`` (some part of it starts with one of their prefixes)."""
+        with self._lock:
+            hit = self._memo.get(location)
+            if hit is not None:
+                return hit
+            screens = set()
+            if self._by_prefix:
+                for part in area_parts(location):
+                    for end in range(1, len(part) + 1):
+                        subs = self._by_prefix.get(part[:end])
+                        if subs:
+                            screens |= subs
+            hit = self._memo[location] = frozenset(screens)
+            return hit
+
+    def wants(self, screen: str | None, location: str) -> bool:
+        """Whether ``screen`` should see ``location``; screens without a subscription see everything."""
+        if not screen:
+            return True
+        with self._lock:
+            if screen not in self._by_screen:
+                return True
+        return screen in self.screens_for(location)
@@ -1,24 +1,41 @@
 import os
 import json
+import atexit
+import base64
 import threading
+import time
 from datetime import datetime, timedelta, timezone
-import email.utils as eut
 from dotenv import load_dotenv
 
-from flask import Flask, jsonify, render_template, send_from_directory, request, redirect, url_for
+from flask import Flask, Response, g, jsonify, render_template, send_from_directory, request, redirect, url_for
 from pathlib import Path
-
+from urllib.parse import quote_plus
+
+from records import FAR_FUTURE, CalendarEvent, EmailMessage
+from hebrew_calendar import format_hebrew
+from zmanim_calc import date_range, zmanim_for_date, zmanim_for_dates
+from luach import Luach, parsha_name, shabbat_at
+from locations import City, check_coordinates, city_by_name, grid_cell, nearest_city
+from rollover import RolloverScheduler, next_midnight, next_sunset, sunset
+from weather_data import Forecast
+from payloads import ShapingJSONProvider
+from timeseries import TrendStore
+from news import HeadlineDeduper, HeadlineIndex, NewsStore, fetch_feeds
+from upstream import ConditionalGet, conditional_get
+from redalert import ACTIVE_SECONDS, AlertFeed, AlertPoller
+from alert_areas import AREAS, AreaIndex, Subscriptions
+from alert_archive import AlertArchive
+from metrics import CONTENT_TYPE, Registry, timed_execute, timed_get
+from mailstore import BoundedLRU, SearchIndex, SyncState, extract_body
 # Load environment variables from .env file
 load_dotenv()
 
 # Optional imports guarded for environments without deps installed yet
 try:
     import requests
-    import feedparser  # type: ignore
     from dateutil import tz
 except Exception:  # pragma: no cover
     requests = None
-    feedparser = None
     tz = None
 
 try:
@@ -39,6 +56,8 @@ CLIENT_SECRET_GLOB = "client_secret_"  # prefix to locate the installed-app OAut
 TOKENS_DIR = Path(os.path.dirname(__file__)) / "tokens"
 os.makedirs(TOKENS_DIR, exist_ok=True)
 CONFIG_PATH = Path(os.path.dirname(__file__)) / "config.json"
+DATA_DIR = Path(os.path.dirname(__file__)) / "data"
+os.makedirs(DATA_DIR, exist_ok=True)
 
 # Environment-based OAuth credentials (no fallback hardcoded credentials)
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
@@ -52,6 +71,30 @@ _user_credentials_lock = threading.Lock()
 # Jerusalem lat/lon
 DEFAULT_LAT = 31.7683
 DEFAULT_LON = 35.2137
+DEFAULT_CITY = nearest_city(DEFAULT_LAT, DEFAULT_LON)[0]
+
+# Longest span /api/zmanim/range computes in one call
+ZMANIM_RANGE_MAX_DAYS = 366
+# Computed /api/zmanim/range payloads, bounded by their total number of days
+ZMANIM_RANGE_CACHE_DAYS = 8 * 366
+# /api/zmanim?date= is accepted this many days either side of today
+ZMANIM_DATE_MAX_DAYS = 10 * 366
+# Computed /api/zmanim results for dates other than today
+ZMANIM_DATE_CACHE_SIZE = 2048
+
+# Days of holidays, parsha and candle/havdalah times precomputed ahead of today
+LUACH_WINDOW_DAYS = 2 * 366
+
+# Weather and air quality are cached per grid cell of about this size, so
+# nearby screens share one upstream fetch (0 keys on the raw coordinates)
+GEO_GRID_KM = float(os.environ.get("GEO_GRID_KM", "2"))
+WEATHER_BATCH_MAX = 50
+
+# Weather/AQI samples kept per location for /api/weather/trend (two per hour: one weather, one AQI)
+TREND_SAMPLES = int(os.environ.get("TREND_SAMPLES", str(2 * 24 * 21)))
+TREND_MAX_HOURS = 24 * 21
+# Grid cells with a trend file on disk; the least recently written is dropped beyond this
+TREND_MAX_LOCATIONS = int(os.environ.get("TREND_MAX_LOCATIONS", "256"))
 
 # Scopes for Gmail (readonly) and Calendar (readonly)
 SCOPES = [
@@ -62,22 +105,69 @@ SCOPES = [
 ]
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
+app.json = ShapingJSONProvider(app)  # ?fields= and ?compact=1 on every /api/ response
 _token_lock = threading.Lock()
 _account_cache = {}
 _account_emails = []
 _config_lock = threading.Lock()
 
+# Request, upstream and cache metrics, served at /metrics
+_metrics = Registry()
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        # Label by route pattern, not path, so /api/email/<id> is one series
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        _metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+
+def _http_get(url, **kwargs):
+    """``requests.get`` with latency, status and bytes recorded per host."""
+    return timed_get(_metrics, requests.get, url, **kwargs)
+
+
+def _google_execute(req):
+    """``req.execute()`` for Gmail/Calendar requests, recorded per API host like ``_http_get``."""
+    return timed_execute(_metrics, req)
+
+
 # Simple in-memory cache: key -> (expires_ts, value)
 _cache = {}
 
 
+# Precomputed next-period values: key -> (starts_ts, expires_ts, value)
+_cache_staged = {}
+
+
 def cache_get(key):
     try:
+        now = datetime.now(timezone.utc).timestamp()
         exp, val = _cache.get(key, (0, None))
-        if exp and exp > datetime.now(timezone.utc).timestamp():
+        if exp and exp > now:
+            _metrics.cache_lookup(key, True)
             return val
+        staged = _cache_staged.get(key)
+        if staged and staged[0] <= now < staged[1]:
+            # The boundary has passed; the precomputed value becomes current
+            _cache[key] = (staged[1], staged[2])
+            _cache_staged.pop(key, None)
+            _metrics.cache_lookup(key, True)
+            return staged[2]
+        if exp:
+            _metrics.cache_expiry(key)  # counted as a miss below
+            _cache.pop(key, None)
     except Exception:
         pass
+    _metrics.cache_lookup(key, False)
     return None
 
 
@@ -88,11 +178,43 @@ def cache_set(key, val, ttl_seconds: int):
         pass
 
 
+def cache_set_until(key, val, expires_at: datetime):
+    """Cache ``val`` until an absolute moment (a day boundary) instead of for a TTL."""
+    try:
+        _cache[key] = (expires_at.timestamp(), val)
+    except Exception:
+        pass
+
+
+def cache_stage(key, val, starts_at: datetime, expires_at: datetime):
+    """Hold ``val`` back until ``starts_at``, when it replaces the current entry for ``key``."""
+    try:
+        _cache_staged[key] = (starts_at.timestamp(), expires_at.timestamp(), val)
+    except Exception:
+        pass
+
+
+# Decoded email bodies, bounded by total characters held
+EMAIL_BODY_LIMIT = 4000
+EMAIL_PAGE_SIZE = 20
+_email_bodies = BoundedLRU(max_size=500 * EMAIL_BODY_LIMIT)
+_email_messages = BoundedLRU(max_size=2000)
+_email_prefetch_lock = threading.Lock()
+_gmail_services = threading.local()
+_mail_sync = SyncState()
+_email_index = SearchIndex(DATA_DIR / "email_index.json", max_docs=5000)
+atexit.register(_email_index.maybe_save, True)
+_zmanim_ranges = BoundedLRU(max_size=ZMANIM_RANGE_CACHE_DAYS)
+_zmanim_dates = BoundedLRU(max_size=ZMANIM_DATE_CACHE_SIZE)
+_trends = TrendStore(DATA_DIR / "trends", TREND_SAMPLES, max_files=TREND_MAX_LOCATIONS)
+atexit.register(_trends.flush)
+
+
 def cache_invalidate(prefix: str):
     try:
         for k in list(_cache.keys()):
-            if k.startswith(prefix):
-                _cache.pop(k, None)
+            if k.startswith(prefix) and _cache.pop(k, None) is not None:
+                _metrics.cache_evicted(k)
     except Exception:
         pass
 
@@ -232,7 +354,7 @@ def _list_accounts(force_refresh: bool = False) -> list[str]:
     for creds in _load_all_credentials():
         try:
             gmail = build("gmail", "v1", credentials=creds, cache_discovery=False)
-            profile = gmail.users().getProfile(userId="me").execute()
+            profile = _google_execute(gmail.users().getProfile(userId="me"))
             email = profile.get("emailAddress")
             if email:
                 email = email.lower()
@@ -418,6 +540,7 @@ def api_status():
         "accounts": _list_accounts(force_refresh=True),
         "labels": {"personal": cfg.get("personal"), "business": cfg.get("business")},
         "hebrew_date_language": cfg.get("hebrew_date_language", "english"),
+        "upstreams": _upstreams.stats(),
         "credentials": {
             "source": cred_source,
             "client_id": oauth_config.get("client_id"),
@@ -427,57 +550,139 @@ def api_status():
     })
 
 
-def _gmail_fetch_latest(creds, n=20):
-    if build is None:
-        return []
-    try:
-        service = build("gmail", "v1", credentials=creds, cache_discovery=False)
-        # Determine account email once
-        try:
-            profile = service.users().getProfile(userId="me").execute()
-            acct_email = (profile.get("emailAddress") or "").lower()
-        except Exception:
-            acct_email = None
-        # List messages in inbox
-        res = service.users().messages().list(userId="me", labelIds=["INBOX"], maxResults=n).execute()
-        messages = res.get("messages", [])
-        items = []
-        for m in messages:
-            msg = service.users().messages().get(userId="me", id=m["id"], format="metadata", metadataHeaders=["From", "Subject", "Date"]).execute()
-            headers = {h["name"].lower(): h["value"] for h in msg.get("payload", {}).get("headers", [])}
-            subject = headers.get("subject", "(no subject)")
-            from_ = headers.get("from", "")
-            date_hdr = headers.get("date")
+@app.route("/metrics")
+def metrics():
+    """Prometheus metrics: request latency per route, upstream calls per host, cache hits per key prefix."""
+    # Counted elsewhere; copied in at scrape time
+    for name, lru in (("email_bodies", _email_bodies), ("email_messages", _email_messages), ("news_query", _news_queries),
+                      ("zmanim_range", _zmanim_ranges), ("zmanim_date", _zmanim_dates)):
+        _metrics.cache.set(name, "hit", value=lru.hits)
+        _metrics.cache.set(name, "miss", value=lru.misses)
+        _metrics.cache_evictions.set(name, value=lru.evictions)
+    for name, stats in _upstreams.stats().items():
+        _metrics.upstream_not_modified.set(name, value=stats["not_modified"])
+        _metrics.upstream_bytes_saved.set(name, value=stats["bytes_saved"])
+    return Response(_metrics.render(), content_type=CONTENT_TYPE)
+
+
+def _account_type(acct_email: str | None) -> str:
+    """Determine account type based on email address."""
+    cfg = _load_config()
+    if acct_email and acct_email.lower() == cfg.get("business", "").lower():
+        return "Business"
+    return "Personal"
+
+
+def _gmail_fetch_metadata(service, msg_id: str, acct_email: str | None, account_type: str) -> EmailMessage:
+    msg = _google_execute(service.users().messages().get(userId="me", id=msg_id, format="metadata", metadataHeaders=["From", "Subject", "Date"]))
+    return EmailMessage.from_gmail(msg, acct_email, account_type)
+
+
+def _gmail_fetch_messages(service, ids: list, acct_email: str, account_type: str) -> list[EmailMessage]:
+    """Return records for ``ids``, fetching metadata only for messages not already stored locally."""
+    items = []
+    fresh = []
+    for msg_id in ids:
+        rec = _email_messages.get(msg_id)
+        if rec is None:
             try:
-                dt = eut.parsedate_to_datetime(date_hdr) if date_hdr else None
-            except Exception:
-                dt = None
-            
-            # Determine account type based on email address
-            account_type = "Personal"
-            cfg = _load_config()
-            if acct_email and acct_email.lower() == cfg.get("business", "").lower():
-                account_type = "Business"
-            
-            items.append({
-                "from": from_,
-                "subject": subject,
-                "received": (dt.isoformat() if dt else date_hdr),
-                "id": m["id"],
-                "account": acct_email,
-                "account_type": account_type,
-            })
-        return items
-    except HttpError:
-        return []
+                rec = _gmail_fetch_metadata(service, msg_id, acct_email, account_type)
+            except HttpError:
+                continue
+            _email_messages.put(msg_id, rec)
+            fresh.append(rec)
+        items.append(rec)
+    _email_index.add(fresh)
+    return items
+
+
+def _gmail_list_page(account: str, service, page_token: str, size: int = EMAIL_PAGE_SIZE) -> tuple[list, str | None]:
+    """One page of inbox message ids plus Gmail's next pageToken, cached per page."""
+    cache_key = f"emails:{account}:page:{page_token}:{size}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+    res = _google_execute(service.users().messages().list(
+        userId="me", labelIds=["INBOX"], maxResults=size, pageToken=page_token or None
+    ))
+    page = ([m["id"] for m in res.get("messages", [])], res.get("nextPageToken"))
+    cache_set(cache_key, page, 15 * 60)
+    return page
+
+
+def _encode_email_cursor(positions: dict) -> str:
+    raw = json.dumps(positions, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_email_cursor(cursor: str) -> dict:
+    """Positions encoded by ``_encode_email_cursor``; ValueError unless each is None or [token, offset]."""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    positions = json.loads(raw)
+    if not isinstance(positions, dict):
+        raise ValueError("cursor must encode an object")
+    for acct, pos in positions.items():
+        if pos is None:
+            continue
+        if (not isinstance(pos, list) or len(pos) != 2 or not isinstance(pos[0], str)
+                or type(pos[1]) is not int or pos[1] < 0):
+            raise ValueError(f"invalid cursor position for {acct}")
+    return positions
+
+
+def _email_page(accounts: list, positions: dict | None, limit: int) -> tuple[list[EmailMessage], dict]:
+    """Merge each account's inbox stream newest-first, starting from ``positions``.
+
+    A position is ``[pageToken, offset]`` into an account's Gmail listing, or
+    ``None`` once that account is exhausted. Later Gmail pages are only listed
+    when the merge actually reaches them.
+    """
+    positions = dict(positions) if positions else {a: ["", 0] for a in accounts}
+    buffers = {}  # account -> records of the page at its current position
+
+    def _head(acct):
+        while positions.get(acct) is not None:
+            token, offset = positions[acct]
+            if acct not in buffers:
+                creds = _get_creds_for_email(acct)
+                if not creds:
+                    positions[acct] = None
+                    return None
+                service = _gmail_service(acct, creds)
+                ids, next_token = _gmail_list_page(acct, service, token)
+                buffers[acct] = (_gmail_fetch_messages(service, ids, acct, _account_type(acct)), next_token)
+            records, next_token = buffers[acct]
+            if offset < len(records):
+                return records[offset]
+            buffers.pop(acct)
+            positions[acct] = [next_token, 0] if next_token else None
+        return None
+
+    out = []
+    while len(out) < limit:
+        best = None
+        for acct in accounts:
+            try:
+                rec = _head(acct)
+            except HttpError:
+                positions[acct] = None
+                continue
+            if rec is not None and (best is None or rec.sort_ts > best[1].sort_ts):
+                best = (acct, rec)
+        if best is None:
+            break
+        acct, rec = best
+        positions[acct][1] += 1
+        out.append(rec)
+    return out, positions
 
 
-def _calendar_fetch_events(creds, start_dt: datetime, end_dt: datetime, max_results=20):
+def _calendar_fetch_events(creds, start_dt: datetime, end_dt: datetime, max_results=20) -> list[CalendarEvent]:
     if build is None:
         return []
     try:
         service = build("calendar", "v3", credentials=creds, cache_discovery=False)
-        events_result = (
+        events_result = _google_execute(
             service.events()
             .list(
                 calendarId="primary",
@@ -487,9 +692,9 @@ def _calendar_fetch_events(creds, start_dt: datetime, end_dt: datetime, max_resu
                 orderBy="startTime",
                 maxResults=max_results,
             )
-            .execute()
         )
-        return events_result.get("items", [])
+        local_tz = _get_local_tz()
+        return [CalendarEvent.from_google(ev, local_tz) for ev in events_result.get("items", [])]
     except HttpError:
         return []
 
@@ -498,59 +703,146 @@ def _combine_calendars(start_dt: datetime, end_dt: datetime):
     events = []
     for creds in _load_all_credentials():
         events.extend(_calendar_fetch_events(creds, start_dt, end_dt))
-    # sort by start
-    def _parse_start(ev):
-        when = ev.get("start", {}).get("dateTime") or ev.get("start", {}).get("date")
-        try:
-            if len(when) > 10:
-                return datetime.fromisoformat(when.replace("Z", "+00:00"))
-            return datetime.fromisoformat(when).replace(tzinfo=_get_local_tz())
-        except Exception:
-            return datetime.max.replace(tzinfo=timezone.utc)
-
-    events.sort(key=_parse_start)
+    events.sort(key=lambda ev: ev.start)
     return events
 
 
 @app.route("/api/emails")
 def api_emails():
+    """Latest inbox messages. With ``cursor``/``limit`` returns a page and a ``next_cursor``."""
     account = request.args.get("account")
-    items = []
-    if account:
-        cache_key = f"emails:{account}"
-        cached = cache_get(cache_key)
-        if cached is not None:
-            return jsonify(cached)
-        creds = _get_creds_for_email(account)
-        if creds:
-            items.extend(_gmail_fetch_latest(creds, 20))
-        # sort below and return
-        # cache after sorting
-        # fallthrough
-    else:
-        cache_key = "emails:combined"
-        cached = cache_get(cache_key)
-        if cached is not None:
-            return jsonify(cached)
-        for creds in _load_all_credentials():
-            items.extend(_gmail_fetch_latest(creds, 20))
-    # Keep top 20 overall by received date if available
-    def _key(it):
-        d = it.get("received")
-        try:
-            return datetime.fromisoformat(d)
-        except Exception:
-            try:
-                return eut.parsedate_to_datetime(d)
-            except Exception:
-                return datetime.min
-
-    items.sort(key=_key, reverse=True)
-    result = items[:20]
+    cursor = request.args.get("cursor")
+    paged = cursor is not None or "limit" in request.args
+    try:
+        limit = max(1, min(int(request.args.get("limit", EMAIL_PAGE_SIZE)), 100))
+        positions = _decode_email_cursor(cursor) if cursor else None
+    except Exception:
+        return jsonify({"error": "invalid cursor or limit"}), 400
+    scope = account.lower() if account else "combined"
+    cache_key = f"emails:{scope}" if not paged else f"emails:{scope}:cursor:{cursor or ''}:{limit}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return jsonify(cached)
+    if build is None:
+        return jsonify([] if not paged else {"items": [], "next_cursor": None})
+    accounts = [scope] if account else _list_accounts()
+    if positions is not None:
+        if any(a not in accounts for a in positions):
+            return jsonify({"error": "invalid cursor or limit"}), 400
+        accounts = [a for a in accounts if a in positions]
+    items, positions = _email_page(accounts, positions, limit)
+    result = [it.as_dict() for it in items]
+    if paged:
+        more = any(p is not None for p in positions.values())
+        result = {"items": result, "next_cursor": _encode_email_cursor(positions) if more else None}
     cache_set(cache_key, result, 15 * 60)
+    _start_email_prefetch(items)
     return jsonify(result)
 
 
+def _gmail_label_counts(service) -> dict:
+    inbox = _google_execute(service.users().labels().get(userId="me", id="INBOX"))
+    unread = _google_execute(service.users().labels().get(userId="me", id="UNREAD"))
+    return {
+        "inbox_total": inbox.get("messagesTotal", 0),
+        "inbox_unread": inbox.get("messagesUnread", 0),
+        "unread_total": unread.get("messagesTotal", 0),
+    }
+
+
+def _index_new_messages(account: str, service):
+    """Fetch metadata for messages the history feed reported; this also adds them to the search index."""
+    # At most 50 per sync; the rest stay queued for the next one
+    _gmail_fetch_messages(service, _mail_sync.take_new_ids(account, limit=50), account, _account_type(account))
+
+
+def _gmail_sync_counts(account: str, creds) -> dict:
+    """Return label counters for ``account``, re-reading them only when its history moved."""
+    service = _gmail_service(account, creds)
+    st = _mail_sync.get(account)
+    if st.history_id:
+        try:
+            res = _google_execute(service.users().history().list(
+                userId="me", startHistoryId=st.history_id, labelId="INBOX",
+                historyTypes=["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"],
+            ))
+        except HttpError:
+            # History cursor expired (404) - fall back to a full resync below
+            res = None
+        if res is not None:
+            history = res.get("history") or []
+            if not history:
+                _mail_sync.advance(account, res.get("historyId"))
+                return st.counts
+            added = [
+                a["message"]["id"]
+                for h in history
+                for a in h.get("messagesAdded", [])
+                if "INBOX" in a.get("message", {}).get("labelIds", [])
+            ]
+            counts = _gmail_label_counts(service)
+            _mail_sync.advance(account, res.get("historyId"), counts, added)
+            _index_new_messages(account, service)
+            # The inbox changed: let the next list request refetch
+            cache_invalidate(f"emails:{account}")
+            cache_invalidate("emails:combined")
+            return counts
+    profile = _google_execute(service.users().getProfile(userId="me"))
+    counts = _gmail_label_counts(service)
+    _mail_sync.advance(account, profile.get("historyId"), counts)
+    return counts
+
+
+@app.route("/api/emails/counts")
+def api_email_counts():
+    """Unread/inbox counters per account for badges; cheap enough to poll every few seconds."""
+    # One cache entry per mailbox however the address is capitalised
+    account = (request.args.get("account") or "").lower()
+    cache_key = f"email_counts:{account or 'combined'}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return jsonify(cached)
+    accounts = [account] if account else _list_accounts()
+    rows = []
+    for acct in accounts:
+        creds = _get_creds_for_email(acct)
+        if not creds or build is None:
+            continue
+        try:
+            counts = _gmail_sync_counts(acct, creds)
+        except Exception as e:
+            print(f"Email counts error for {acct}: {e}")
+            continue
+        rows.append({
+            "account": acct,
+            "account_type": _account_type(acct),
+            "history_id": _mail_sync.get(acct).history_id,
+            **counts,
+        })
+    payload = {
+        "accounts": rows,
+        "inbox_unread": sum(r.get("inbox_unread", 0) for r in rows),
+        "unread_total": sum(r.get("unread_total", 0) for r in rows),
+        # Changes whenever any mailbox moves; clients refetch the list on change
+        "version": "|".join(f"{r['account']}:{r['history_id']}" for r in rows),
+    }
+    cache_set(cache_key, payload, 5)
+    return jsonify(payload)
+
+
+@app.route("/api/emails/search")
+def api_email_search():
+    """Search subject/from/snippet of every message synced so far, without calling Gmail."""
+    q = (request.args.get("q") or "").strip()
+    account = request.args.get("account")
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), 100))
+    except ValueError:
+        limit = 20
+    results = _email_index.search(q, account=account, limit=limit) if q else []
+    return jsonify({"query": q, "count": len(results), "results": results})
+
+
 @app.route("/api/calendar")
 def api_calendar():
     now = datetime.now(_get_local_tz())
@@ -571,18 +863,9 @@ def api_calendar():
         today_events = _combine_calendars(today_start, today_end)
         tomorrow_events = _combine_calendars(today_end, tomorrow_end)
 
-    def simplify(ev):
-        start = ev.get("start", {})
-        end = ev.get("end", {})
-        title = ev.get("summary", "(no title)")
-        location = ev.get("location", "")
-        start_str = start.get("dateTime") or start.get("date")
-        end_str = end.get("dateTime") or end.get("date")
-        return {"title": title, "location": location, "start": start_str, "end": end_str}
-
     payload = {
-        "today": [simplify(e) for e in today_events],
-        "tomorrow": [simplify(e) for e in tomorrow_events],
+        "today": [e.as_dict() for e in today_events],
+        "tomorrow": [e.as_dict() for e in tomorrow_events],
     }
     cache_set(cache_key, payload, 15 * 60)
     return jsonify(payload)
@@ -612,15 +895,6 @@ def api_calendar_week():
     else:
         events = _combine_calendars(week_start, week_end)
 
-    def simplify(ev):
-        start = ev.get("start", {})
-        end = ev.get("end", {})
-        title = ev.get("summary", "(no title)")
-        location = ev.get("location", "")
-        start_str = start.get("dateTime") or start.get("date")
-        end_str = end.get("dateTime") or end.get("date")
-        return {"title": title, "location": location, "start": start_str, "end": end_str}
-
     # Bucket events per local day
     buckets = {}
     for i in range(7):
@@ -629,40 +903,16 @@ def api_calendar_week():
         buckets[key] = {"date": key, "label": d.strftime("%a %d"), "events": []}
 
     for ev in events:
-        s = ev.get("start", {})
-        when = s.get("dateTime") or s.get("date")
-        try:
-            if when and "T" in when:
-                dt = datetime.fromisoformat(when.replace("Z", "+00:00"))
-                dt_local = dt.astimezone(_get_local_tz())
-            elif when:
-                # All-day event
-                dt_local = datetime.fromisoformat(when).replace(tzinfo=_get_local_tz())
-            else:
-                continue
-            key = dt_local.strftime("%Y-%m-%d")
-            if key in buckets:
-                buckets[key]["events"].append(simplify(ev))
-        except Exception:
-            continue
-
-    # Sort events within each day by start
-    def sort_key(item):
-        s = item.get("start")
-        try:
-            if s and "T" in s:
-                return datetime.fromisoformat(s.replace("Z", "+00:00"))
-            elif s:
-                return datetime.fromisoformat(s)
-        except Exception:
-            return datetime.max
-        return datetime.max
+        if ev.day_key in buckets:
+            buckets[ev.day_key]["events"].append(ev)
 
     days = []
     for i in range(7):
         d = (week_start + timedelta(days=i)).strftime("%Y-%m-%d")
         day = buckets[d]
-        day["events"].sort(key=sort_key)
+        # Sort events within each day by start
+        day["events"].sort(key=lambda ev: ev.start)
+        day["events"] = [ev.as_dict() for ev in day["events"]]
         days.append(day)
 
     payload = {
@@ -690,22 +940,12 @@ def api_next_meeting():
         events = _combine_calendars(now, end)
     next_ev = None
     for ev in events:
-        start = ev.get("start", {})
-        when = start.get("dateTime") or start.get("date")
-        if not when:
-            continue
-        try:
-            dt = datetime.fromisoformat(when.replace("Z", "+00:00")) if "T" in when else datetime.fromisoformat(when)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=_get_local_tz())
-        except Exception:
-            continue
-        if dt > now:
-            next_ev = {"title": ev.get("summary", "(no title)"), "start": dt.isoformat()}
+        if ev.start is not FAR_FUTURE and ev.start > now:
+            next_ev = ev
             break
     if not next_ev:
         return jsonify({"title": None, "countdown": None, "start_time": None})
-    dt = datetime.fromisoformat(next_ev["start"])
+    dt = next_ev.start
     delta = dt - now
     days = delta.days
     hours, rem = divmod(delta.seconds, 3600)
@@ -715,7 +955,7 @@ def api_next_meeting():
     local_start_time = dt.strftime("%a %b %d, %H:%M")
     
     payload = {
-        "title": next_ev["title"],
+        "title": next_ev.title,
         "in": f"{days}d {hours}h {mins}m" if days else f"{hours}h {mins}m",
         "start_time": local_start_time,
     }
@@ -723,429 +963,778 @@ def api_next_meeting():
     return jsonify(payload)
 
 
-@app.route("/api/weather")
-def api_weather():
-    lat = float(request.args.get("lat", DEFAULT_LAT))
-    lon = float(request.args.get("lon", DEFAULT_LON))
-    cache_key = f"weather:{lat:.3f},{lon:.3f}"
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return jsonify(cached)
-    if requests is None:
-        return jsonify({})
+OPEN_METEO_URL = (
+    "https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}"
+    "&current=temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m,pressure_msl"
+    "&daily=weather_code,temperature_2m_max,temperature_2m_min,sunrise,sunset,uv_index_max,precipitation_sum,wind_speed_10m_max"
+    "&hourly=temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m,precipitation"
+    "&timezone=auto&forecast_days=7"
+)
+
+
+def _cell_key(cell: tuple[float, float]) -> str:
+    return f"{cell[0]:.4f},{cell[1]:.4f}"
+
+
+def _weather_key(cell: tuple[float, float]) -> str:
+    return f"weather:{_cell_key(cell)}"
+
+
+def _forecasts(cells: list) -> dict:
+    """Cached forecast per grid cell; every missing cell is fetched in a single open-meteo call.
+
+    The parsed forecast is cached, not a sliced payload, so the hourly window
+    keeps moving with the clock between upstream fetches. Cells that could not
+    be fetched are absent from the result.
+    """
+    out = {}
+    missing = []
+    for cell in dict.fromkeys(cells):
+        forecast = cache_get(_weather_key(cell))
+        if forecast is not None:
+            out[cell] = forecast
+        else:
+            missing.append(cell)
+    if not missing or requests is None:
+        return out
+    # Open-Meteo: no API key required; comma-separated coordinates return a list
+    url = OPEN_METEO_URL.format(
+        lat=",".join(str(c[0]) for c in missing),
+        lon=",".join(str(c[1]) for c in missing),
+    )
     try:
-        # Open-Meteo: no API key required
-        # Enhanced request with more detailed weather data
-        url = (
-            "https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}"
-            "&current=temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m,pressure_msl"
-            "&daily=weather_code,temperature_2m_max,temperature_2m_min,sunrise,sunset,uv_index_max,precipitation_sum,wind_speed_10m_max"
-            "&hourly=temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m,precipitation"
-            "&timezone=auto&forecast_days=7"
-        ).format(lat=lat, lon=lon)
-        r = requests.get(url, timeout=8)
+        r = _http_get(url, timeout=8 + len(missing) // 10)
         r.raise_for_status()
         data = r.json()
-        current = data.get("current", {})
-        daily = data.get("daily", {})
-        hourly = data.get("hourly", {})
-        
-        # Process current weather
-        current_weather = {
-            "temp": current.get("temperature_2m"),
-            "feels_like": current.get("apparent_temperature"),
-            "humidity": current.get("relative_humidity_2m"),
-            "code": current.get("weather_code"),
-            "wind_speed": current.get("wind_speed_10m"),
-            "wind_direction": current.get("wind_direction_10m"),
-            "pressure": current.get("pressure_msl"),
-        }
-        
-        # Process today's weather
-        today_weather = None
-        if daily and daily.get("time") and len(daily["time"]) >= 1:
-            today_weather = {
-                "max": daily.get("temperature_2m_max", [None])[0],
-                "min": daily.get("temperature_2m_min", [None])[0],
-                "sunrise": daily.get("sunrise", [None])[0],
-                "sunset": daily.get("sunset", [None])[0],
-                "uv_index": daily.get("uv_index_max", [None])[0],
-                "precipitation": daily.get("precipitation_sum", [None])[0],
-                "wind_speed_max": daily.get("wind_speed_10m_max", [None])[0],
-                "code": daily.get("weather_code", [None])[0],
-            }
-        
-        # Process 7-day forecast
-        forecast = []
-        if daily and daily.get("time"):
-            for i in range(min(7, len(daily["time"]))):
-                day_data = {
-                    "date": daily["time"][i],
-                    "max": daily.get("temperature_2m_max", [None]*7)[i],
-                    "min": daily.get("temperature_2m_min", [None]*7)[i],
-                    "code": daily.get("weather_code", [None]*7)[i],
-                    "precipitation": daily.get("precipitation_sum", [None]*7)[i],
-                    "wind_speed_max": daily.get("wind_speed_10m_max", [None]*7)[i],
-                }
-                forecast.append(day_data)
-        
-        # Process hourly forecast for next 24 hours
-        hourly_forecast = []
-        if hourly and hourly.get("time"):
-            # Get current time index
-            now = datetime.now(timezone.utc)
-            current_hour_index = 0
-            
-            # Find the closest hour
-            for i, time_str in enumerate(hourly["time"][:25]):  # Check up to 25 hours
-                try:
-                    hour_time = datetime.fromisoformat(time_str.replace("Z", "+00:00"))
-                    if hour_time >= now:
-                        current_hour_index = i
-                        break
-                except Exception:
-                    continue
-            
-            # Get next 24 hours of data
-            for i in range(current_hour_index, min(current_hour_index + 24, len(hourly["time"]))):
-                hour_data = {
-                    "time": hourly["time"][i],
-                    "temp": hourly.get("temperature_2m", [None]*len(hourly["time"]))[i],
-                    "feels_like": hourly.get("apparent_temperature", [None]*len(hourly["time"]))[i],
-                    "humidity": hourly.get("relative_humidity_2m", [None]*len(hourly["time"]))[i],
-                    "code": hourly.get("weather_code", [None]*len(hourly["time"]))[i],
-                    "wind_speed": hourly.get("wind_speed_10m", [None]*len(hourly["time"]))[i],
-                    "precipitation": hourly.get("precipitation", [None]*len(hourly["time"]))[i],
-                }
-                hourly_forecast.append(hour_data)
-        
-        payload = {
-            "current": current_weather,
-            "today": today_weather,
-            "forecast": forecast,
-            "hourly": hourly_forecast,
-        }
-        cache_set(cache_key, payload, 3600)
-        return jsonify(payload)
     except Exception as e:
         print(f"Weather API error: {e}")
+        return out
+    if isinstance(data, dict):
+        data = [data]
+    for cell, item in zip(missing, data):
+        forecast = Forecast.from_open_meteo(item)
+        cache_set(_weather_key(cell), forecast, 3600)
+        _trends.record(_cell_key(cell), forecast.current)
+        out[cell] = forecast
+    return out
+
+
+def _request_coords() -> tuple[float, float]:
+    """``?lat=&lon=`` (the default location when absent); ValueError unless finite and in range."""
+    return check_coordinates(request.args.get("lat", DEFAULT_LAT), request.args.get("lon", DEFAULT_LON))
+
+
+def _weather_args():
+    """``(columnar, hours)`` from the query string; raises ValueError on a bad ``hours``."""
+    columnar = request.args.get("format") == "columnar"
+    hours = max(1, min(int(request.args.get("hours", 48 if columnar else 24)), 168))
+    return columnar, hours
+
+
+@app.route("/api/weather")
+def api_weather():
+    """Current conditions and forecast; ``?format=columnar`` returns the open-meteo arrays as-is."""
+    try:
+        lat, lon = _request_coords()
+        columnar, hours = _weather_args()
+    except ValueError:
+        return jsonify({"error": "lat/lon must be valid coordinates and hours an integer"}), 400
+    cell = grid_cell(lat, lon, GEO_GRID_KM)
+    forecast = _forecasts([cell]).get(cell)
+    if forecast is None:
         return jsonify({})
 
+    now = datetime.now(timezone.utc)
+    if columnar:
+        return jsonify(forecast.columnar(now, hours))
+    return jsonify(forecast.payload(now, hours))
+
+
+@app.route("/api/weather/batch", methods=["GET", "POST"])
+def api_weather_batch():
+    """Forecasts for many screens at once.
+
+    Locations come as ``?locations=lat,lon;lat,lon`` or a JSON body
+    ``{"locations": [[lat, lon], ...]}``. Results are in request order, each
+    tagged with the grid cell it was served from; a location whose fetch
+    failed gets ``null``.
+    """
+    try:
+        if request.method == "POST":
+            points = [check_coordinates(p[0], p[1]) for p in (request.get_json(force=True) or {})["locations"]]
+        else:
+            raw = request.args.get("locations", "")
+            points = [check_coordinates(*p.split(",", 1)) for p in raw.split(";") if p.strip()]
+        columnar, hours = _weather_args()
+    except Exception:
+        return jsonify({"error": "locations must be lat,lon pairs and hours an integer"}), 400
+    if not points or len(points) > WEATHER_BATCH_MAX:
+        return jsonify({"error": f"between 1 and {WEATHER_BATCH_MAX} locations"}), 400
+
+    cells = [grid_cell(lat, lon, GEO_GRID_KM) for lat, lon in points]
+    forecasts = _forecasts(cells)
+    now = datetime.now(timezone.utc)
+    results = []
+    for cell in cells:
+        forecast = forecasts.get(cell)
+        if forecast is None:
+            results.append(None)
+            continue
+        payload = forecast.columnar(now, hours) if columnar else forecast.payload(now, hours)
+        results.append({"cell": {"latitude": cell[0], "longitude": cell[1]}, **payload})
+    return jsonify(results)
+
+
+@app.route("/api/weather/trend")
+def api_weather_trend():
+    """Min/max/delta of the locally recorded weather and AQI samples over the last ``hours``."""
+    try:
+        lat, lon = _request_coords()
+        hours = max(1, min(int(request.args.get("hours", 24)), TREND_MAX_HOURS))
+    except ValueError:
+        return jsonify({"error": "lat/lon must be valid coordinates and hours an integer"}), 400
+    cell = grid_cell(lat, lon, GEO_GRID_KM)
+    summary = _trends.summary(_cell_key(cell), hours)
+    return jsonify({"cell": {"latitude": cell[0], "longitude": cell[1]}, **summary})
+
+
+GOOGLE_NEWS_URL = "https://news.google.com/rss?hl=en-IL&gl=IL&ceid=IL:en"
+GOOGLE_NEWS_SEARCH_URL = "https://news.google.com/rss/search?q={q}&hl=en-IL&gl=IL&ceid=IL:en"
+# Comma-separated RSS/Atom feeds merged into /api/news
+NEWS_FEEDS = [u.strip() for u in os.environ.get("NEWS_FEEDS", GOOGLE_NEWS_URL).split(",") if u.strip()]
+NEWS_REFRESH_SECONDS = 15 * 60
+NEWS_RETRY_SECONDS = 60  # after a refresh that got nothing
+NEWS_TIMEOUT = 8
+NEWS_PAGE_SIZE = 20
+# ?q= is answered from the local headline index when it has at least this many hits
+NEWS_MIN_LOCAL_HITS = 5
+_news = NewsStore(max_items=200)
+_news_index = HeadlineIndex(retention=3 * 86400, max_docs=5000)
+# Upstream search results for ?q= misses: query -> (expires_ts, headlines), LRU-capped
+_news_queries = BoundedLRU(max_size=128)
+_news_lock = threading.Lock()
+_news_next_refresh = 0.0  # time.time() of the next refresh attempt, successful or not
+# ETag/Last-Modified per polled URL (news feeds, red-alert history) and bytes saved by 304s
+_upstreams = ConditionalGet(max_urls=256)
+
+
+def _refresh_news():
+    """Fetch the feeds into the store; runs on its own thread, holding ``_news_lock``."""
+    global _news_next_refresh
+    try:
+        started = time.perf_counter()
+        try:
+            items = fetch_feeds(_http_get, NEWS_FEEDS, timeout=NEWS_TIMEOUT, conditional=_upstreams)
+        except Exception as e:
+            print(f"News refresh failed: {e}")
+            items = []
+        _news_next_refresh = time.time() + (NEWS_REFRESH_SECONDS if items else NEWS_RETRY_SECONDS)
+        if items or not len(_news):
+            _news.merge(items)
+        _news_index.add(items)
+        print(f"News: {len(items)} entries from {len(NEWS_FEEDS)} feeds, {len(_news)} held, "
+              f"{(time.perf_counter() - started) * 1e3:.0f} ms")
+    finally:
+        _news_lock.release()
+
+
+def _start_news_refresh():
+    """Refresh the merged feed in the background when it is due.
+
+    Requests never wait for it: they are answered from what the store holds.
+    The next attempt is scheduled whatever the outcome, so while the feeds are
+    down they are retried every NEWS_RETRY_SECONDS rather than on every request.
+    """
+    if requests is None or time.time() < _news_next_refresh:
+        return
+    # Only one refresh at a time
+    if not _news_lock.acquire(blocking=False):
+        return
+    if time.time() < _news_next_refresh:
+        _news_lock.release()
+        return
+    threading.Thread(target=_refresh_news, name="news-refresh", daemon=True).start()
+
 
 @app.route("/api/news")
 def api_news():
-    # Google News RSS for Israel (English) or search feed via ?q=term
-    if feedparser is None:
+    """Merged headlines from NEWS_FEEDS; ``?q=term`` searches every headline seen recently."""
+    if requests is None:
         return jsonify([])
     q = request.args.get("q")
-    cache_key = f"news:{q or 'israel'}"
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return jsonify(cached)
-    if q:
-        feed_url = f"https://news.google.com/rss/search?q={q}&hl=en-IL&gl=IL&ceid=IL:en"
-    else:
-        feed_url = "https://news.google.com/rss?hl=en-IL&gl=IL&ceid=IL:en"
+    _start_news_refresh()
+    if not q:
+        return jsonify([h.as_dict() for h in _news.latest(NEWS_PAGE_SIZE)])
+
+    # Local index first; a Google News search only when it has too few hits
+    hits = _news_index.search(q, NEWS_PAGE_SIZE)
+    if len(hits) < NEWS_MIN_LOCAL_HITS:
+        key = " ".join(q.lower().split())
+        cached = _news_queries.get(key)
+        if cached is not None and cached[0] > time.time():
+            remote = cached[1]
+        else:
+            url = GOOGLE_NEWS_SEARCH_URL.format(q=quote_plus(q))
+            remote = fetch_feeds(_http_get, [url], timeout=NEWS_TIMEOUT, conditional=_upstreams)
+            _news_index.add(remote)
+            ttl = NEWS_REFRESH_SECONDS if remote else NEWS_RETRY_SECONDS
+            _news_queries.put(key, (time.time() + ttl, remote))
+        hits = sorted(hits + remote, key=lambda h: h.ts, reverse=True)
+    dedup = HeadlineDeduper()
+    return jsonify([h.as_dict() for h in hits if dedup.add(h)][:NEWS_PAGE_SIZE])
+
+
+RED_ALERT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Referer': 'https://www.oref.org.il/',
+    'Accept': 'application/json, text/plain, */*'
+}
+
+
+RED_ALERT_POLL_SECONDS = float(os.environ.get("RED_ALERT_POLL_SECONDS", "2"))
+_alerts = AlertFeed(_get_tz_jerusalem(), capacity=4096)
+
+
+def _fetch_red_alerts():
+    """``(history text, modified)``; an unchanged history (304) is not downloaded again."""
+    return conditional_get(_http_get, os.environ["RED_ALERT_HISTORY_URL"], _upstreams,
+                           lambda r: r.content.decode("utf-8-sig", errors="replace"),
+                           name="red_alert", headers=RED_ALERT_HEADERS, timeout=min(10, 2 + RED_ALERT_POLL_SECONDS))
+
+
+# Area names for autocomplete (bundled list plus every location seen in the feed) and which
+# screens want which areas, persisted in config.json as {"alert_subscriptions": {screen: [areas]}}
+_alert_areas = AreaIndex(AREAS)
+_alert_subscriptions = Subscriptions()
+for _screen, _areas in (_load_config().get("alert_subscriptions") or {}).items():
+    _alert_subscriptions.set(_screen, _areas)
+
+
+# Every ingested alert, kept on disk for /api/red-alert/history and /api/red-alert/stats
+_alert_archive = AlertArchive(DATA_DIR / "alerts")
+
+
+def _on_alert_events(events):
+    for e in events:
+        _alert_areas.add(e.location)
     try:
-        d = feedparser.parse(feed_url)
-        items = []
-        for e in d.entries[:20]:  # Increased to 20 for better content
-            # Extract source from title if available (Google News format: "Title - Source")
-            title = e.get("title", "")
-            source = None
-            if " - " in title:
-                parts = title.rsplit(" - ", 1)
-                if len(parts) == 2:
-                    title = parts[0]
-                    source = parts[1]
-            
-            # Clean summary - remove HTML tags and limit length
-            raw_summary = e.get("summary", "")
-            clean_summary = None
-            if raw_summary:
-                # Remove HTML tags
-                import re
-                clean_summary = re.sub(r'<[^>]+>', '', raw_summary).strip()
-                # Limit length
-                if len(clean_summary) > 200:
-                    clean_summary = clean_summary[:200] + "..."
-                # Don't include if it's just empty or whitespace
-                if not clean_summary or clean_summary.isspace():
-                    clean_summary = None
-            
-            items.append({
-                "title": title,
-                "link": e.get("link"),
-                "published": e.get("published"),
-                "source": source,
-                "summary": clean_summary,
-            })
-        cache_set(cache_key, items, 15 * 60)  # Reduced cache time to 15 minutes
-        return jsonify(items)
-    except Exception:
-        return jsonify([])
+        _alert_archive.append(events)
+    except Exception as e:
+        print(f"Alert archive append failed: {e}")
+
+
+_alert_poller = AlertPoller(_fetch_red_alerts, _alerts, RED_ALERT_POLL_SECONDS, on_events=_on_alert_events)
+
+
+def _screen_filter():
+    """``match(location)`` for the ``screen`` query parameter, or None when every alert is wanted."""
+    screen = request.args.get("screen", "").strip()
+    if not screen or _alert_subscriptions.areas(screen) is None:
+        return None
+    return lambda location: _alert_subscriptions.wants(screen, location)
 
 
 @app.route("/api/alerts")
 def api_alerts():
-    # Latest Red Alert data
-    if requests is None:
-        return jsonify([])
-    url = os.environ.get("RED_ALERT_HISTORY_URL")
-    if not url:
+    # Latest Red Alert, as last seen by the poller
+    if requests is None or not os.environ.get("RED_ALERT_HISTORY_URL"):
         return jsonify([])
-    cached = cache_get("alerts_latest")
-    if cached is not None:
-        return jsonify(cached)
+    e = _alerts.latest(_screen_filter())
+    if e is None:
+        return jsonify({})
+    return jsonify({"title": e.title, "location": e.location, "when": e.raw_time, "text": e.location})
+
+
+@app.route("/api/red-alert/since")
+def api_red_alert_since():
+    """Alerts ingested after ``cursor`` (an event id); without one, just the current cursor.
+
+    With ``screen``, only alerts for that screen's subscribed areas are returned; the
+    cursor still advances past the ones filtered out.
+    """
     try:
-        r = requests.get(url, timeout=6, headers={"User-Agent": "DailyDashboard/1.0"})
-        r.raise_for_status()
-        data = r.json()
-        # Try a few common shapes, keep it robust
-        items = []
-        if isinstance(data, dict):
-            seq = data.get("data") or data.get("alerts") or data.get("items") or []
-        elif isinstance(data, list):
-            seq = data
-        else:
-            seq = []
-        # pick the last item only
-        latest = None
-        if seq:
-            e = seq[-1]
-            # Attempt to grab useful fields
-            title = e.get("title") if isinstance(e, dict) else None
-            where = (e.get("data") or e.get("location") or e.get("city")).__str__() if isinstance(e, dict) else None
-            when = e.get("alertDate") if isinstance(e, dict) else None
-            text = None
-            if isinstance(e, dict):
-                text = e.get("data") or e.get("title") or e.get("description")
-                if isinstance(text, list):
-                    text = ", ".join(str(x) for x in text)
-            latest = {"title": title, "location": where, "when": when, "text": text}
-        cache_set("alerts_latest", latest or {}, 30)
-        return jsonify(latest or {})
-    except Exception:
+        cursor = int(request.args.get("cursor", -1))
+        limit = max(1, min(int(request.args.get("limit", 500)), 4096))
+    except ValueError:
+        return jsonify({"error": "cursor and limit must be integers"}), 400
+    if cursor < 0:
+        return jsonify({"cursor": _alerts.cursor, "events": [], "reset": False})
+    events, reset = _alerts.since(cursor, limit)
+    match = _screen_filter()
+    return jsonify({
+        "cursor": events[-1].id if events else _alerts.cursor,
+        "events": [e.as_dict() for e in events if match is None or match(e.location)],
+        "reset": reset,
+        "last_poll": _alerts.last_poll.isoformat() if _alerts.last_poll else None,
+    })
+
+
+def _alert_range(default_days: int):
+    """``from``/``to`` query parameters as aware datetimes (Israel time when no offset is given).
+
+    A bare date for ``to`` includes that whole day. Defaults to the last ``default_days`` days.
+    """
+    israel_tz = _get_tz_jerusalem()
+
+    def parse(name, date_end=False):
+        value = request.args.get(name, "").strip()
+        if not value:
+            return None
+        t = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if date_end and len(value) == 10:
+            t += timedelta(days=1)
+        return t.replace(tzinfo=israel_tz) if t.tzinfo is None else t.astimezone(israel_tz)
+
+    end = parse("to", date_end=True) or datetime.now(israel_tz)
+    start = parse("from") or end - timedelta(days=default_days)
+    return start, end
+
+
+@app.route("/api/red-alert/history")
+def api_red_alert_history():
+    """Archived alerts between ``from`` and ``to`` (default: the last day), newest first, optionally for one ``city``."""
+    try:
+        start, end = _alert_range(1)
+        limit = max(0, min(int(request.args.get("limit", 500)), 5000))
+    except (ValueError, OverflowError):
+        return jsonify({"error": "from/to must be ISO dates and limit an integer"}), 400
+    city = request.args.get("city", "").strip() or None
+    result = _alert_archive.history(start, end, city, limit)
+    return jsonify({"from": start.isoformat(), "to": end.isoformat(), "city": city, **result})
+
+
+@app.route("/api/red-alert/stats")
+def api_red_alert_stats():
+    """Archived alert counts per day and per city between ``from`` and ``to`` (default: the last 30 days)."""
+    try:
+        start, end = _alert_range(30)
+        top = max(1, min(int(request.args.get("top", 50)), 1000))
+    except (ValueError, OverflowError):
+        return jsonify({"error": "from/to must be ISO dates and top an integer"}), 400
+    city = request.args.get("city", "").strip() or None
+    result = _alert_archive.stats(start, end, city, top)
+    return jsonify({"from": start.isoformat(), "to": end.isoformat(), "city": city, **result})
+
+
+@app.route("/api/red-alert/areas")
+def api_red_alert_areas():
+    """Area names starting with ``q`` (niqqud, final letters and dashes ignored), for picking subscriptions."""
+    q = request.args.get("q", "").strip()
+    if not q:
         return jsonify([])
+    return jsonify(_alert_areas.search(q, limit=20))
+
+
+@app.route("/api/red-alert/subscriptions", methods=["GET", "POST", "DELETE"])
+def api_red_alert_subscriptions():
+    """Areas a screen shows alerts for. Screens without a subscription show every alert."""
+    screen = (request.args.get("screen") or "").strip()
+    if request.method == "GET":
+        if not screen:
+            return jsonify(_alert_subscriptions.all())
+        return jsonify({"screen": screen, "areas": _alert_subscriptions.areas(screen) or []})
+
+    if not screen or len(screen) > 64:
+        return jsonify({"error": "screen is required"}), 400
+
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        areas = data.get("areas")
+        if not isinstance(areas, list) or not all(isinstance(a, str) for a in areas):
+            return jsonify({"error": "areas must be a list of area names"}), 400
+        _alert_subscriptions.set(screen, areas)
+    else:
+        _alert_subscriptions.remove(screen)
+
+    cfg = _load_config()
+    cfg["alert_subscriptions"] = _alert_subscriptions.all()
+    _save_config(cfg)
+    return jsonify({"screen": screen, "areas": _alert_subscriptions.areas(screen) or []})
+
+
+def _hebrew_date_at(now: datetime, language: str) -> str:
+    """Hebrew date at ``now`` for the default city; it advances at sunset, not midnight."""
+    city = DEFAULT_CITY
+    local = now.astimezone(city.tzinfo)
+    day = local.date()
+    sun = sunset(day, city.lat, city.lon, city.tzinfo)
+    if sun is not None and local >= sun:
+        day += timedelta(days=1)
+    # "22 Elul 5785" in English, "כ״ב אלול תשפ״ה" in Hebrew; read from the luach day table
+    return format_hebrew(*_get_luach(city).hebrew_date(day), language)
+
 
 def _hebrew_date(now_local: datetime) -> str | None:
-    if requests is None:
-        return None
     try:
-        cfg = _load_config()
-        language = cfg.get("hebrew_date_language", "english")
-        
-        date_str = now_local.strftime("%Y-%m-%d")
-        url = f"https://www.hebcal.com/converter?cfg=json&date={date_str}&g2h=1&strict=1"
-        cache_key = f"{url}:{language}"
+        language = _load_config().get("hebrew_date_language", "english")
+        cache_key = f"hebrew_date:{language}"
         cached = cache_get(cache_key)
-        if cached is not None:
-            return cached
-        r = requests.get(url, timeout=6, headers={"User-Agent": "HebrewDashboard/1.0"})
-        r.raise_for_status()
-        data = r.json()
-        
-        if language == "hebrew":
-            # Return Hebrew characters: "כ״ב אלול תשפ״ה"
-            hebrew_result = data.get("hebrew")
-        else:
-            # Format Hebrew date in English: "22 Elul 5785"
-            hd = data.get("hd")  # day
-            hm = data.get("hm")  # month in English
-            hy = data.get("hy")  # year
-            
-            if hd and hm and hy:
-                hebrew_result = f"{hd} {hm} {hy}"
-            else:
-                hebrew_result = data.get("hebrew")  # fallback to Hebrew if parsing fails
-            
-        cache_set(cache_key, hebrew_result, 24 * 3600)
-        return hebrew_result
+        if cached is None:
+            city = DEFAULT_CITY
+            cached = _hebrew_date_at(now_local, language)
+            cache_set_until(cache_key, cached, next_sunset(now_local, city.lat, city.lon, city.tzinfo))
+        return cached
     except Exception:
         return None
 
 
-def _decode_gmail_text(payload):
-    import base64
-    def _walk(p):
-        if not p:
-            return None
-        data = p.get('body', {}).get('data')
-        mime = p.get('mimeType')
-        if data and (mime == 'text/plain' or mime == 'text/html'):
-            try:
-                return base64.urlsafe_b64decode(data.encode('utf-8')).decode('utf-8', errors='replace')
-            except Exception:
-                return None
-        for part in (p.get('parts') or []):
-            txt = _walk(part)
-            if txt:
-                return txt
-        return None
-    return _walk(payload)
+def _gmail_service(account: str, creds):
+    """Return a Gmail client for ``account``, reused per thread (clients are not thread-safe)."""
+    services = getattr(_gmail_services, "by_account", None)
+    if services is None:
+        services = _gmail_services.by_account = {}
+    entry = services.get(account)
+    if entry is None or entry[0] is not creds:
+        entry = (creds, build('gmail', 'v1', credentials=creds, cache_discovery=False))
+        services[account] = entry
+    return entry[1]
+
+
+def _fetch_email_detail(service, msg_id: str) -> dict:
+    msg = _google_execute(service.users().messages().get(userId='me', id=msg_id, format='full'))
+    headers = {h['name'].lower(): h['value'] for h in msg.get('payload', {}).get('headers', [])}
+    body_text = extract_body(msg.get('payload'), EMAIL_BODY_LIMIT) or (msg.get('snippet') or '')[:EMAIL_BODY_LIMIT]
+    detail = {
+        'id': msg_id,
+        'subject': headers.get('subject'),
+        'from': headers.get('from'),
+        'to': headers.get('to'),
+        'date': headers.get('date'),
+        'snippet': body_text,
+    }
+    size = len(body_text) + sum(len(v or '') for k, v in detail.items() if k != 'snippet')
+    _email_bodies.put(msg_id, detail, size)
+    return detail
+
+
+def _prefetch_email_bodies(items: list):
+    """Warm the body cache for a freshly listed inbox page, one Gmail client per account."""
+    try:
+        by_account = {}
+        for it in items:
+            if it.id and it.id not in _email_bodies:
+                by_account.setdefault(it.account, []).append(it.id)
+        for account, ids in by_account.items():
+            creds = _get_creds_for_email(account)
+            if not creds:
+                continue
+            service = _gmail_service(account, creds)
+            for msg_id in ids:
+                if msg_id in _email_bodies:
+                    continue
+                try:
+                    _fetch_email_detail(service, msg_id)
+                except HttpError:
+                    continue
+    except Exception as e:
+        print(f"Email prefetch error: {e}")
+    finally:
+        _email_prefetch_lock.release()
+
+
+def _start_email_prefetch(items: list):
+    if build is None or not items:
+        return
+    # Only one prefetch at a time; a running one will cover most of the same ids
+    if not _email_prefetch_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_prefetch_email_bodies, args=(items,), daemon=True).start()
 
 
 @app.route('/api/email/<msg_id>')
 def api_email_detail(msg_id):
+    cached = _email_bodies.get(msg_id)
+    if cached is not None:
+        return jsonify(cached)
     account = request.args.get('account')
     creds = _get_creds_for_email(account)
     if not creds or build is None:
         return jsonify({}), 404
     try:
-        service = build('gmail', 'v1', credentials=creds, cache_discovery=False)
-        msg = service.users().messages().get(userId='me', id=msg_id, format='full').execute()
-        headers = {h['name'].lower(): h['value'] for h in msg.get('payload', {}).get('headers', [])}
-        body_text = _decode_gmail_text(msg.get('payload')) or msg.get('snippet')
-        return jsonify({
-            'id': msg_id,
-            'subject': headers.get('subject'),
-            'from': headers.get('from'),
-            'to': headers.get('to'),
-            'date': headers.get('date'),
-            'snippet': (body_text or '')[:4000],
-        })
+        return jsonify(_fetch_email_detail(_gmail_service(account.lower(), creds), msg_id))
     except HttpError:
         return jsonify({}), 404
 
 
+# City key -> Luach
+_luach_by_city = {}
+_luach_lock = threading.Lock()
+
+
+def _request_city() -> City:
+    """City named by ``?city=`` or nearest to ``?lat=&lon=``; Jerusalem by default.
+
+    Raises ValueError for an unknown city or unparsable coordinates.
+    """
+    name = request.args.get("city")
+    if name:
+        city = city_by_name(name)
+        if city is None:
+            raise ValueError(f"unknown city: {name}")
+        return city
+    if request.args.get("lat") or request.args.get("lon"):
+        return nearest_city(*_request_coords())[0]
+    return DEFAULT_CITY
+
+
+def _get_luach(city: City = DEFAULT_CITY) -> Luach:
+    """Luach for ``city`` precomputed from last week through the next two years."""
+    today = datetime.now(city.tzinfo).date()
+    with _luach_lock:
+        luach = _luach_by_city.get(city.key)
+        first = luach is None
+        # Rebuild once less than a year of lookahead is left
+        if first or not luach.covers(today + timedelta(days=366)):
+            started = time.perf_counter()
+            luach = _luach_by_city[city.key] = Luach(
+                today - timedelta(days=7), today + timedelta(days=LUACH_WINDOW_DAYS),
+                city.lat, city.lon, city.tzinfo, city.israel, city.candle_minutes, city.havdalah_minutes)
+            print(f"Luach for {city.name}: {len(luach)} days, {luach.nbytes / 1024:.1f} KiB day table, "
+                  f"{len(luach.holidays)} holidays, built in {(time.perf_counter() - started) * 1e3:.0f} ms")
+    if first:
+        _register_city_rollover(city)
+    return luach
+
+
+def _holidays_payload(city: City, now: datetime) -> dict:
+    today = now.astimezone(city.tzinfo).date()
+    holidays = []
+    for h in _get_luach(city).upcoming_holidays(today, limit=10):
+        holidays.append({
+            "name": h.title,
+            "date": h.date.strftime("%Y-%m-%d"),
+            "type": h.type,
+            "days_until": (h.date - today).days,
+            "formatted_date": h.date.strftime("%a, %-d %b %Y" if os.name != "nt" else "%a, %#d %b %Y")
+        })
+    return {
+        "holidays": holidays,
+        "count": len(holidays),
+        "last_updated": now.astimezone(city.tzinfo).isoformat(),
+        "location": city.name,
+        "source": "local"
+    }
+
+
+def _shabbat_payload(city: City, now: datetime) -> dict:
+    now_local = now.astimezone(city.tzinfo)
+    luach = _get_luach(city)
+    week = luach.shabbat(now_local)
+    # Next holiday on the city's schedule (after today)
+    upcoming = luach.upcoming_holidays(now_local.date() + timedelta(days=1), limit=1)
+    holiday = upcoming[0] if upcoming else None
+    return {
+        "candle": week["candle"].as_dict() if week["candle"] else None,
+        "havdalah": week["havdalah"].as_dict() if week["havdalah"] else None,
+        "parsha": parsha_name(week["parsha"]) if week["parsha"] else None,
+        "next_holiday": holiday.title if holiday else None,
+        "next_holiday_date": holiday.date.strftime("%b %-d" if os.name != "nt" else "%b %#d") if holiday else None,
+        "location": city.name,
+    }
+
+
+def _shabbat_boundary(city: City, now: datetime) -> datetime:
+    """Next moment the /api/shabbat payload changes: midnight, or havdalah if that comes first."""
+    boundary = next_midnight(now, city.tzinfo)
+    havdalah = _get_luach(city).shabbat(now.astimezone(city.tzinfo))["havdalah"]
+    if havdalah and now < havdalah.time < boundary:
+        return havdalah.time
+    return boundary
+
+
+_rollover = RolloverScheduler(lead_seconds=60)
+
+
+def _register_city_rollover(city: City):
+    """Precompute ``city``'s day-scoped payloads a minute before each boundary."""
+    tzinfo = city.tzinfo
+
+    def day_job(boundary: datetime):
+        after = boundary + timedelta(seconds=1)
+        until = next_midnight(after, tzinfo)
+        cache_stage(f"israel_holidays:{city.key}", _holidays_payload(city, after), boundary, until)
+        day = after.astimezone(tzinfo).date()
+        cache_set_until(f"zmanim:{city.key}:{day}", zmanim_for_date(day, city.lat, city.lon, tzinfo), until)
+
+    def shabbat_job(boundary: datetime):
+        after = boundary + timedelta(seconds=1)
+        cache_stage(f"shabbat:{city.key}", _shabbat_payload(city, after), boundary, _shabbat_boundary(city, after))
+
+    _rollover.register(f"day:{city.key}", lambda now: next_midnight(now, tzinfo), day_job)
+    _rollover.register(f"shabbat:{city.key}", lambda now: _shabbat_boundary(city, now), shabbat_job)
+
+
+def _hebrew_date_job(boundary: datetime):
+    city = DEFAULT_CITY
+    after = boundary + timedelta(seconds=1)
+    until = next_sunset(after, city.lat, city.lon, city.tzinfo)
+    for language in ("english", "hebrew"):
+        cache_stage(f"hebrew_date:{language}", _hebrew_date_at(after, language), boundary, until)
+
+
+# Built at import so the first request is already a lookup
+_get_luach()
+_rollover.register(
+    "hebrew_date",
+    lambda now: next_sunset(now, DEFAULT_CITY.lat, DEFAULT_CITY.lon, DEFAULT_CITY.tzinfo),
+    _hebrew_date_job,
+)
+_background_lock = threading.Lock()
+_background_started = False
+
+
+def start_background():
+    """Start the rollover scheduler, the red-alert poller and the first news refresh (once per process).
+
+    Not done at import: with the debug reloader both the watcher process and
+    the serving child import this module, and only the child should poll the
+    upstream and write the alert archive.
+    """
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    _rollover.start()
+    if requests is not None and os.environ.get("RED_ALERT_HISTORY_URL"):
+        _alert_poller.start()
+    # So the first /api/news already has headlines
+    _start_news_refresh()
+
+
+@app.before_request
+def _ensure_background():
+    # WSGI servers that import ``app`` directly start the threads with the first request
+    if not _background_started:
+        start_background()
+
+
+def _zmanim_shabbat_info(now: datetime, city: City = DEFAULT_CITY) -> dict:
+    """Upcoming candle lighting, havdalah and parsha for ``city``."""
+    luach = _get_luach(city)
+    if luach.covers(now.date()):
+        week = luach.shabbat(now)
+    else:
+        # Outside the window: read the cached years directly rather than laying out a day table
+        week = shabbat_at(now, city.lat, city.lon, city.tzinfo, city.israel, city.candle_minutes, city.havdalah_minutes)
+    shabbat_info = {}
+    if week["candle"]:
+        shabbat_info["candle_lighting"] = week["candle"].as_dict()
+    if week["havdalah"]:
+        shabbat_info["havdalah"] = week["havdalah"].as_dict()
+    if week["parsha"]:
+        shabbat_info["parsha"] = parsha_name(week["parsha"], hebrew=True)
+    return shabbat_info
+
+
 @app.route("/api/zmanim")
 def api_zmanim():
-    """Get daily Zmanim (prayer times) for Jerusalem and next Shabbat info."""
-    if requests is None:
-        return jsonify({})
-    
+    """Get daily Zmanim (prayer times) and next Shabbat info for the requested city (Jerusalem by default)."""
+    try:
+        city = _request_city()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    city_tz = city.tzinfo
+    now_local = datetime.now(city_tz)
     # Use date parameter or default to today
     date_param = request.args.get("date")
-    if date_param:
-        try:
-            target_date = datetime.fromisoformat(date_param).date()
-        except Exception:
-            target_date = datetime.now(_get_tz_jerusalem()).date()
+    try:
+        target_date = datetime.fromisoformat(date_param).date() if date_param else now_local.date()
+    except Exception:
+        target_date = now_local.date()
+    if abs((target_date - now_local.date()).days) > ZMANIM_DATE_MAX_DAYS:
+        return jsonify({"error": f"date must be within {ZMANIM_DATE_MAX_DAYS} days of today"}), 400
+
+    if target_date == now_local.date():
+        cache_key = f"zmanim:{city.key}:{target_date}"
+        times = cache_get(cache_key)
+        if times is None:
+            times = zmanim_for_date(target_date, city.lat, city.lon, city_tz)
+            cache_set_until(cache_key, times, next_midnight(now_local, city_tz))
+        shabbat_info = _zmanim_shabbat_info(now_local, city)
     else:
-        target_date = datetime.now(_get_tz_jerusalem()).date()
-    
-    cache_key = f"zmanim:{target_date}"
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return jsonify(cached)
-    
+        # Pure function of the date: no expiry, but every date is a new key, so LRU-capped
+        cache_key = f"{city.key}:{target_date}"
+        cached = _zmanim_dates.get(cache_key)
+        if cached is None:
+            midnight = datetime.combine(target_date, datetime.min.time(), tzinfo=city_tz)
+            cached = (zmanim_for_date(target_date, city.lat, city.lon, city_tz), _zmanim_shabbat_info(midnight, city))
+            _zmanim_dates.put(cache_key, cached)
+        times, shabbat_info = cached
+
+    payload = {
+        'date': str(target_date),
+        'zmanim': times,
+        'shabbat': shabbat_info,
+        'location': city.name,
+        'cached_at': datetime.now(city_tz).isoformat()
+    }
+    return jsonify(payload)
+
+
+@app.route("/api/zmanim/range")
+def api_zmanim_range():
+    """Columnar zmanim for the requested city over ``start``..``end`` (or ``days``), up to a year per call."""
     try:
-        # Get daily Zmanim for Jerusalem (geonameid=281184)
-        zmanim_url = f"https://www.hebcal.com/zmanim?cfg=json&geonameid=281184&date={target_date}"
-        r = requests.get(zmanim_url, timeout=8, headers={"User-Agent": "DailyDashboard/1.0"})
-        r.raise_for_status()
-        zmanim_data = r.json()
-        
-        # Get Shabbat times and parsha
-        shabbat_url = "https://www.hebcal.com/shabbat?cfg=json&geonameid=281184&M=on"
-        r2 = requests.get(shabbat_url, timeout=8, headers={"User-Agent": "DailyDashboard/1.0"})
-        r2.raise_for_status()
-        shabbat_data = r2.json()
-        
-        # Extract Zmanim times
-        times = zmanim_data.get("times", {})
-        
-        # Extract Shabbat information
-        shabbat_info = {}
-        if shabbat_data and 'items' in shabbat_data:
-            for item in shabbat_data['items']:
-                if item['category'] == 'candles':
-                    shabbat_info['candle_lighting'] = {
-                        'time': item['date'],
-                        'title': item['title']
-                    }
-                elif item['category'] == 'havdalah':
-                    shabbat_info['havdalah'] = {
-                        'time': item['date'],
-                        'title': item['title']
-                    }
-                elif item['category'] == 'parashat':
-                    shabbat_info['parsha'] = item.get('hebrew', item.get('title', ''))
-        
-        payload = {
-            'date': str(target_date),
-            'zmanim': times,
-            'shabbat': shabbat_info,
-            'location': 'Jerusalem',
-            'cached_at': datetime.now(_get_tz_jerusalem()).isoformat()
-        }
-        
-        # Cache for 1 hour
-        cache_set(cache_key, payload, 3600)
-        return jsonify(payload)
+        city = _request_city()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    today = datetime.now(city.tzinfo).date()
+    try:
+        start = datetime.fromisoformat(request.args["start"]).date() if request.args.get("start") else today
+        if request.args.get("end"):
+            end = datetime.fromisoformat(request.args["end"]).date()
+        else:
+            end = start + timedelta(days=int(request.args.get("days", 7)) - 1)
     except Exception:
-        return jsonify({})
+        return jsonify({"error": "start/end must be YYYY-MM-DD and days an integer"}), 400
+    if end < start:
+        return jsonify({"error": "end is before start"}), 400
+    if (end - start).days >= ZMANIM_RANGE_MAX_DAYS:
+        return jsonify({"error": f"range is limited to {ZMANIM_RANGE_MAX_DAYS} days"}), 400
+
+    cache_key = f"{city.key}:{start}:{end}"
+    cached = _zmanim_ranges.get(cache_key)
+    if cached is not None:
+        return jsonify(cached)
+    days = date_range(start, end)
+    cols = zmanim_for_dates(days, city.lat, city.lon, city.tzinfo)
+    payload = {
+        "start": str(start),
+        "end": str(end),
+        "location": city.name,
+        "dates": [str(d) for d in days],
+        "zmanim": {k: [t.isoformat() if t else None for t in v] for k, v in cols.items()},
+    }
+    # Pure function of the range: no expiry, but every start/end pair is a new key, so LRU-capped
+    _zmanim_ranges.put(cache_key, payload, size=len(days))
+    return jsonify(payload)
 
 
 @app.route("/api/shabbat")
 def api_shabbat():
-    cached = cache_get("shabbat")
-    if cached:
-        return jsonify(cached)
     try:
-        # Shabbat times and parsha (Jerusalem)
-        base = (
-            "https://www.hebcal.com/shabbat?cfg=json&geonameid=281184&b=18&m=50&mod=on&leyning=off"
-        )
-        r = requests.get(base, timeout=8, headers={"User-Agent": "DailyDashboard/1.0"})
-        r.raise_for_status()
-        data = r.json()
-        items = data.get("items", [])
-        candle = None
-        havdalah = None
-        parsha = None
-        for it in items:
-            cat = it.get("category")
-            title = it.get("title", "")
-            dt = it.get("date")
-            if cat == "candles" and not candle:
-                candle = {"title": title, "time": dt}
-            elif cat == "havdalah" and not havdalah:
-                havdalah = {"title": title, "time": dt}
-            elif cat == "parashat" and not parsha:
-                parsha = title
-        # Next upcoming Yom Tov/major holiday in Israel (after now)
-        holiday_name = None
-        holiday_date = None
-        try:
-            nx = (
-                "https://www.hebcal.com/hebcal?v=1&cfg=json&maj=on&i=on&nx=on&c=on"
-                "&year=now&geo=geoname&geonameid=281184&locale=en"
-            )
-            r2 = requests.get(nx, timeout=8, headers={"User-Agent": "DailyDashboard/1.0"})
-            r2.raise_for_status()
-            d2 = r2.json()
-            now_jlm = datetime.now(_get_tz_jerusalem())
-            upcoming = []
-            for e in d2.get("items", []):
-                try:
-                    dt = e.get("date")
-                    if not dt:
-                        continue
-                    when = datetime.fromisoformat(dt.replace("Z", "+00:00")).astimezone(_get_tz_jerusalem())
-                except Exception:
-                    continue
-                # Prefer explicit yomtov flag; fallback to category=holiday
-                is_major = bool(e.get("yomtov")) or e.get("category") == "holiday"
-                if is_major and when > now_jlm:
-                    upcoming.append((when, e.get("title")))
-            if upcoming:
-                upcoming.sort(key=lambda t: t[0])
-                holiday_name = upcoming[0][1]
-                holiday_date = upcoming[0][0].strftime("%b %-d" if os.name != "nt" else "%b %#d")
-        except Exception:
-            pass
-        payload = {
-            "candle": candle,
-            "havdalah": havdalah,
-            "parsha": parsha,
-            "next_holiday": holiday_name,
-            "next_holiday_date": holiday_date,
-        }
-        cache_set("shabbat", payload, 6 * 3600)
-        return jsonify(payload)
-    except Exception:
-        return jsonify({})
+        city = _request_city()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    cache_key = f"shabbat:{city.key}"
+    payload = cache_get(cache_key)
+    if payload is None:
+        now = datetime.now(city.tzinfo)
+        payload = _shabbat_payload(city, now)
+        cache_set_until(cache_key, payload, _shabbat_boundary(city, now))
+    return jsonify(payload)
+
+
+@app.route("/api/locations/nearest")
+def api_nearest_location():
+    """Resolve ``lat``/``lon`` to the gazetteer city zmanim and Shabbat times are computed for."""
+    try:
+        lat, lon = _request_coords()
+    except ValueError:
+        return jsonify({"error": "lat and lon must be valid coordinates"}), 400
+    city, distance = nearest_city(lat, lon)
+    return jsonify({"city": city.as_dict(), "distance_km": round(distance, 1)})
 
 
 @app.route("/api/accounts")
@@ -1217,15 +1806,17 @@ def api_aqi():
     token = _load_config().get("waqi_token") or os.environ.get("WAQI_API_KEY", "")
     if not token:
         return jsonify({})
-    lat = float(request.args.get("lat", DEFAULT_LAT))
-    lon = float(request.args.get("lon", DEFAULT_LON))
-    cache_key = f"aqi:{lat:.3f},{lon:.3f}"
+    try:
+        lat, lon = grid_cell(*_request_coords(), GEO_GRID_KM)
+    except ValueError:
+        return jsonify({"error": "lat and lon must be valid coordinates"}), 400
+    cache_key = f"aqi:{lat:.4f},{lon:.4f}"
     cached = cache_get(cache_key)
     if cached is not None:
         return jsonify(cached)
     url = f"https://api.waqi.info/feed/geo:{lat};{lon}/?token={token}"
     try:
-        r = requests.get(url, timeout=8, headers={"User-Agent": "DailyDashboard/1.0"})
+        r = _http_get(url, timeout=8, headers={"User-Agent": "DailyDashboard/1.0"})
         r.raise_for_status()
         data = r.json()
         iaqi = data.get("data", {}).get("iaqi", {})
@@ -1233,6 +1824,7 @@ def api_aqi():
         aqi = data.get("data", {}).get("aqi")
         payload = {"pm25": pm25, "aqi": aqi}
         cache_set(cache_key, payload, 3600)
+        _trends.record(_cell_key((lat, lon)), payload)
         return jsonify(payload)
     except Exception:
         return jsonify({})
@@ -1259,7 +1851,7 @@ def auth_google():
     email_hint = request.args.get("label", "account")
     try:
         gmail = build("gmail", "v1", credentials=creds, cache_discovery=False)
-        profile = gmail.users().getProfile(userId="me").execute()
+        profile = _google_execute(gmail.users().getProfile(userId="me"))
         email_hint = profile.get("emailAddress", email_hint)
     except Exception:
         pass
@@ -1301,15 +1893,6 @@ def api_calendar_three_day():
     else:
         events = _combine_calendars(today_start, three_days_end)
 
-    def simplify(ev):
-        start = ev.get("start", {})
-        end = ev.get("end", {})
-        title = ev.get("summary", "(no title)")
-        location = ev.get("location", "")
-        start_str = start.get("dateTime") or start.get("date")
-        end_str = end.get("dateTime") or end.get("date")
-        return {"title": title, "location": location, "start": start_str, "end": end_str}
-
     # Bucket events per local day
     buckets = {}
     day_labels = ["Today", "Tomorrow", "Day After"]
@@ -1324,40 +1907,16 @@ def api_calendar_three_day():
         }
 
     for ev in events:
-        s = ev.get("start", {})
-        when = s.get("dateTime") or s.get("date")
-        try:
-            if when and "T" in when:
-                dt = datetime.fromisoformat(when.replace("Z", "+00:00"))
-                dt_local = dt.astimezone(_get_local_tz())
-            elif when:
-                # All-day event
-                dt_local = datetime.fromisoformat(when).replace(tzinfo=_get_local_tz())
-            else:
-                continue
-            key = dt_local.strftime("%Y-%m-%d")
-            if key in buckets:
-                buckets[key]["events"].append(simplify(ev))
-        except Exception:
-            continue
-
-    # Sort events within each day by start
-    def sort_key(item):
-        s = item.get("start")
-        try:
-            if s and "T" in s:
-                return datetime.fromisoformat(s.replace("Z", "+00:00"))
-            elif s:
-                return datetime.fromisoformat(s)
-        except Exception:
-            return datetime.max
-        return datetime.max
+        if ev.day_key in buckets:
+            buckets[ev.day_key]["events"].append(ev)
 
     days = []
     for i in range(3):
         d = (today_start + timedelta(days=i)).strftime("%Y-%m-%d")
         day = buckets[d]
-        day["events"].sort(key=sort_key)
+        # Sort events within each day by start
+        day["events"].sort(key=lambda ev: ev.start)
+        day["events"] = [ev.as_dict() for ev in day["events"]]
         days.append(day)
 
     payload = {
@@ -1370,284 +1929,117 @@ def api_calendar_three_day():
 
 @app.route("/api/holidays/israel")
 def api_israel_holidays():
-    """Return the next 10 upcoming public holidays in Israel using HebCal API."""
-    cache_key = "israel_holidays"
-    cached = cache_get(cache_key)
-    if cached:
-        return jsonify(cached)
-    
-    if requests is None:
-        return jsonify({"holidays": [], "count": 0, "error": "requests library not available"})
-    
+    """Return the next 10 upcoming holidays from the precomputed luach.
+
+    Israeli schedule by default; a diaspora ``city``/``lat``/``lon`` gets its own.
+    """
     try:
-        now = datetime.now(_get_local_tz())
-        current_year = now.year
-        next_year = current_year + 1
-        
-        # Fetch holidays from HebCal API for current and next year
-        all_holidays = []
-        
-        for year in [current_year, next_year]:
-            # HebCal API for Israeli holidays including major Jewish holidays and Israeli national holidays
-            url = f"https://www.hebcal.com/hebcal?v=1&cfg=json&maj=on&min=off&mod=on&nx=off&year={year}&month=x&ss=off&mf=off&c=on&geo=geoname&geonameid=281184&M=on&s=on"
-            
-            try:
-                r = requests.get(url, timeout=10, headers={"User-Agent": "DailyDashboard/1.0"})
-                r.raise_for_status()
-                data = r.json()
-                
-                for item in data.get("items", []):
-                    title = item.get("title", "")
-                    date_str = item.get("date", "")
-                    category = item.get("category", "")
-                    
-                    # Skip if no date or title
-                    if not date_str or not title:
-                        continue
-                    
-                    # Parse date
-                    try:
-                        if "T" in date_str:
-                            holiday_date = datetime.fromisoformat(date_str.replace("Z", "+00:00")).date()
-                        else:
-                            holiday_date = datetime.fromisoformat(date_str).date()
-                    except Exception:
-                        continue
-                    
-                    # Only include future holidays
-                    if holiday_date < now.date():
-                        continue
-                    
-                    # Determine holiday type based on category and title
-                    holiday_type = "Religious"
-                    if "Independence" in title or "Memorial" in title or "Jerusalem" in title:
-                        holiday_type = "National"
-                    elif "Holocaust" in title or "Remembrance" in title:
-                        holiday_type = "Memorial"
-                    
-                    # Calculate days until
-                    days_until = (holiday_date - now.date()).days
-                    
-                    all_holidays.append({
-                        "name": title,
-                        "date": holiday_date.strftime("%Y-%m-%d"),
-                        "type": holiday_type,
-                        "days_until": days_until,
-                        "formatted_date": holiday_date.strftime("%a, %-d %b %Y" if os.name != "nt" else "%a, %#d %b %Y")
-                    })
-                    
-            except Exception as e:
-                print(f"Error fetching holidays for year {year}: {e}")
-                continue
-        
-        # Sort by date and take the next 10
-        all_holidays.sort(key=lambda x: x["date"])
-        next_10_holidays = all_holidays[:10]
-        
-        payload = {
-            "holidays": next_10_holidays,
-            "count": len(next_10_holidays),
-            "last_updated": now.isoformat(),
-            "source": "HebCal API"
-        }
-        
-        # Cache for 24 hours since holidays don't change frequently
-        cache_set(cache_key, payload, 24 * 60 * 60)
-        return jsonify(payload)
-        
-    except Exception as e:
-        print(f"Error in api_israel_holidays: {e}")
-        # Fallback: try to get from the existing shabbat endpoint which uses HebCal
-        try:
-            fallback_url = "https://www.hebcal.com/hebcal?v=1&cfg=json&maj=on&i=on&nx=on&c=on&year=now&geo=geoname&geonameid=281184&locale=en"
-            r = requests.get(fallback_url, timeout=8, headers={"User-Agent": "DailyDashboard/1.0"})
-            r.raise_for_status()
-            data = r.json()
-            
-            fallback_holidays = []
-            for item in data.get("items", [])[:5]:  # Just get next 5 as fallback
-                title = item.get("title", "")
-                date_str = item.get("date", "")
-                
-                if not date_str or not title:
-                    continue
-                    
-                try:
-                    if "T" in date_str:
-                        holiday_date = datetime.fromisoformat(date_str.replace("Z", "+00:00")).date()
-                    else:
-                        holiday_date = datetime.fromisoformat(date_str).date()
-                        
-                    if holiday_date >= now.date():
-                        days_until = (holiday_date - now.date()).days
-                        fallback_holidays.append({
-                            "name": title,
-                            "date": holiday_date.strftime("%Y-%m-%d"),
-                            "type": "Religious",
-                            "days_until": days_until,
-                            "formatted_date": holiday_date.strftime("%a, %-d %b %Y" if os.name != "nt" else "%a, %#d %b %Y")
-                        })
-                except Exception:
-                    continue
-            
-            return jsonify({
-                "holidays": fallback_holidays, 
-                "count": len(fallback_holidays), 
-                "error": f"Primary API failed: {str(e)}, using fallback",
-                "source": "HebCal API (fallback)"
-            })
-            
-        except Exception as fallback_error:
-            return jsonify({
-                "holidays": [], 
-                "count": 0, 
-                "error": f"Both primary and fallback APIs failed: {str(e)}, {str(fallback_error)}"
-            })
+        city = _request_city()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    cache_key = f"israel_holidays:{city.key}"
+    payload = cache_get(cache_key)
+    if payload is None:
+        now = datetime.now(city.tzinfo)
+        payload = _holidays_payload(city, now)
+        cache_set_until(cache_key, payload, next_midnight(now, city.tzinfo))
+    return jsonify(payload)
 
 
 @app.route("/api/red-alert")
 def api_red_alert():
-    cache_key = "red_alert_data"
-    cached_data = cache_get(cache_key)
-    
-    if cached_data:
-        return jsonify(cached_data)
-    
-    try:
-        # Using static alert history JSON feed from Pikud Haoref
-        alert_url = os.environ.get("RED_ALERT_HISTORY_URL")
-        if not alert_url:
-            return jsonify({
-                'alerts': [],
-                'last_alert': None,
-                'last_alert_display': 'RED_ALERT_HISTORY_URL not configured',
-                'last_updated': datetime.now(_get_tz_jerusalem()).isoformat(),
-                'status': 'error',
-                'location_count': 0,
-                'error': 'RED_ALERT_HISTORY_URL environment variable not set'
-            })
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://www.oref.org.il/',
-            'Accept': 'application/json, text/plain, */*'
-        }
-        
-        response = requests.get(alert_url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            alert_data = response.json()
-            
-            # Get Israel timezone for proper time handling
-            israel_tz = _get_tz_jerusalem()
-            now = datetime.now(israel_tz)
-            
-            # Process the alert history data to find the most recent alert
-            last_alert = None
-            last_alert_time = None
-            
-            if alert_data and isinstance(alert_data, list):
-                # Sort alerts by date to find the most recent one
-                valid_alerts = []
-                
-                for alert in alert_data:
-                    try:
-                        # Parse alert time - adjust format based on actual API response
-                        alert_time_str = alert.get('alertDate', '')
-                        if alert_time_str:
-                            # Try different date formats that might be used
-                            try:
-                                alert_time = datetime.fromisoformat(alert_time_str.replace('Z', '+00:00'))
-                            except:
-                                try:
-                                    alert_time = datetime.strptime(alert_time_str, '%Y-%m-%d %H:%M:%S')
-                                except:
-                                    continue
-                            
-                            alert_time = alert_time.astimezone(israel_tz)
-                            locations = alert.get('data', [])
-                            
-                            if locations:  # Only consider alerts with locations
-                                valid_alerts.append({
-                                    'time': alert_time,
-                                    'time_str': alert_time.isoformat(),
-                                    'locations': locations,
-                                    'category': alert.get('cat', 1)
-                                })
-                    except Exception:
-                        continue
-                
-                # Sort by time and get the most recent
-                if valid_alerts:
-                    valid_alerts.sort(key=lambda x: x['time'], reverse=True)
-                    last_alert = valid_alerts[0]
-                    last_alert_time = last_alert['time']
-            
-            # Determine status based on how recent the last alert was
-            if last_alert_time:
-                time_since_last = now - last_alert_time
-                
-                # Consider "active" only if within the last 10 minutes
-                if time_since_last.total_seconds() < 600:  # 10 minutes
-                    status = 'active'
-                    alert_locations = last_alert['locations']
-                else:
-                    status = 'clear'
-                    alert_locations = []
-                
-                # Format last alert time for display
-                if time_since_last.days > 0:
-                    last_alert_display = f"{time_since_last.days}d ago"
-                elif time_since_last.seconds > 3600:
-                    hours = time_since_last.seconds // 3600
-                    last_alert_display = f"{hours}h ago"
-                elif time_since_last.seconds > 60:
-                    minutes = time_since_last.seconds // 60
-                    last_alert_display = f"{minutes}m ago"
-                else:
-                    last_alert_display = "Just now"
-            else:
-                status = 'clear'
-                alert_locations = []
-                last_alert_display = "No recent alerts"
-            
-            payload = {
-                'alerts': alert_locations,
-                'last_alert': last_alert,
-                'last_alert_display': last_alert_display,
-                'last_updated': now.isoformat(),
-                'status': status,
-                'location_count': len(alert_locations) if alert_locations else 0
-            }
-        else:
-            payload = {
-                'alerts': [],
-                'last_alert': None,
-                'last_alert_display': 'Unable to fetch data',
-                'last_updated': datetime.now(_get_tz_jerusalem()).isoformat(),
-                'status': 'unknown',
-                'location_count': 0,
-                'error': f'API returned status {response.status_code}'
-            }
-        
-        # Cache for 2 minutes (balance between freshness and API load)
-        cache_set(cache_key, payload, 120)
-        return jsonify(payload)
-        
-    except Exception as e:
-        print(f"Error fetching Red Alert data: {e}")
-        payload = {
+    """Current red-alert status from the poller: active locations (last ten minutes) and the latest alert.
+
+    With ``screen``, both are limited to that screen's subscribed areas.
+    """
+    israel_tz = _get_tz_jerusalem()
+    now = datetime.now(israel_tz)
+    if not os.environ.get("RED_ALERT_HISTORY_URL"):
+        return jsonify({
             'alerts': [],
             'last_alert': None,
-            'last_alert_display': 'Connection error',
-            'last_updated': datetime.now(_get_tz_jerusalem()).isoformat(),
+            'last_alert_display': 'RED_ALERT_HISTORY_URL not configured',
+            'last_updated': now.isoformat(),
             'status': 'error',
             'location_count': 0,
-            'error': str(e)
+            'error': 'RED_ALERT_HISTORY_URL environment variable not set'
+        })
+    if _alerts.last_poll is None and _alerts.last_error:
+        # Nothing fetched yet: report why
+        http_error = _alerts.last_status_code is not None
+        return jsonify({
+            'alerts': [],
+            'last_alert': None,
+            'last_alert_display': 'Unable to fetch data' if http_error else 'Connection error',
+            'last_updated': now.isoformat(),
+            'status': 'unknown' if http_error else 'error',
+            'location_count': 0,
+            'error': f'API returned status {_alerts.last_status_code}' if http_error else _alerts.last_error
+        })
+
+    match = _screen_filter()
+    latest = _alerts.latest(match)
+    last_alert = None
+    if latest is not None:
+        same_time = [e.location for e in _alerts.recent(now, (now - latest.time).total_seconds() + 1, match)
+                     if e.raw_time == latest.raw_time]
+        last_alert = {
+            'time': latest.time.isoformat(),
+            'time_str': latest.time.isoformat(),
+            'locations': same_time or [latest.location],
+            'category': latest.category,
         }
-        return jsonify(payload)
+
+    # Active while the newest alert is under ten minutes old
+    alert_locations = []
+    if latest is None:
+        status = 'clear'
+        last_alert_display = "No recent alerts"
+    else:
+        time_since_last = now - latest.time
+        if time_since_last.total_seconds() < ACTIVE_SECONDS:
+            status = 'active'
+            alert_locations = list(dict.fromkeys(e.location for e in _alerts.recent(now, match=match)))
+        else:
+            status = 'clear'
+
+        # Format last alert time for display
+        if time_since_last.days > 0:
+            last_alert_display = f"{time_since_last.days}d ago"
+        elif time_since_last.seconds > 3600:
+            hours = time_since_last.seconds // 3600
+            last_alert_display = f"{hours}h ago"
+        elif time_since_last.seconds > 60:
+            minutes = time_since_last.seconds // 60
+            last_alert_display = f"{minutes}m ago"
+        else:
+            last_alert_display = "Just now"
+
+    payload = {
+        'alerts': alert_locations,
+        'last_alert': last_alert,
+        'last_alert_display': last_alert_display,
+        'last_updated': (_alerts.last_poll or now).isoformat(),
+        'status': status,
+        'location_count': len(alert_locations),
+        'cursor': _alerts.cursor,
+    }
+    # A failing or stalled poller must not keep reporting the last known state as current
+    stale_after = max(15, 5 * RED_ALERT_POLL_SECONDS)
+    stale = _alerts.last_poll is not None and (now - _alerts.last_poll).total_seconds() > stale_after
+    if _alerts.last_error or stale:
+        if _alerts.last_error:
+            error = (f'API returned status {_alerts.last_status_code}' if _alerts.last_status_code is not None
+                     else _alerts.last_error)
+        else:
+            error = f'No successful poll for {int((now - _alerts.last_poll).total_seconds())} seconds'
+        payload['status'] = 'unknown'
+        payload['error'] = error
+    return jsonify(payload)
 
 
 def create_app():
+    start_background()
     return app
 
 
@@ -1655,4 +2047,7 @@ if __name__ == "__main__":
     host = os.environ.get("HOST", "127.0.0.1")
     port = int(os.environ.get("PORT", "5000"))
     debug = os.environ.get("FLASK_DEBUG", "1") not in ("0", "false", "False")
+    # Under the reloader only the child that serves requests runs the background threads
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background()
     app.run(host=host, port=port, debug=debug)
@@ -0,0 +1,162 @@
+"""Offline Gregorian <-> Hebrew calendar arithmetic.
+
+Implements the fixed Hebrew calendar (molad of Tishrei plus the four
+dechiyot) so the dashboard never needs hebcal's converter endpoint.
+Month numbers follow hebcal: Nisan=1 ... Elul=6, Tishrei=7 ... Adar=12,
+Adar II=13 (leap years only). Absolute day numbers are proleptic
+Gregorian ordinals, i.e. ``date.toordinal()``.
+"""
+
+from datetime import date
+from functools import lru_cache
+
+NISAN, IYYAR, SIVAN, TAMUZ, AV, ELUL = 1, 2, 3, 4, 5, 6
+TISHREI, CHESHVAN, KISLEV, TEVET, SHVAT, ADAR_I, ADAR_II = 7, 8, 9, 10, 11, 12, 13
+
+# Absolute day of the (proleptic) day before 1 Tishrei AM 1
+EPOCH = -1373428
+AVG_HEBYEAR_DAYS = 365.24682220597794
+
+MONTH_NAMES_EN = {
+    NISAN: "Nisan", IYYAR: "Iyyar", SIVAN: "Sivan", TAMUZ: "Tamuz", AV: "Av", ELUL: "Elul",
+    TISHREI: "Tishrei", CHESHVAN: "Cheshvan", KISLEV: "Kislev", TEVET: "Tevet", SHVAT: "Sh'vat",
+    ADAR_I: "Adar", ADAR_II: "Adar II",
+}
+MONTH_NAMES_HE = {
+    NISAN: "ניסן", IYYAR: "אייר", SIVAN: "סיון", TAMUZ: "תמוז", AV: "אב", ELUL: "אלול",
+    TISHREI: "תשרי", CHESHVAN: "חשון", KISLEV: "כסלו", TEVET: "טבת", SHVAT: "שבט",
+    ADAR_I: "אדר", ADAR_II: "אדר ב׳",
+}
+
+GERESH = "׳"
+GERSHAYIM = "״"
+_HEB_ONES = ["", "א", "ב", "ג", "ד", "ה", "ו", "ז", "ח", "ט"]
+_HEB_TENS = ["", "י", "כ", "ל", "מ", "נ", "ס", "ע", "פ", "צ"]
+_HEB_HUNDREDS = ["", "ק", "ר", "ש", "ת"]
+
+
+def is_leap_year(year: int) -> bool:
+    return (1 + 7 * year) % 19 < 7
+
+
+def months_in_year(year: int) -> int:
+    return 13 if is_leap_year(year) else 12
+
+
+@lru_cache(maxsize=512)
+def elapsed_days(year: int) -> int:
+    """Days from the epoch to 1 Tishrei of ``year``, with all four dechiyot applied."""
+    prev = year - 1
+    m_elapsed = 235 * (prev // 19) + 12 * (prev % 19) + ((prev % 19) * 7 + 1) // 19
+    p_elapsed = 204 + 793 * (m_elapsed % 1080)
+    h_elapsed = 5 + 12 * m_elapsed + 793 * (m_elapsed // 1080) + p_elapsed // 1080
+    parts = (p_elapsed % 1080) + 1080 * (h_elapsed % 24)
+    day = 1 + 29 * m_elapsed + h_elapsed // 24
+    alt = day
+    # Molad zaken, GaTaRaD and BeTUTaKPaT
+    if (parts >= 19440
+            or (day % 7 == 2 and parts >= 9924 and not is_leap_year(year))
+            or (day % 7 == 1 and parts >= 16789 and is_leap_year(prev))):
+        alt += 1
+    # Lo ADU Rosh
+    if alt % 7 in (0, 3, 5):
+        alt += 1
+    return alt
+
+
+def year_length(year: int) -> int:
+    return elapsed_days(year + 1) - elapsed_days(year)
+
+
+def month_length(year: int, month: int) -> int:
+    if month in (IYYAR, TAMUZ, ELUL, TEVET, ADAR_II):
+        return 29
+    if month == ADAR_I:
+        return 30 if is_leap_year(year) else 29
+    if month == CHESHVAN:
+        return 30 if year_length(year) % 10 == 5 else 29
+    if month == KISLEV:
+        return 29 if year_length(year) % 10 == 3 else 30
+    return 30
+
+
+def new_year(year: int) -> int:
+    """Absolute day of 1 Tishrei ``year``."""
+    return EPOCH + elapsed_days(year)
+
+
+@lru_cache(maxsize=4096)
+def _month_start(year: int, month: int) -> int:
+    days = 0
+    if month < TISHREI:
+        for m in range(TISHREI, months_in_year(year) + 1):
+            days += month_length(year, m)
+        for m in range(NISAN, month):
+            days += month_length(year, m)
+    else:
+        for m in range(TISHREI, month):
+            days += month_length(year, m)
+    return new_year(year) + days
+
+
+def hebrew_to_abs(year: int, month: int, day: int) -> int:
+    return _month_start(year, month) + day - 1
+
+
+def abs_to_hebrew(abs_day: int) -> tuple[int, int, int]:
+    year = int((abs_day - EPOCH) / AVG_HEBYEAR_DAYS)
+    while new_year(year) <= abs_day:
+        year += 1
+    year -= 1
+    month = TISHREI if abs_day < _month_start(year, NISAN) else NISAN
+    while abs_day >= _month_start(year, month) + month_length(year, month):
+        month += 1
+    return year, month, abs_day - _month_start(year, month) + 1
+
+
+def to_hebrew(d: date) -> tuple[int, int, int]:
+    """Gregorian date -> (year, month, day) in the Hebrew calendar."""
+    return abs_to_hebrew(d.toordinal())
+
+
+def from_hebrew(year: int, month: int, day: int) -> date:
+    """Hebrew (year, month, day) -> Gregorian date."""
+    return date.fromordinal(hebrew_to_abs(year, month, day))
+
+
+def month_name(year: int, month: int, hebrew: bool = False) -> str:
+    if is_leap_year(year) and month == ADAR_I:
+        return "אדר א׳" if hebrew else "Adar I"
+    return (MONTH_NAMES_HE if hebrew else MONTH_NAMES_EN)[month]
+
+
+def hebrew_numeral(n: int) -> str:
+    """Hebrew numeral with geresh/gershayim, e.g. 22 -> כ״ב, 5785 -> תשפ״ה."""
+    n %= 1000
+    letters = ""
+    hundreds = n // 100
+    while hundreds > 4:
+        letters += "ת"
+        hundreds -= 4
+    letters += _HEB_HUNDREDS[hundreds]
+    rest = n % 100
+    # 15 and 16 avoid spelling the divine name
+    if rest in (15, 16):
+        letters += "ט" + _HEB_ONES[rest - 9]
+    else:
+        letters += _HEB_TENS[rest // 10] + _HEB_ONES[rest % 10]
+    if len(letters) == 1:
+        return letters + GERESH
+    return letters[:-1] + GERSHAYIM + letters[-1]
+
+
+def format_hebrew_date(d: date, language: str = "english") -> str:
+    """``22 Elul 5785`` in English mode, ``כ״ב אלול תשפ״ה`` in Hebrew mode."""
+    return format_hebrew(*to_hebrew(d), language)
+
+
+def format_hebrew(year: int, month: int, day: int, language: str = "english") -> str:
+    """Format an already converted ``(year, month, day)`` like ``format_hebrew_date``."""
+    if language == "hebrew":
+        return f"{hebrew_numeral(day)} {month_name(year, month, hebrew=True)} {hebrew_numeral(year)}"
+    return f"{day} {month_name(year, month)} {year}"
@@ -0,0 +1,202 @@
+"""Bundled city gazetteer and nearest-city lookup.
+
+Zmanim, Shabbat times and the holiday schedule are computed per city rather
+than per raw coordinate, so any ``lat``/``lon`` is snapped to the nearest
+gazetteer entry and everything downstream is cached by city. Each city
+carries its own rules: Israel vs. diaspora schedule and the local candle
+lighting custom (40 minutes before sunset in Jerusalem, 30 in Haifa and
+Zikhron Ya'akov, 18 elsewhere).
+
+The lookup is a 3-d tree over unit vectors on the sphere, so nearest by
+chord length is nearest by great-circle distance and the antimeridian needs
+no special case.
+"""
+
+import math
+from dataclasses import dataclass
+
+from dateutil import tz
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+@dataclass(slots=True, frozen=True)
+class City:
+    name: str
+    country: str  # ISO 3166 alpha-2
+    lat: float
+    lon: float  # degrees east
+    tzid: str
+    candle_minutes: int = 18
+    havdalah_minutes: int = 50
+
+    @property
+    def key(self) -> str:
+        """Stable cache-key fragment."""
+        return self.name.lower().replace(" ", "-").replace("'", "")
+
+    @property
+    def israel(self) -> bool:
+        return self.country == "IL"
+
+    @property
+    def tzinfo(self):
+        return tz.gettz(self.tzid)
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "country": self.country,
+            "latitude": self.lat,
+            "longitude": self.lon,
+            "tzid": self.tzid,
+            "israel": self.israel,
+            "candle_minutes": self.candle_minutes,
+            "havdalah_minutes": self.havdalah_minutes,
+        }
+
+
+_JLM = "Asia/Jerusalem"
+
+CITIES = [
+    City("Jerusalem", "IL", 31.7683, 35.2137, _JLM, candle_minutes=40),
+    City("Tel Aviv", "IL", 32.0809, 34.7806, _JLM),
+    City("Haifa", "IL", 32.8184, 34.9885, _JLM, candle_minutes=30),
+    City("Zikhron Ya'akov", "IL", 32.5707, 34.9566, _JLM, candle_minutes=30),
+    City("Be'er Sheva", "IL", 31.2518, 34.7913, _JLM),
+    City("Ashdod", "IL", 31.8044, 34.6553, _JLM),
+    City("Ashkelon", "IL", 31.6688, 34.5743, _JLM),
+    City("Netanya", "IL", 32.3329, 34.8599, _JLM),
+    City("Petah Tikva", "IL", 32.0871, 34.8878, _JLM),
+    City("Rishon LeZion", "IL", 31.9730, 34.7925, _JLM),
+    City("Rehovot", "IL", 31.8928, 34.8113, _JLM),
+    City("Bnei Brak", "IL", 32.0807, 34.8338, _JLM),
+    City("Ra'anana", "IL", 32.1836, 34.8739, _JLM),
+    City("Herzliya", "IL", 32.1663, 34.8436, _JLM),
+    City("Hadera", "IL", 32.4340, 34.9196, _JLM),
+    City("Modi'in", "IL", 31.8980, 35.0104, _JLM),
+    City("Beit Shemesh", "IL", 31.7470, 34.9881, _JLM),
+    City("Ma'ale Adumim", "IL", 31.7771, 35.2980, _JLM),
+    City("Efrat", "IL", 31.6530, 35.1500, _JLM),
+    City("Ariel", "IL", 32.1046, 35.1745, _JLM),
+    City("Afula", "IL", 32.6078, 35.2897, _JLM),
+    City("Nazareth", "IL", 32.7019, 35.2971, _JLM),
+    City("Tiberias", "IL", 32.7959, 35.5310, _JLM),
+    City("Tzfat", "IL", 32.9646, 35.4960, _JLM),
+    City("Karmiel", "IL", 32.9190, 35.2950, _JLM),
+    City("Kiryat Shmona", "IL", 33.2073, 35.5721, _JLM),
+    City("Dimona", "IL", 31.0700, 35.0330, _JLM),
+    City("Eilat", "IL", 29.5581, 34.9482, _JLM),
+    City("New York", "US", 40.7128, -74.0060, "America/New_York"),
+    City("Lakewood", "US", 40.0821, -74.2097, "America/New_York"),
+    City("Boston", "US", 42.3601, -71.0589, "America/New_York"),
+    City("Philadelphia", "US", 39.9526, -75.1652, "America/New_York"),
+    City("Baltimore", "US", 39.2904, -76.6122, "America/New_York"),
+    City("Washington", "US", 38.9072, -77.0369, "America/New_York"),
+    City("Miami", "US", 25.7617, -80.1918, "America/New_York"),
+    City("Atlanta", "US", 33.7490, -84.3880, "America/New_York"),
+    City("Cleveland", "US", 41.4993, -81.6944, "America/New_York"),
+    City("Chicago", "US", 41.8781, -87.6298, "America/Chicago"),
+    City("Dallas", "US", 32.7767, -96.7970, "America/Chicago"),
+    City("Denver", "US", 39.7392, -104.9903, "America/Denver"),
+    City("Phoenix", "US", 33.4484, -112.0740, "America/Phoenix"),
+    City("Los Angeles", "US", 34.0522, -118.2437, "America/Los_Angeles"),
+    City("San Francisco", "US", 37.7749, -122.4194, "America/Los_Angeles"),
+    City("Seattle", "US", 47.6062, -122.3321, "America/Los_Angeles"),
+    City("Toronto", "CA", 43.6532, -79.3832, "America/Toronto"),
+    City("Montreal", "CA", 45.5017, -73.5673, "America/Toronto"),
+    City("Mexico City", "MX", 19.4326, -99.1332, "America/Mexico_City"),
+    City("Sao Paulo", "BR", -23.5505, -46.6333, "America/Sao_Paulo"),
+    City("Buenos Aires", "AR", -34.6037, -58.3816, "America/Argentina/Buenos_Aires"),
+    City("London", "GB", 51.5074, -0.1278, "Europe/London"),
+    City("Manchester", "GB", 53.4808, -2.2426, "Europe/London"),
+    City("Paris", "FR", 48.8566, 2.3522, "Europe/Paris"),
+    City("Antwerp", "BE", 51.2194, 4.4025, "Europe/Brussels"),
+    City("Amsterdam", "NL", 52.3676, 4.9041, "Europe/Amsterdam"),
+    City("Berlin", "DE", 52.5200, 13.4050, "Europe/Berlin"),
+    City("Zurich", "CH", 47.3769, 8.5417, "Europe/Zurich"),
+    City("Rome", "IT", 41.9028, 12.4964, "Europe/Rome"),
+    City("Vienna", "AT", 48.2082, 16.3738, "Europe/Vienna"),
+    City("Kyiv", "UA", 50.4501, 30.5234, "Europe/Kyiv"),
+    City("Moscow", "RU", 55.7558, 37.6173, "Europe/Moscow"),
+    City("Istanbul", "TR", 41.0082, 28.9784, "Europe/Istanbul"),
+    City("Johannesburg", "ZA", -26.2041, 28.0473, "Africa/Johannesburg"),
+    City("Melbourne", "AU", -37.8136, 144.9631, "Australia/Melbourne"),
+    City("Sydney", "AU", -33.8688, 151.2093, "Australia/Sydney"),
+]
+_BY_NAME = {c.name.lower(): c for c in CITIES}
+
+
+def _unit(lat: float, lon: float) -> tuple[float, float, float]:
+    la, lo = math.radians(lat), math.radians(lon)
+    return (math.cos(la) * math.cos(lo), math.cos(la) * math.sin(lo), math.sin(la))
+
+
+def _build(idx: list, points: list, depth: int = 0):
+    """KD-tree node: ``(city_index, axis, left, right)`` or None."""
+    if not idx:
+        return None
+    axis = depth % 3
+    idx.sort(key=lambda i: points[i][axis])
+    mid = len(idx) // 2
+    return (idx[mid], axis, _build(idx[:mid], points, depth + 1), _build(idx[mid + 1:], points, depth + 1))
+
+
+_POINTS = [_unit(c.lat, c.lon) for c in CITIES]
+_TREE = _build(list(range(len(CITIES))), _POINTS)
+
+
+def check_coordinates(lat, lon) -> tuple[float, float]:
+    """``lat``/``lon`` as floats; ValueError unless finite and within [-90, 90] x [-180, 180]."""
+    lat, lon = float(lat), float(lon)
+    if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"coordinates out of range: {lat}, {lon}")
+    return lat, lon
+
+
+def nearest_city(lat: float, lon: float) -> tuple[City, float]:
+    """Nearest gazetteer city to ``lat``/``lon`` and its great-circle distance in km."""
+    lat, lon = check_coordinates(lat, lon)
+    q = _unit(lat, lon)
+    best_i, best_d2 = -1, float("inf")
+    stack = [(_TREE, 0.0)]  # (node, squared distance from q to the split plane that leads there)
+    while stack:
+        node, plane_d2 = stack.pop()
+        if node is None or plane_d2 >= best_d2:
+            continue
+        i, axis, left, right = node
+        p = _POINTS[i]
+        d2 = (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2
+        if d2 < best_d2:
+            best_i, best_d2 = i, d2
+        diff = q[axis] - p[axis]
+        near, far = (left, right) if diff < 0 else (right, left)
+        # Near side is pushed last so it is searched first
+        stack.append((far, diff * diff))
+        stack.append((near, 0.0))
+    chord = math.sqrt(best_d2)
+    return CITIES[best_i], 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def city_by_name(name: str) -> City | None:
+    return _BY_NAME.get(name.strip().lower())
+
+
+def grid_cell(lat: float, lon: float, km: float) -> tuple[float, float]:
+    """Centre of the roughly ``km`` x ``km`` cell containing ``lat``/``lon``.
+
+    Rows are fixed bands of latitude; each row is split into a whole number of
+    equal longitude steps, so cells stay close to square away from the equator.
+    ``km <= 0`` disables snapping (coordinates are only rounded to ~100 m).
+    """
+    lat, lon = check_coordinates(lat, lon)
+    if km <= 0:
+        return round(lat, 3), round(lon, 3)
+    dlat = km / KM_PER_DEGREE_LAT
+    row = min(math.floor((lat + 90) / dlat), math.floor(180 / dlat))
+    clat = min(90.0, -90 + (row + 0.5) * dlat)
+    cols = max(1, math.floor(360 * KM_PER_DEGREE_LAT * math.cos(math.radians(clat)) / km))
+    dlon = 360 / cols
+    col = math.floor(((lon + 180) % 360) / dlon) % cols
+    return round(clat, 4), round(-180 + (col + 0.5) * dlon, 4)
@@ -0,0 +1,586 @@
+"""Offline luach: holidays, the weekly parsha and Shabbat/yom tov times.
+
+Replaces hebcal's ``/hebcal`` and ``/shabbat`` endpoints. Every schedule has
+an Israel and a diaspora variant (``israel=False``: two-day yom tov, and the
+parsha schedule that follows from it). Holiday
+titles and parsha names follow hebcal's English spelling so the dashboard
+shows the same strings as before.
+
+The parsha schedule is derived rather than tabulated: the readings between
+Bereshit and Tzav (non-leap years) are squeezed into the Shabbatot before
+Pesach, those up to Devarim into the Shabbatot up to Tish'a B'Av, and
+Vaetchanan onwards into the rest of the year, each segment joining the
+standard double parshiyot in a fixed priority order. Shabbatot that fall on
+yom tov or chol hamoed have no parsha.
+
+``year_data`` computes one Hebrew year of all of this per location and is
+cached; ``Luach`` stitches a couple of those years into an array-backed
+table with one slot per day, so the API handlers are pure lookups.
+``shabbat_at`` answers dates outside any table from the same cached years.
+"""
+
+import bisect
+import threading
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from hebrew_calendar import (
+    ADAR_I, ADAR_II, AV, CHESHVAN, ELUL, IYYAR, KISLEV, NISAN, SIVAN, TAMUZ, TISHREI,
+    from_hebrew, is_leap_year, month_length, months_in_year, to_hebrew,
+)
+from zmanim_calc import zmanim_for_dates
+
+PARSHIYOT = [
+    ("Bereshit", "בראשית"), ("Noach", "נח"), ("Lech-Lecha", "לך לך"), ("Vayera", "וירא"),
+    ("Chayei Sara", "חיי שרה"), ("Toldot", "תולדות"), ("Vayetzei", "ויצא"), ("Vayishlach", "וישלח"),
+    ("Vayeshev", "וישב"), ("Miketz", "מקץ"), ("Vayigash", "ויגש"), ("Vayechi", "ויחי"),
+    ("Shemot", "שמות"), ("Vaera", "וארא"), ("Bo", "בא"), ("Beshalach", "בשלח"),
+    ("Yitro", "יתרו"), ("Mishpatim", "משפטים"), ("Terumah", "תרומה"), ("Tetzaveh", "תצוה"),
+    ("Ki Tisa", "כי תשא"), ("Vayakhel", "ויקהל"), ("Pekudei", "פקודי"), ("Vayikra", "ויקרא"),
+    ("Tzav", "צו"), ("Shmini", "שמיני"), ("Tazria", "תזריע"), ("Metzora", "מצרע"),
+    ("Achrei Mot", "אחרי מות"), ("Kedoshim", "קדשים"), ("Emor", "אמור"), ("Behar", "בהר"),
+    ("Bechukotai", "בחקתי"), ("Bamidbar", "במדבר"), ("Nasso", "נשא"), ("Beha'alotcha", "בהעלתך"),
+    ("Sh'lach", "שלח"), ("Korach", "קרח"), ("Chukat", "חקת"), ("Balak", "בלק"),
+    ("Pinchas", "פינחס"), ("Matot", "מטות"), ("Masei", "מסעי"), ("Devarim", "דברים"),
+    ("Vaetchanan", "ואתחנן"), ("Eikev", "עקב"), ("Re'eh", "ראה"), ("Shoftim", "שפטים"),
+    ("Ki Teitzei", "כי תצא"), ("Ki Tavo", "כי תבוא"), ("Nitzavim", "נצבים"), ("Vayeilech", "וילך"),
+    ("Ha'azinu", "האזינו"),
+]
+_P = {name: i for i, (name, _) in enumerate(PARSHIYOT)}
+
+# First parsha of each pair that may be read together, in the order they are joined
+_JOIN_BEFORE_PESACH = (_P["Vayakhel"],)
+_JOIN_BEFORE_AV = (_P["Matot"], _P["Tazria"], _P["Achrei Mot"], _P["Behar"], _P["Chukat"])
+_JOIN_BEFORE_AV_LEAP = (_P["Matot"], _P["Chukat"])
+_JOIN_ELUL = (_P["Nitzavim"],)
+
+SHABBAT = 5  # date.weekday()
+
+CANDLE_MINUTES = 18
+HAVDALAH_MINUTES = 50
+
+
+@dataclass(slots=True, frozen=True)
+class Holiday:
+    """One holiday day. ``subcat`` is major, minor, modern, erev or cholhamoed."""
+    date: date
+    title: str
+    hebrew: str
+    subcat: str
+    yomtov: bool = False
+
+    @property
+    def type(self) -> str:
+        """Badge shown on the holidays widget."""
+        if self.title in ("Yom HaShoah", "Yom HaZikaron"):
+            return "Memorial"
+        if self.subcat == "modern":
+            return "National"
+        return "Religious"
+
+
+def _shabbat_on_or_after(d: date) -> date:
+    return d + timedelta(days=(SHABBAT - d.weekday()) % 7)
+
+
+def _shabbat_on_or_before(d: date) -> date:
+    return d - timedelta(days=(d.weekday() - SHABBAT) % 7)
+
+
+_MOED_DAYS = ((16, "II", "ב׳"), (17, "III", "ג׳"), (18, "IV", "ד׳"), (19, "V", "ה׳"), (20, "VI", "ו׳"))
+_HEB_NUMERALS = ("א׳", "ב׳", "ג׳", "ד׳", "ה׳", "ו׳", "ז׳", "ח׳")
+
+# hebcal's mod=on days besides the four spring ones: (first year, month, day, title, hebrew,
+# weekday moves, observed outside Israel too)
+_MODERN_DAYS = (
+    (5737, KISLEV, 6, "Ben-Gurion Day", "יום בן־גוריון", {4: 2, 5: 1}, False),
+    (5758, CHESHVAN, 12, "Yitzhak Rabin Memorial Day", "יום הזכרון ליצחק רבין", {4: -1, 5: -2}, False),
+    (5764, IYYAR, 10, "Herzl Day", "יום הרצל", {5: 1}, False),
+    (5765, TAMUZ, 29, "Jabotinsky Day", "יום ז׳בוטינסקי", {5: 1}, False),
+    (5769, CHESHVAN, 29, "Sigd", "סיגד", {}, True),
+    (5777, NISAN, 10, "Yom HaAliyah", "יום העלייה", {}, True),
+)
+
+
+def _weekday_shift(d: date, rules: dict) -> date:
+    return d + timedelta(days=rules.get(d.weekday(), 0))
+
+
+def holidays_for_year(year: int, israel: bool = True) -> list[Holiday]:
+    """Holiday days of Hebrew ``year`` (1 Tishrei .. 29 Elul), in date order.
+
+    Outside Israel the second days of Sukkot, Pesach and Shavuot are yom tov,
+    Simchat Torah follows Shmini Atzeret and Pesach has an eighth day.
+    """
+    h = lambda m, d: from_hebrew(year, m, d)  # noqa: E731
+    adar = ADAR_II if is_leap_year(year) else ADAR_I
+    # First day of chol hamoed
+    moed = 16 if israel else 17
+    out = [
+        Holiday(h(TISHREI, 1), f"Rosh Hashana {year}", f"ראש השנה {year}", "major", True),
+        Holiday(h(TISHREI, 2), "Rosh Hashana II", "ראש השנה ב׳", "major", True),
+        Holiday(h(TISHREI, 9), "Erev Yom Kippur", "ערב יום כפור", "erev"),
+        Holiday(h(TISHREI, 10), "Yom Kippur", "יום כפור", "major", True),
+        Holiday(h(TISHREI, 14), "Erev Sukkot", "ערב סוכות", "erev"),
+        Holiday(h(TISHREI, 15), "Sukkot I", "סוכות א׳", "major", True),
+    ]
+    if not israel:
+        out.append(Holiday(h(TISHREI, 16), "Sukkot II", "סוכות ב׳", "major", True))
+    for n, roman, heb in _MOED_DAYS[moed - 16:]:
+        out.append(Holiday(h(TISHREI, n), f"Sukkot {roman} (CH''M)", f"סוכות {heb} (חול המועד)", "cholhamoed"))
+    chanukah = h(KISLEV, 25)
+    out += [
+        Holiday(h(TISHREI, 21), "Sukkot VII (Hoshana Raba)", "סוכות ז׳ (הושענא רבה)", "cholhamoed"),
+        Holiday(h(TISHREI, 22), "Shmini Atzeret", "שמיני עצרת", "major", True),
+    ]
+    if not israel:
+        out.append(Holiday(h(TISHREI, 23), "Simchat Torah", "שמחת תורה", "major", True))
+    out += [
+        Holiday(chanukah - timedelta(days=1), "Chanukah: 1 Candle", "חנוכה: א׳ נר", "major"),
+    ]
+    out += [Holiday(chanukah + timedelta(days=n - 2), f"Chanukah: {n} Candles",
+                    f"חנוכה: {_HEB_NUMERALS[n - 1]} נרות", "major") for n in range(2, 9)]
+    out += [
+        Holiday(chanukah + timedelta(days=7), "Chanukah: 8th Day", "חנוכה: יום ח׳", "major"),
+        Holiday(from_hebrew(year, adar, 13), "Erev Purim", "ערב פורים", "erev"),
+        Holiday(from_hebrew(year, adar, 14), "Purim", "פורים", "major"),
+        Holiday(from_hebrew(year, adar, 15), "Shushan Purim", "שושן פורים", "minor"),
+        Holiday(h(NISAN, 14), "Erev Pesach", "ערב פסח", "erev"),
+        Holiday(h(NISAN, 15), "Pesach I", "פסח א׳", "major", True),
+    ]
+    if not israel:
+        out.append(Holiday(h(NISAN, 16), "Pesach II", "פסח ב׳", "major", True))
+    for n, roman, heb in _MOED_DAYS[moed - 16:]:
+        out.append(Holiday(h(NISAN, n), f"Pesach {roman} (CH''M)", f"פסח {heb} (חול המועד)", "cholhamoed"))
+    out.append(Holiday(h(NISAN, 21), "Pesach VII", "פסח ז׳", "major", True))
+    if not israel:
+        out.append(Holiday(h(NISAN, 22), "Pesach VIII", "פסח ח׳", "major", True))
+
+    # Modern days of remembrance and celebration, moved off Shabbat and its edges
+    if year >= 5711:
+        shoah = h(NISAN, 27)
+        if year >= 5758:
+            shoah = _weekday_shift(shoah, {4: -1, 6: 1})
+        out.append(Holiday(shoah, "Yom HaShoah", "יום השואה", "modern"))
+    if year >= 5708:
+        atzmaut = _weekday_shift(h(IYYAR, 5), {4: -1, 5: -2})
+        if year >= 5764:
+            atzmaut = _weekday_shift(atzmaut, {0: 1})
+        out.append(Holiday(atzmaut - timedelta(days=1), "Yom HaZikaron", "יום הזכרון", "modern"))
+        out.append(Holiday(atzmaut, "Yom HaAtzma'ut", "יום העצמאות", "modern"))
+    if year >= 5728:
+        out.append(Holiday(h(IYYAR, 28), "Yom Yerushalayim", "יום ירושלים", "modern"))
+    for first, month, day, title, hebrew, moves, chul in _MODERN_DAYS:
+        if year >= first and (israel or chul):
+            out.append(Holiday(_weekday_shift(h(month, day), moves), title, hebrew, "modern"))
+
+    out += [
+        Holiday(h(SIVAN, 5), "Erev Shavuot", "ערב שבועות", "erev"),
+    ]
+    if israel:
+        out.append(Holiday(h(SIVAN, 6), "Shavuot", "שבועות", "major", True))
+    else:
+        out += [
+            Holiday(h(SIVAN, 6), "Shavuot I", "שבועות א׳", "major", True),
+            Holiday(h(SIVAN, 7), "Shavuot II", "שבועות ב׳", "major", True),
+        ]
+    av9 = h(AV, 9)
+    if av9.weekday() == SHABBAT:
+        out += [
+            Holiday(av9, "Erev Tish'a B'Av", "ערב תשעה באב", "erev"),
+            Holiday(av9 + timedelta(days=1), "Tish'a B'Av (observed)", "תשעה באב נדחה", "major"),
+        ]
+    else:
+        out += [
+            Holiday(av9 - timedelta(days=1), "Erev Tish'a B'Av", "ערב תשעה באב", "erev"),
+            Holiday(av9, "Tish'a B'Av", "תשעה באב", "major"),
+        ]
+    out.append(Holiday(h(ELUL, 29), "Erev Rosh Hashana", "ערב ראש השנה", "erev"))
+    out.sort(key=lambda x: x.date)
+    return out
+
+
+def _no_parsha(d: date, israel: bool) -> bool:
+    """Shabbatot on which the holiday reading replaces the parsha."""
+    _, m, day = to_hebrew(d)
+    extra = 0 if israel else 1
+    if m == TISHREI:
+        return day in (1, 2, 10) or 15 <= day <= 22 + extra
+    return (m == NISAN and 15 <= day <= 21 + extra) or (m == SIVAN and 6 <= day <= 6 + extra)
+
+
+def _shabbatot(start: date, end: date, israel: bool) -> list[date]:
+    """Shabbatot in ``start..end`` (inclusive) that have a parsha."""
+    out = []
+    d = _shabbat_on_or_after(start)
+    while d <= end:
+        if not _no_parsha(d, israel):
+            out.append(d)
+        d += timedelta(days=7)
+    return out
+
+
+def _assign(slots: list, first: int, last: int, joins: tuple, out: dict) -> int:
+    """Read parshiyot ``first..last`` over ``slots``, joining pairs from ``joins`` as needed.
+
+    Returns the index of the next unread parsha.
+    """
+    joins = [j for j in joins if first <= j < last]
+    joined = set(joins[:max(0, last - first + 1 - len(slots))])
+    i = first
+    for d in slots:
+        if i > last:
+            break
+        if i in joined:
+            out[d] = (i, i + 1)
+            i += 2
+        else:
+            out[d] = (i,)
+            i += 1
+    return i
+
+
+def parsha_for_year(year: int, israel: bool = True) -> dict[date, tuple]:
+    """Parsha schedule for Hebrew ``year``: ``{shabbat: (index,) or (index, index + 1)}``."""
+    out = {}
+    fall = _shabbatot(from_hebrew(year, TISHREI, 1), from_hebrew(year, TISHREI, 22), israel)
+    if len(fall) > 1:
+        out[fall[0]] = (_P["Vayeilech"],)
+    out[fall[-1]] = (_P["Ha'azinu"],)
+
+    pesach = from_hebrew(year, NISAN, 15)
+    chazon = _shabbat_on_or_before(from_hebrew(year, AV, 9))
+    before_pesach = _shabbatot(from_hebrew(year, TISHREI, 22), pesach - timedelta(days=1), israel)
+    if is_leap_year(year):
+        # No joins before Pesach; wherever the reading stands then is where it stands
+        nxt = _assign(before_pesach, 0, len(before_pesach) - 1, (), out)
+        joins = _JOIN_BEFORE_AV_LEAP
+    else:
+        nxt = _assign(before_pesach, 0, _P["Tzav"], _JOIN_BEFORE_PESACH, out)
+        joins = _JOIN_BEFORE_AV
+    _assign(_shabbatot(pesach, chazon, israel), nxt, _P["Devarim"], joins, out)
+
+    # Vayeilech joins Nitzavim unless next year has two free Shabbatot before Sukkot
+    next_fall = _shabbatot(from_hebrew(year + 1, TISHREI, 1), from_hebrew(year + 1, TISHREI, 22), israel)
+    last = _P["Nitzavim"] if len(next_fall) > 1 else _P["Vayeilech"]
+    end = from_hebrew(year + 1, TISHREI, 1) - timedelta(days=1)
+    _assign(_shabbatot(chazon + timedelta(days=1), end, israel), _P["Vaetchanan"], last, _JOIN_ELUL, out)
+    return out
+
+
+def parsha_name(indices: tuple, hebrew: bool = False) -> str:
+    """``Parashat Vayakhel-Pekudei`` / ``פרשת ויקהל־פקודי``."""
+    if hebrew:
+        return "פרשת " + "־".join(PARSHIYOT[i][1] for i in indices)
+    return "Parashat " + "-".join(PARSHIYOT[i][0] for i in indices)
+
+
+def _fmt_time(t: datetime) -> str:
+    """hebcal-style ``6:13pm``."""
+    return f"{t.hour % 12 or 12}:{t.minute:02d}{'am' if t.hour < 12 else 'pm'}"
+
+
+@dataclass(slots=True, frozen=True)
+class TimeEvent:
+    """Candle lighting or havdalah at a specific moment."""
+    kind: str  # candles | havdalah
+    time: datetime
+    havdalah_minutes: int
+
+    @property
+    def title(self) -> str:
+        if self.kind == "candles":
+            return f"Candle lighting: {_fmt_time(self.time)}"
+        return f"Havdalah ({self.havdalah_minutes} min): {_fmt_time(self.time)}"
+
+    def as_dict(self) -> dict:
+        return {"title": self.title, "time": self.time.isoformat()}
+
+
+@dataclass(slots=True)
+class YearData:
+    """Everything the luach knows about one Hebrew year at one location.
+
+    ``time_days`` holds the ordinal day of each entry in ``times``.
+    """
+    year: int
+    holidays: list
+    parsha: dict
+    time_days: list
+    times: list
+
+
+def _times_for_year(year: int, holidays: list, lat: float, lon: float, tzinfo,
+                    candle_minutes: int, havdalah_minutes: int) -> tuple[list, list]:
+    """Candle lighting and havdalah on the edges of every Shabbat and yom tov of ``year``."""
+    start = from_hebrew(year, TISHREI, 1)
+    end = from_hebrew(year + 1, TISHREI, 1) - timedelta(days=1)
+    # Rosh Hashana of the next year decides what happens on the last day
+    yomtov = {x.date for x in holidays if x.yomtov} | {end + timedelta(days=1), end + timedelta(days=2)}
+
+    def holy(d):
+        return d.weekday() == SHABBAT or d in yomtov
+
+    edges = []
+    d = start
+    while d <= end:
+        today, tomorrow = holy(d), holy(d + timedelta(days=1))
+        if tomorrow:
+            # Lighting for a following day of yom tov waits for nightfall, except into Shabbat
+            at_night = today and (d.weekday() == SHABBAT or (d + timedelta(days=1)).weekday() != SHABBAT)
+            edges.append((d, "candles", at_night))
+        elif today:
+            edges.append((d, "havdalah", True))
+        d += timedelta(days=1)
+    sunsets = zmanim_for_dates([e[0] for e in edges], lat, lon, tzinfo)["sunset"]
+    time_days, times = [], []
+    for (d, kind, at_night), sunset in zip(edges, sunsets):
+        if sunset is None:
+            continue
+        offset = havdalah_minutes if at_night else -candle_minutes
+        time_days.append(d.toordinal())
+        times.append(TimeEvent(kind, sunset + timedelta(minutes=offset), havdalah_minutes))
+    return time_days, times
+
+
+# (year, lat, lon, tz, israel, candle, havdalah) -> YearData; dateutil zones are not hashable, so key on repr
+_year_cache = {}
+_year_cache_lock = threading.Lock()
+YEAR_CACHE_MAX = 64
+
+
+def year_data(year: int, lat: float, lon: float, tzinfo, israel: bool = True,
+              candle_minutes: int = CANDLE_MINUTES, havdalah_minutes: int = HAVDALAH_MINUTES) -> YearData:
+    """Holidays, parsha and times for Hebrew ``year``, computed once per year and location."""
+    key = (year, lat, lon, repr(tzinfo), israel, candle_minutes, havdalah_minutes)
+    with _year_cache_lock:
+        data = _year_cache.get(key)
+    if data is None:
+        # Computed outside the lock; if two threads race, the first one stored wins
+        holidays = holidays_for_year(year, israel)
+        time_days, times = _times_for_year(year, holidays, lat, lon, tzinfo, candle_minutes, havdalah_minutes)
+        data = YearData(year, holidays, parsha_for_year(year, israel), time_days, times)
+        with _year_cache_lock:
+            if key not in _year_cache:
+                while len(_year_cache) >= YEAR_CACHE_MAX:
+                    _year_cache.pop(next(iter(_year_cache)))
+                _year_cache[key] = data
+            data = _year_cache[key]
+    return data
+
+
+# Per-day flag bits in ``Luach``'s day table
+FLAG_HOLIDAY = 1
+FLAG_YOMTOV = 2
+FLAG_CHOLHAMOED = 4
+FLAG_EREV = 8
+FLAG_MODERN = 16
+_SUBCAT_FLAGS = {"cholhamoed": FLAG_CHOLHAMOED, "erev": FLAG_EREV, "modern": FLAG_MODERN}
+
+
+def _fill_next(marks, n: int, none: int) -> array:
+    """``out[i]`` = the first ``marks[j]`` that is set (not -1) for j >= i, else ``none``."""
+    out = array("h", [none]) * n
+    nxt = none
+    for i in range(n - 1, -1, -1):
+        if marks[i] >= 0:
+            nxt = marks[i]
+        out[i] = nxt
+    return out
+
+
+class Luach:
+    """Holidays, parsha, candle/havdalah times and Hebrew dates for one location over a date window.
+
+    The window is stitched together from the cached ``year_data`` of every
+    Hebrew year it touches, so moving the window forward only computes the
+    year that was added. It is then laid out as a day table: one slot per
+    Gregorian day in typed arrays (Hebrew date, flag bits, parsha, today's
+    candle/havdalah event, and the index of the next holiday and next
+    event), so every lookup is a subtraction and an index.
+    """
+
+    def __init__(self, start: date, end: date, lat: float, lon: float, tzinfo, israel: bool = True,
+                 candle_minutes: int = CANDLE_MINUTES, havdalah_minutes: int = HAVDALAH_MINUTES):
+        self.start, self.end = start, end
+        self.tzinfo = tzinfo
+        self.israel = israel
+        self.candle_minutes = candle_minutes
+        self.havdalah_minutes = havdalah_minutes
+        self._lo = lo = start.toordinal()
+        hi = end.toordinal()
+        n = hi - lo + 1
+
+        self.holidays = []
+        self._times = []
+        self._flags = array("B", [0]) * n
+        self._parsha_a = array("b", [-1]) * n
+        self._parsha_b = array("b", [-1]) * n
+        holiday_marks = array("h", [-1]) * n
+        candle_marks = array("h", [-1]) * n
+        havdalah_marks = array("h", [-1]) * n
+        for y in range(to_hebrew(start)[0], to_hebrew(end)[0] + 1):
+            data = year_data(y, lat, lon, tzinfo, israel, candle_minutes, havdalah_minutes)
+            for x in data.holidays:
+                if start <= x.date <= end:
+                    k = x.date.toordinal() - lo
+                    if holiday_marks[k] < 0:
+                        holiday_marks[k] = len(self.holidays)
+                    self._flags[k] |= FLAG_HOLIDAY | _SUBCAT_FLAGS.get(x.subcat, 0) | (FLAG_YOMTOV if x.yomtov else 0)
+                    self.holidays.append(x)
+            for d, idx in data.parsha.items():
+                if start <= d <= end:
+                    k = d.toordinal() - lo
+                    self._parsha_a[k] = idx[0]
+                    if len(idx) > 1:
+                        self._parsha_b[k] = idx[1]
+            i, j = bisect.bisect_left(data.time_days, lo), bisect.bisect_right(data.time_days, hi)
+            for day, ev in zip(data.time_days[i:j], data.times[i:j]):
+                marks = candle_marks if ev.kind == "candles" else havdalah_marks
+                marks[day - lo] = len(self._times)
+                self._times.append(ev)
+        self._holiday_from = _fill_next(holiday_marks, n, len(self.holidays))
+        self._next_candles = _fill_next(candle_marks, n, -1)
+        self._next_havdalah = _fill_next(havdalah_marks, n, -1)
+
+        # Hebrew dates by walking the calendar forward from the first day
+        self._heb_year = array("H", [0]) * n
+        self._heb_month = array("B", [0]) * n
+        self._heb_day = array("B", [0]) * n
+        hy, hm, hd = to_hebrew(start)
+        month_len = month_length(hy, hm)
+        for k in range(n):
+            self._heb_year[k], self._heb_month[k], self._heb_day[k] = hy, hm, hd
+            hd += 1
+            if hd > month_len:
+                hd = 1
+                if hm == ELUL:
+                    hy, hm = hy + 1, TISHREI
+                elif hm == months_in_year(hy):
+                    hm = NISAN
+                else:
+                    hm += 1
+                month_len = month_length(hy, hm)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the day table's arrays."""
+        arrays = (self._flags, self._parsha_a, self._parsha_b, self._holiday_from, self._next_candles,
+                  self._next_havdalah, self._heb_year, self._heb_month, self._heb_day)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def __len__(self) -> int:
+        return len(self._flags)
+
+    def covers(self, d: date) -> bool:
+        return self.start <= d <= self.end
+
+    def _slot(self, d: date) -> int | None:
+        """Day-table index of ``d``; days before the window map to its first day."""
+        k = d.toordinal() - self._lo
+        if k >= len(self._flags):
+            return None
+        return max(k, 0)
+
+    def hebrew_date(self, d: date) -> tuple[int, int, int]:
+        """``(year, month, day)``, like ``hebrew_calendar.to_hebrew`` but a table read inside the window."""
+        if not self.covers(d):
+            return to_hebrew(d)
+        k = d.toordinal() - self._lo
+        return self._heb_year[k], self._heb_month[k], self._heb_day[k]
+
+    def flags(self, d: date) -> int:
+        return self._flags[d.toordinal() - self._lo] if self.covers(d) else 0
+
+    def upcoming_holidays(self, d: date, limit: int = 10, exclude=("cholhamoed",)) -> list[Holiday]:
+        """Holidays on or after ``d``."""
+        k = self._slot(d)
+        if k is None:
+            return []
+        out = []
+        for x in self.holidays[self._holiday_from[k]:]:
+            if x.subcat in exclude:
+                continue
+            out.append(x)
+            if len(out) >= limit:
+                break
+        return out
+
+    def holidays_on(self, d: date) -> list[Holiday]:
+        if not self.flags(d) & FLAG_HOLIDAY:
+            return []
+        i = self._holiday_from[d.toordinal() - self._lo]
+        out = []
+        while i < len(self.holidays) and self.holidays[i].date == d:
+            out.append(self.holidays[i])
+            i += 1
+        return out
+
+    def parsha(self, shabbat: date) -> tuple | None:
+        """Parsha indices read on ``shabbat``, None on a holiday Shabbat."""
+        if not self.covers(shabbat):
+            return None
+        k = shabbat.toordinal() - self._lo
+        a, b = self._parsha_a[k], self._parsha_b[k]
+        if a < 0:
+            return None
+        return (a,) if b < 0 else (a, b)
+
+    def next_time(self, kind: str, d: date) -> TimeEvent | None:
+        """First ``kind`` event on or after day ``d``."""
+        k = self._slot(d)
+        if k is None:
+            return None
+        i = (self._next_candles if kind == "candles" else self._next_havdalah)[k]
+        return self._times[i] if i >= 0 else None
+
+    def shabbat(self, now: datetime) -> dict:
+        """The coming Shabbat: Friday candle lighting, the havdalah that ends it, and its parsha.
+
+        Rolls over to the next week once Saturday's havdalah has passed.
+        """
+        return _shabbat(now, self.next_time, self.parsha, self.holidays_on)
+
+
+def _shabbat(now: datetime, next_time, parsha, holidays_on) -> dict:
+    today = now.date()
+    sat = _shabbat_on_or_after(today)
+    havdalah = next_time("havdalah", sat)
+    if sat == today and havdalah and now > havdalah.time:
+        sat += timedelta(days=7)
+        havdalah = next_time("havdalah", sat)
+    friday = sat - timedelta(days=1)
+    candle = next_time("candles", friday)
+    if candle and candle.time.date() != friday:
+        candle = None
+    return {
+        "date": sat,
+        "candle": candle,
+        "havdalah": havdalah,
+        "parsha": parsha(sat),
+        "holidays": holidays_on(sat),
+    }
+
+
+def shabbat_at(now: datetime, lat: float, lon: float, tzinfo, israel: bool = True,
+               candle_minutes: int = CANDLE_MINUTES, havdalah_minutes: int = HAVDALAH_MINUTES) -> dict:
+    """``Luach.shabbat`` for any date, read straight from the cached ``year_data`` without a day table."""
+    args = (lat, lon, tzinfo, israel, candle_minutes, havdalah_minutes)
+
+    def next_time(kind, d):
+        year = to_hebrew(d)[0]
+        for y in (year, year + 1):
+            data = year_data(y, *args)
+            for ev in data.times[bisect.bisect_left(data.time_days, d.toordinal()):]:
+                if ev.kind == kind:
+                    return ev
+        return None
+
+    def parsha(d):
+        return year_data(to_hebrew(d)[0], *args).parsha.get(d)
+
+    def holidays_on(d):
+        return [x for x in year_data(to_hebrew(d)[0], *args).holidays if x.date == d]
+
+    return _shabbat(now, next_time, parsha, holidays_on)
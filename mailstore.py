@@ -0,0 +1,298 @@
+"""Local Gmail state: decoded message bodies, sync cursors, label counters and search."""
+
+import base64
+import bisect
+import codecs
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+# Base64 chunk size used for incremental body decoding (must be a multiple of 4)
+_B64_CHUNK = 8192
+
+
+def decode_b64_text(data: str, limit: int) -> str:
+    """Decode a base64url body to text, stopping as soon as ``limit`` chars are produced."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    out = []
+    produced = 0
+    total = len(data)
+    for i in range(0, total, _B64_CHUNK):
+        chunk = data[i:i + _B64_CHUNK]
+        final = i + _B64_CHUNK >= total
+        if final:
+            chunk += "=" * (-len(chunk) % 4)
+        text = decoder.decode(base64.urlsafe_b64decode(chunk), final=final)
+        out.append(text)
+        produced += len(text)
+        if produced >= limit:
+            break
+    return "".join(out)[:limit]
+
+
+def extract_body(payload: dict | None, limit: int) -> str | None:
+    """Return the first text/plain or text/html part of a Gmail MIME tree, truncated to ``limit``."""
+    if not payload:
+        return None
+    data = payload.get("body", {}).get("data")
+    mime = payload.get("mimeType")
+    if data and (mime == "text/plain" or mime == "text/html"):
+        try:
+            return decode_b64_text(data, limit)
+        except Exception:
+            return None
+    for part in (payload.get("parts") or []):
+        txt = extract_body(part, limit)
+        if txt:
+            return txt
+    return None
+
+
+class BoundedLRU:
+    """Thread-safe LRU keyed by message id, bounded by the summed ``size`` of its entries.
+
+    Decoded bodies use their character count as size, so a handful of long
+    messages cannot crowd out memory; metadata records use a size of 1.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()  # msg_id -> (size, value)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return hit[1]
+
+    def put(self, key, value, size: int = 1):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old[0]
+            self._items[key] = (size, value)
+            self._size += size
+            while self._size > self.max_size and len(self._items) > 1:
+                _, (evicted, _) = self._items.popitem(last=False)
+                self._size -= evicted
+                self.evictions += 1
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+@dataclass(slots=True)
+class AccountSync:
+    """Incremental sync cursor for one Gmail account."""
+    history_id: str | None = None
+    counts: dict = field(default_factory=dict)
+    checked_at: float = 0.0
+    new_ids: list = field(default_factory=list)
+
+
+class SyncState:
+    """Per-account Gmail ``historyId`` cursors and the label counters seen at that cursor.
+
+    ``advance`` is fed the result of ``history.list``; the counters only need to be
+    re-read from ``labels.get`` when the mailbox history has actually moved.
+    """
+
+    def __init__(self):
+        self._accounts = {}
+        self._lock = threading.Lock()
+
+    def get(self, account: str) -> AccountSync:
+        with self._lock:
+            st = self._accounts.get(account)
+            if st is None:
+                st = self._accounts[account] = AccountSync()
+            return st
+
+    def advance(self, account: str, history_id: str | None, counts: dict | None = None, added_ids=()):
+        with self._lock:
+            st = self._accounts.setdefault(account, AccountSync())
+            if history_id:
+                st.history_id = str(history_id)
+            if counts is not None:
+                st.counts = counts
+            if added_ids:
+                st.new_ids.extend(added_ids)
+                del st.new_ids[:-500]
+            st.checked_at = time.time()
+
+    def take_new_ids(self, account: str, limit: int | None = None) -> list:
+        """Return and clear message ids added since the last call.
+
+        With ``limit``, only the newest ``limit`` are taken; the rest stay queued for the next call.
+        """
+        with self._lock:
+            st = self._accounts.get(account)
+            if st is None or not st.new_ids:
+                return []
+            if limit is None or len(st.new_ids) <= limit:
+                ids, st.new_ids = st.new_ids, []
+            else:
+                ids, st.new_ids = st.new_ids[-limit:], st.new_ids[:-limit]
+            return ids
+
+    def reset(self, account: str):
+        with self._lock:
+            self._accounts.pop(account, None)
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercased word tokens (Hebrew included) of two or more characters."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+class SearchIndex:
+    """Inverted index over subject, from and snippet of every synced message.
+
+    Documents are the same dicts ``/api/emails`` returns. The index is capped at
+    ``max_docs`` (oldest messages are evicted first) and only the documents are
+    persisted; postings are rebuilt on load, which keeps the file small.
+    """
+
+    def __init__(self, path, max_docs: int = 5000, save_interval: float = 30.0):
+        self.path = path
+        self.max_docs = max_docs
+        self.save_interval = save_interval
+        self._docs = {}  # msg_id -> (sort_ts, doc)
+        self._postings = {}  # token -> set(msg_id)
+        self._vocab = []  # sorted tokens, rebuilt lazily for prefix lookups
+        self._vocab_dirty = False
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except Exception:
+            return
+        for ts, doc in rows:
+            self._add_locked(doc, ts)
+        self._dirty = False
+
+    def _tokens(self, doc: dict) -> set:
+        return set(tokenize(doc.get("subject")) + tokenize(doc.get("from")) + tokenize(doc.get("snippet")))
+
+    def _add_locked(self, doc: dict, ts: float):
+        msg_id = doc.get("id")
+        if not msg_id or msg_id in self._docs:
+            return False
+        self._docs[msg_id] = (ts, doc)
+        for tok in self._tokens(doc):
+            self._postings.setdefault(tok, set()).add(msg_id)
+        self._vocab_dirty = True
+        return True
+
+    def _remove_locked(self, msg_id: str):
+        ts, doc = self._docs.pop(msg_id)
+        for tok in self._tokens(doc):
+            ids = self._postings.get(tok)
+            if ids is not None:
+                ids.discard(msg_id)
+                if not ids:
+                    del self._postings[tok]
+        self._vocab_dirty = True
+
+    def add(self, records) -> int:
+        """Index ``EmailMessage`` records not seen before; returns how many were new."""
+        added = 0
+        with self._lock:
+            for rec in records:
+                ts = rec.sort_ts if rec.sort_ts != float("-inf") else 0.0
+                if self._add_locked(rec.as_dict(), ts):
+                    added += 1
+            if len(self._docs) > self.max_docs:
+                # Evict down to 90% of the cap so eviction work is amortized
+                keep = int(self.max_docs * 0.9)
+                oldest = sorted(self._docs.items(), key=lambda kv: kv[1][0])
+                for msg_id, _ in oldest[:len(self._docs) - keep]:
+                    self._remove_locked(msg_id)
+            if added:
+                self._dirty = True
+        self.maybe_save()
+        return added
+
+    def _ids_for(self, token: str, prefix: bool) -> set:
+        if not prefix:
+            return self._postings.get(token, set())
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        out = set()
+        i = bisect.bisect_left(self._vocab, token)
+        while i < len(self._vocab) and self._vocab[i].startswith(token):
+            out |= self._postings[self._vocab[i]]
+            i += 1
+        return out
+
+    def search(self, query: str, account: str | None = None, limit: int = 20) -> list[dict]:
+        """AND-match every query term (the last one as a prefix), newest first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            # Intersect from the rarest posting list up
+            sets = [self._ids_for(t, i == len(terms) - 1) for i, t in enumerate(terms)]
+            sets.sort(key=len)
+            ids = set(sets[0])
+            for other in sets[1:]:
+                ids &= other
+                if not ids:
+                    return []
+            hits = [self._docs[i] for i in ids]
+        if account:
+            account = account.lower()
+            hits = [h for h in hits if (h[1].get("account") or "") == account]
+        hits.sort(key=lambda h: h[0], reverse=True)
+        return [doc for _, doc in hits[:limit]]
+
+    def maybe_save(self, force: bool = False):
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            if not force and now - self._saved_at < self.save_interval:
+                return
+            rows = list(self._docs.values())
+            self._dirty = False
+            self._saved_at = now
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rows, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"Failed to save email index: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
@@ -0,0 +1,193 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are plain dicts keyed by label values, each family
+behind its own lock; recording a sample is a dict lookup plus, for
+histograms, a bisection over the bucket bounds. ``Registry.render`` writes
+the whole set as ``text/plain; version=0.0.4`` for ``/metrics``.
+
+``timed_get`` and ``timed_execute`` wrap the two kinds of upstream calls the
+dashboard makes (``requests.get`` and Google API client requests) and record
+their latency, status and response size per host.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, *labels, value: float):
+        """For totals counted elsewhere (copied in at scrape time)."""
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, row in items:
+            total = 0
+            for bound, n in zip(self.buckets + (float("inf"),), row):
+                total += n
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(round(row[-1], 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {total}")
+        return lines
+
+
+class Registry:
+    """The dashboard's metric families."""
+
+    def __init__(self, prefix: str = "dash"):
+        p = prefix
+        self.request_seconds = Histogram(f"{p}_http_request_duration_seconds",
+                                         "Time spent serving requests, by route", ("route", "method"))
+        self.requests = Counter(f"{p}_http_requests_total", "Requests served, by route and status",
+                                ("route", "method", "status"))
+        self.upstream_seconds = Histogram(f"{p}_upstream_request_duration_seconds",
+                                          "Latency of upstream calls, by host", ("host",))
+        self.upstream_requests = Counter(f"{p}_upstream_requests_total", "Upstream calls, by host and status",
+                                         ("host", "status"))
+        self.upstream_bytes = Counter(f"{p}_upstream_response_bytes_total",
+                                      "Response bytes received from upstreams, by host", ("host",))
+        self.upstream_not_modified = Counter(f"{p}_upstream_not_modified_total",
+                                             "Conditional GETs answered 304, by upstream", ("upstream",))
+        self.upstream_bytes_saved = Counter(f"{p}_upstream_bytes_saved_total",
+                                            "Body bytes not re-sent thanks to 304s, by upstream", ("upstream",))
+        self.cache = Counter(f"{p}_cache_requests_total", "Cache lookups, by key prefix and result",
+                             ("prefix", "result"))
+        self.cache_evictions = Counter(f"{p}_cache_evictions_total",
+                                       "Cache entries dropped (invalidated or over capacity), by key prefix",
+                                       ("prefix",))
+        self.cache_expired = Counter(f"{p}_cache_expired_total",
+                                     "Cache lookups that found an expired entry (also counted as misses), by key prefix",
+                                     ("prefix",))
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float):
+        self.request_seconds.observe(seconds, route, method)
+        self.requests.inc(route, method, str(status))
+
+    def observe_upstream(self, host: str, status, seconds: float, size: int = 0):
+        self.upstream_seconds.observe(seconds, host)
+        self.upstream_requests.inc(host, str(status))
+        if size:
+            self.upstream_bytes.inc(host, amount=size)
+
+    def cache_lookup(self, key: str, hit: bool):
+        self.cache.inc(key.split(":", 1)[0], "hit" if hit else "miss")
+
+    def cache_evicted(self, key: str, n: int = 1):
+        self.cache_evictions.inc(key.split(":", 1)[0], amount=n)
+
+    def cache_expiry(self, key: str):
+        self.cache_expired.inc(key.split(":", 1)[0])
+
+    def render(self) -> str:
+        lines = []
+        for family in vars(self).values():
+            if isinstance(family, (Counter, Histogram)):
+                lines += family.render()
+        return "\n".join(lines) + "\n"
+
+
+def timed_get(metrics: Registry, get, url: str, **kwargs):
+    """``get(url, **kwargs)`` (``requests.get``), recording latency, status and size for the URL's host.
+
+    Streamed responses count their ``Content-Length``; their latency is the time to the headers.
+    """
+    host = urlsplit(url).netloc or url
+    start = time.perf_counter()
+    try:
+        r = get(url, **kwargs)
+    except Exception:
+        metrics.observe_upstream(host, "error", time.perf_counter() - start)
+        raise
+    if kwargs.get("stream"):
+        size = int(r.headers.get("Content-Length") or 0)
+    else:
+        size = len(r.content or b"")
+    metrics.observe_upstream(host, r.status_code, time.perf_counter() - start, size)
+    return r
+
+
+def timed_execute(metrics: Registry, req):
+    """``req.execute()`` for a Google API client request, recording latency, status and size per host."""
+    host = urlsplit(getattr(req, "uri", "") or "").netloc or "googleapis.com"
+    size = 0
+    postproc = getattr(req, "postproc", None)
+    if postproc is not None:
+        def counting(resp, content):
+            nonlocal size
+            size = len(content or b"")
+            return postproc(resp, content)
+        req.postproc = counting
+    start = time.perf_counter()
+    status = "error"
+    try:
+        result = req.execute()
+        status = 200
+        return result
+    except Exception as e:
+        status = getattr(getattr(e, "resp", None), "status", None) or "error"
+        raise
+    finally:
+        metrics.observe_upstream(host, status, time.perf_counter() - start, size)
@@ -0,0 +1,382 @@
+"""News aggregation: parallel feed fetches, streaming RSS/Atom parsing and
+near-duplicate removal.
+
+Feeds are read chunk by chunk into an incremental XML parser, so headlines
+are produced while the body is still arriving and a feed is abandoned as
+soon as enough entries have been read. The same story syndicated by several
+outlets is collapsed by comparing word-bigram shingles of the normalised
+headlines; candidate matches are found through a shingle -> headline index
+rather than by comparing every pair.
+"""
+
+import bisect
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from mailstore import tokenize
+
+try:
+    import feedparser  # type: ignore
+except Exception:  # pragma: no cover
+    feedparser = None
+
+SUMMARY_LIMIT = 200
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+_ENTITY_RE = re.compile(r"&(nbsp|amp|lt|gt|quot|#39);")
+_ENTITIES = {"nbsp": " ", "amp": "&", "lt": "<", "gt": ">", "quot": '"', "#39": "'"}
+# Shared by all refreshes; a feed that overruns its deadline finishes in the background
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="news")
+
+
+@dataclass(slots=True)
+class Headline:
+    title: str
+    link: str | None
+    published: str | None  # as the feed wrote it
+    source: str | None
+    summary: str | None
+    ts: float  # published time (or fetch time) as a UNIX timestamp, for ordering
+
+    def as_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "link": self.link,
+            "published": self.published,
+            "source": self.source,
+            "summary": self.summary,
+        }
+
+
+def clean_html(text: str | None, limit: int = SUMMARY_LIMIT) -> str | None:
+    """Strip tags and collapse whitespace; None for empty text."""
+    if not text:
+        return None
+    text = _SPACE_RE.sub(" ", _ENTITY_RE.sub(lambda m: _ENTITIES[m.group(1)], _TAG_RE.sub(" ", text))).strip()
+    if not text:
+        return None
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def _timestamp(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)  # RSS: RFC 822
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))  # Atom: RFC 3339
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _headline(fields: dict, feed_title: str | None, fetched: float) -> Headline | None:
+    title = clean_html(fields.get("title"), limit=1000)
+    if not title:
+        return None
+    source = fields.get("source")
+    if " - " in title and (not source or title.endswith(" - " + source)):
+        # Google News format: "Title - Source"
+        title, source = title.rsplit(" - ", 1)
+    published = fields.get("pubDate") or fields.get("published") or fields.get("updated")
+    return Headline(
+        title=title,
+        link=fields.get("link"),
+        published=published,
+        source=source or feed_title,
+        summary=clean_html(fields.get("description") or fields.get("summary") or fields.get("content")),
+        ts=_timestamp(published) or fetched,
+    )
+
+
+class FeedParser:
+    """Incremental RSS 2.0 / Atom parser: ``feed(chunk)`` returns the headlines completed so far."""
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._depth_in_item = 0
+        self._fields = {}
+        self.feed_title = None
+        self.fetched = time.time()
+
+    def feed(self, chunk: bytes) -> list[Headline]:
+        self._parser.feed(chunk)
+        out = []
+        for event, elem in self._parser.read_events():
+            tag = _local(elem.tag)
+            if event == "start":
+                if tag in ("item", "entry"):
+                    self._depth_in_item += 1
+                    self._fields = {}
+                continue
+            if tag in ("item", "entry"):
+                self._depth_in_item -= 1
+                h = _headline(self._fields, self.feed_title, self.fetched)
+                if h is not None:
+                    out.append(h)
+                elem.clear()
+            elif self._depth_in_item:
+                if tag == "link" and elem.get("href"):
+                    if elem.get("rel", "alternate") == "alternate":
+                        self._fields["link"] = elem.get("href")
+                elif elem.text and tag not in self._fields:
+                    self._fields[tag] = elem.text.strip()
+            elif tag == "title" and self.feed_title is None and elem.text:
+                self.feed_title = elem.text.strip()
+        return out
+
+
+def fetch_feed(get, url: str, timeout: float, limit: int, conditional=None) -> list[Headline]:
+    """Stream one feed with ``get`` (``requests.get``), stopping after ``limit`` entries or ``timeout`` seconds.
+
+    With a ``ConditionalGet`` the request carries the feed's last validators and
+    a 304 returns the headlines parsed from the previous full response. Only a
+    document read to the end (or to ``limit`` entries, which a re-read would
+    give again) is kept for 304s; one cut short by the deadline or a parse
+    error is counted but not kept, so later 304s never serve a partial list.
+    """
+    deadline = time.monotonic() + timeout
+    parser = FeedParser()
+    items = []
+    body = []
+    complete = True
+    headers = {"User-Agent": "DailyDashboard/1.0"}
+    if conditional is not None:
+        headers.update(conditional.headers(url))
+    with get(url, timeout=timeout, stream=True, headers=headers) as r:
+        if r.status_code == 304 and conditional is not None:
+            kept = conditional.not_modified(url, "news")
+            if kept is not None:
+                return kept
+            return fetch_feed(get, url, timeout, limit)
+        r.raise_for_status()
+        chunks = r.iter_content(16384)
+        try:
+            for chunk in chunks:
+                body.append(chunk)
+                items.extend(parser.feed(chunk))
+                if len(items) >= limit:
+                    break
+                if time.monotonic() > deadline:
+                    complete = False
+                    break
+        except ParseError:
+            complete = False
+            if not items and feedparser is not None:
+                # Not well-formed XML: let feedparser's lenient parser have a go
+                body.extend(chunks)
+                complete = True
+                d = feedparser.parse(b"".join(body))
+                feed_title = d.feed.get("title")
+                for e in d.entries:
+                    fields = {k: e.get(k) for k in ("title", "link", "published", "summary")}
+                    h = _headline(fields, feed_title, parser.fetched)
+                    if h is not None:
+                        items.append(h)
+    items = items[:limit]
+    if conditional is not None:
+        # The whole document's size, as far as it is known, is what a 304 saves re-sending
+        received = sum(map(len, body))
+        size = max(int(r.headers.get("Content-Length") or 0), received)
+        conditional.update(url, r.headers, items, size, "news", keep=complete, received=received)
+    return items
+
+
+def fetch_feeds(get, urls: list[str], timeout: float = 8.0, per_feed: int = 30, conditional=None) -> list[Headline]:
+    """Fetch ``urls`` in parallel; feeds that fail or miss the deadline are skipped."""
+    if not urls:
+        return []
+    futures = {_pool.submit(fetch_feed, get, url, timeout, per_feed, conditional): url for url in urls}
+    done, _ = wait(futures, timeout=timeout + 2)
+    items = []
+    for fut in futures:
+        if fut not in done:
+            print(f"News feed timed out: {futures[fut]}")
+        elif fut.exception() is not None:
+            print(f"News feed error for {futures[fut]}: {fut.exception()}")
+        else:
+            items.extend(fut.result())
+    return items
+
+
+def _shingles(title: str) -> set[int]:
+    words = _WORD_RE.findall(title.lower())
+    if len(words) < 2:
+        return {hash(tuple(words))}
+    return {hash((a, b)) for a, b in zip(words, words[1:])}
+
+
+class HeadlineDeduper:
+    """Accepts a headline unless one already accepted has the same link, the same
+    normalised title, or a bigram-shingle Jaccard similarity of ``threshold`` or more."""
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self._exact = set()
+        self._sets = []
+        self._by_shingle = {}  # shingle -> indices into _sets
+
+    def add(self, h: Headline) -> bool:
+        norm = " ".join(_WORD_RE.findall(h.title.lower()))
+        key = hashlib.blake2b(norm.encode(), digest_size=8).digest()
+        if key in self._exact or (h.link and h.link in self._exact):
+            return False
+        sh = _shingles(h.title)
+        seen = set()
+        for s in sh:
+            for i in self._by_shingle.get(s, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                other = self._sets[i]
+                if len(sh & other) / len(sh | other) >= self.threshold:
+                    return False
+        self._exact.add(key)
+        if h.link:
+            self._exact.add(h.link)
+        idx = len(self._sets)
+        self._sets.append(sh)
+        for s in sh:
+            self._by_shingle.setdefault(s, []).append(idx)
+        return True
+
+
+class NewsStore:
+    """The merged feed: newest ``max_items`` distinct headlines across refreshes."""
+
+    def __init__(self, max_items: int = 200):
+        self.max_items = max_items
+        self.refreshed_at = 0.0
+        self._items = []
+        self._lock = threading.Lock()
+
+    def merge(self, headlines: list[Headline]):
+        with self._lock:
+            # Already-held headlines win ties so a story keeps its first source
+            candidates = sorted(self._items + list(headlines), key=lambda h: -h.ts)
+            held = set(map(id, self._items))
+            candidates.sort(key=lambda h: id(h) not in held)
+            dedup = HeadlineDeduper()
+            kept = [h for h in candidates if dedup.add(h)]
+            kept.sort(key=lambda h: -h.ts)
+            self._items = kept[:self.max_items]
+            self.refreshed_at = time.time()
+
+    def latest(self, n: int) -> list[Headline]:
+        with self._lock:
+            return self._items[:n]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+class HeadlineIndex:
+    """Inverted index over the title, source and summary of every headline seen.
+
+    Headlines older than ``retention`` seconds are dropped, and at most
+    ``max_docs`` are held (oldest evicted first), so memory stays bounded.
+    """
+
+    def __init__(self, retention: float = 3 * 86400, max_docs: int = 5000):
+        self.retention = retention
+        self.max_docs = max_docs
+        self._docs = {}  # doc id -> Headline
+        self._postings = {}  # token -> set(doc id)
+        self._vocab = []  # sorted tokens, rebuilt lazily for prefix lookups
+        self._vocab_dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _id(h: Headline) -> str:
+        return h.link or h.title
+
+    @staticmethod
+    def _tokens(h: Headline) -> set:
+        return set(tokenize(h.title) + tokenize(h.source) + tokenize(h.summary))
+
+    def _remove_locked(self, doc_id: str):
+        h = self._docs.pop(doc_id)
+        for tok in self._tokens(h):
+            ids = self._postings.get(tok)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._postings[tok]
+        self._vocab_dirty = True
+
+    def add(self, headlines) -> int:
+        """Index headlines not seen before; returns how many were new."""
+        cutoff = time.time() - self.retention
+        added = 0
+        with self._lock:
+            for h in headlines:
+                doc_id = self._id(h)
+                if h.ts < cutoff or doc_id in self._docs:
+                    continue
+                self._docs[doc_id] = h
+                for tok in self._tokens(h):
+                    self._postings.setdefault(tok, set()).add(doc_id)
+                added += 1
+            if added:
+                self._vocab_dirty = True
+                expired = [i for i, h in self._docs.items() if h.ts < cutoff]
+                if len(self._docs) - len(expired) > self.max_docs:
+                    # Evict down to 90% of the cap so eviction work is amortized
+                    keep = int(self.max_docs * 0.9)
+                    oldest = sorted(self._docs, key=lambda i: self._docs[i].ts)
+                    expired = oldest[:len(self._docs) - keep]
+                for doc_id in expired:
+                    self._remove_locked(doc_id)
+        return added
+
+    def _ids_for(self, token: str, prefix: bool) -> set:
+        if not prefix:
+            return self._postings.get(token, set())
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        out = set()
+        i = bisect.bisect_left(self._vocab, token)
+        while i < len(self._vocab) and self._vocab[i].startswith(token):
+            out |= self._postings[self._vocab[i]]
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int = 20) -> list[Headline]:
+        """AND-match every query term (the last one as a prefix), newest first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        cutoff = time.time() - self.retention
+        with self._lock:
+            # Intersect from the rarest posting list up
+            sets = [self._ids_for(t, i == len(terms) - 1) for i, t in enumerate(terms)]
+            sets.sort(key=len)
+            ids = set(sets[0])
+            for other in sets[1:]:
+                ids &= other
+                if not ids:
+                    return []
+            hits = [self._docs[i] for i in ids if self._docs[i].ts >= cutoff]
+        hits.sort(key=lambda h: h.ts, reverse=True)
+        return hits[:limit]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
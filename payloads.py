@@ -0,0 +1,120 @@
+"""Response shaping for low-bandwidth screens.
+
+``?fields=`` keeps only the listed (dotted) paths of a payload and
+``?compact=1`` shortens well-known keys, rounds floats and drops null
+members. Both run on the object an endpoint is about to serialize (usually
+straight from the cache) and build new containers, so cached values are
+never modified and nothing is fetched again.
+"""
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+# Long key -> compact key. Keys not listed are kept as they are.
+SHORT_KEYS = {
+    "current": "cur",
+    "today": "tdy",
+    "forecast": "fc",
+    "hourly": "hr",
+    "daily": "dy",
+    "time": "t",
+    "date": "d",
+    "temp": "tp",
+    "feels_like": "fl",
+    "humidity": "hu",
+    "code": "c",
+    "wind_speed": "ws",
+    "wind_speed_max": "wsx",
+    "wind_direction": "wd",
+    "pressure": "pr",
+    "precipitation": "pp",
+    "uv_index": "uv",
+    "sunrise": "sr",
+    "sunset": "ss",
+    "max": "hi",
+    "min": "lo",
+    "title": "ti",
+    "hebrew": "he",
+    "link": "ln",
+    "published": "pub",
+    "source": "src",
+    "summary": "sum",
+    "start": "st",
+    "end": "en",
+    "location": "loc",
+    "candle_lighting": "cl",
+    "havdalah": "hv",
+    "parsha": "pa",
+    "holidays": "hol",
+    "latitude": "lat",
+    "longitude": "lon",
+}
+# Always kept by a projection, so failures stay visible
+ALWAYS_KEEP = ("error",)
+
+
+_WHOLE = {}  # a leaf of the field tree: keep this subtree as it is
+
+
+def parse_fields(spec: str) -> dict:
+    """``"current.temp,hourly"`` -> ``{"current": {"temp": {}}, "hourly": {}}``; an empty node keeps a subtree whole."""
+    tree = {}
+    for path in spec.split(","):
+        parts = [p for p in path.strip().split(".") if p]
+        if not parts:
+            continue
+        node = tree
+        for part in parts[:-1]:
+            if node.get(part) is _WHOLE:
+                break  # an ancestor is already kept whole
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = _WHOLE
+    return tree
+
+
+def project(obj, tree: dict):
+    """Keep only the paths in ``tree``; lists are projected element by element."""
+    if not tree:
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [project(v, tree) for v in obj]
+    if isinstance(obj, dict):
+        out = {k: project(obj[k], sub) for k, sub in tree.items() if k in obj}
+        for k in ALWAYS_KEEP:
+            if k in obj:
+                out.setdefault(k, obj[k])
+        return out
+    return obj
+
+
+def compact(obj, digits: int = 1):
+    """Short keys, floats rounded to ``digits`` (whole numbers as ints), null members dropped.
+
+    Nulls inside lists are kept: columnar arrays are positional.
+    """
+    if isinstance(obj, dict):
+        return {SHORT_KEYS.get(k, k): compact(v, digits) for k, v in obj.items() if v is not None}
+    if isinstance(obj, (list, tuple)):
+        return [compact(v, digits) for v in obj]
+    if isinstance(obj, float):
+        r = round(obj, digits)
+        return int(r) if r.is_integer() else r
+    return obj
+
+
+class ShapingJSONProvider(DefaultJSONProvider):
+    """Applies ``?fields=`` and ``?compact=`` to every ``/api/`` JSON response."""
+
+    def response(self, *args, **kwargs):
+        if has_request_context() and request.path.startswith("/api/"):
+            fields = request.args.get("fields")
+            shorten = request.args.get("compact", "0") not in ("", "0", "false")
+            if fields or shorten:
+                obj = args[0] if len(args) == 1 else (args or kwargs)
+                if fields:
+                    obj = project(obj, parse_fields(fields))
+                if shorten:
+                    obj = compact(obj)
+                return super().response(obj)
+        return super().response(*args, **kwargs)
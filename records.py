@@ -0,0 +1,117 @@
+"""Parse-once records for Google Calendar events and Gmail messages.
+
+Google payloads are normalized here exactly once, at ingest. Every view then
+sorts and buckets on the pre-parsed, timezone-aware fields instead of
+re-running ``datetime.fromisoformat`` on the raw strings.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import email.utils as eut
+
+
+# Sentinels that sort after / before every real aware datetime
+FAR_FUTURE = datetime.max.replace(tzinfo=timezone.utc)
+FAR_PAST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def parse_google_when(when: str | None, local_tz) -> tuple[datetime, bool]:
+    """Parse a Google ``dateTime``/``date`` value into (aware local datetime, all_day)."""
+    if not when:
+        return FAR_FUTURE, False
+    try:
+        if "T" in when:
+            dt = datetime.fromisoformat(when.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=local_tz)
+            return dt.astimezone(local_tz), False
+        # All-day event
+        return datetime.fromisoformat(when).replace(tzinfo=local_tz), True
+    except Exception:
+        return FAR_FUTURE, False
+
+
+@dataclass(slots=True)
+class CalendarEvent:
+    title: str
+    location: str
+    start_raw: str | None
+    end_raw: str | None
+    start: datetime
+    all_day: bool
+    day_key: str
+
+    @classmethod
+    def from_google(cls, ev: dict, local_tz) -> "CalendarEvent":
+        start = ev.get("start") or {}
+        end = ev.get("end") or {}
+        start_raw = start.get("dateTime") or start.get("date")
+        end_raw = end.get("dateTime") or end.get("date")
+        dt, all_day = parse_google_when(start_raw, local_tz)
+        day_key = dt.strftime("%Y-%m-%d") if dt is not FAR_FUTURE else ""
+        return cls(
+            title=ev.get("summary", "(no title)"),
+            location=ev.get("location", ""),
+            start_raw=start_raw,
+            end_raw=end_raw,
+            start=dt,
+            all_day=all_day,
+            day_key=day_key,
+        )
+
+    def as_dict(self) -> dict:
+        return {"title": self.title, "location": self.location, "start": self.start_raw, "end": self.end_raw}
+
+
+def parse_email_date(date_hdr: str | None) -> datetime | None:
+    """Parse an RFC 2822 ``Date`` header into an aware datetime."""
+    if not date_hdr:
+        return None
+    try:
+        dt = eut.parsedate_to_datetime(date_hdr)
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+@dataclass(slots=True)
+class EmailMessage:
+    id: str
+    account: str | None
+    account_type: str
+    from_: str
+    subject: str
+    snippet: str
+    received: datetime | None
+    received_str: str | None
+    sort_ts: float
+
+    @classmethod
+    def from_gmail(cls, msg: dict, account: str | None, account_type: str) -> "EmailMessage":
+        headers = {h["name"].lower(): h["value"] for h in (msg.get("payload") or {}).get("headers", [])}
+        date_hdr = headers.get("date")
+        dt = parse_email_date(date_hdr)
+        return cls(
+            id=msg.get("id"),
+            account=account,
+            account_type=account_type,
+            from_=headers.get("from", ""),
+            subject=headers.get("subject", "(no subject)"),
+            snippet=msg.get("snippet", ""),
+            received=dt,
+            received_str=(dt.isoformat() if dt else date_hdr),
+            sort_ts=dt.timestamp() if dt else float("-inf"),
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "from": self.from_,
+            "subject": self.subject,
+            "snippet": self.snippet,
+            "received": self.received_str,
+            "id": self.id,
+            "account": self.account,
+            "account_type": self.account_type,
+        }
@@ -0,0 +1,260 @@
+"""Red-alert ingestion.
+
+A single background poller fetches the Oref alert history every few seconds.
+Alerts not seen before become ``AlertEvent``s with monotonically increasing
+ids in a fixed-size ring buffer, so clients can ask for "everything after id
+N" and get only what is new. Each history entry names one location; an
+entry listing several becomes one event per location.
+
+Processing is incremental: the feed keeps a watermark (the newest
+``alertDate`` ingested and the alerts at exactly that time). The history
+array is decoded one entry at a time, entries older than the watermark are
+rejected on a string comparison of ``alertDate`` (its fixed-width format
+sorts chronologically) without being parsed, and once the feed is known to
+be newest-first decoding stops at the first such entry.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+
+ACTIVE_SECONDS = 600  # an alert counts as active for ten minutes
+
+
+@dataclass(slots=True, frozen=True)
+class AlertEvent:
+    id: int
+    time: datetime
+    location: str
+    category: int | None
+    title: str | None
+    raw_time: str  # alertDate as Oref wrote it
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "time": self.time.isoformat(),
+            "location": self.location,
+            "category": self.category,
+            "title": self.title,
+        }
+
+
+_decoder = json.JSONDecoder()
+_SEP = re.compile(r"[\s,]*")
+
+
+def history_entries(data) -> list:
+    """The alert list out of the shapes the history feed has been seen in."""
+    if isinstance(data, dict):
+        return data.get("data") or data.get("alerts") or data.get("items") or []
+    if isinstance(data, list):
+        return data
+    return []
+
+
+def iter_history(text: str):
+    """Entries of a history document, decoded one at a time from a top-level array."""
+    text = text.lstrip("\ufeff")
+    i = _SEP.match(text).end()
+    if not text.startswith("[", i):
+        yield from history_entries(json.loads(text) if text.strip() else None)
+        return
+    i += 1
+    n = len(text)
+    while True:
+        i = _SEP.match(text, i).end()
+        if i >= n or text[i] == "]":
+            return
+        entry, i = _decoder.raw_decode(text, i)
+        yield entry
+
+
+def parse_alert_time(value: str, tzinfo) -> datetime | None:
+    """``alertDate`` ("2024-05-01 12:34:56" Israel time, or ISO 8601) as an aware datetime."""
+    if not value:
+        return None
+    try:
+        t = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return t.replace(tzinfo=tzinfo) if t.tzinfo is None else t.astimezone(tzinfo)
+
+
+def _locations(entry: dict) -> list[str]:
+    where = entry.get("data") or entry.get("location") or entry.get("city")
+    if isinstance(where, list):
+        return [str(w) for w in where if w]
+    return [str(where)] if where else []
+
+
+class AlertFeed:
+    """Ring buffer of alert events with monotonic ids, plus the poller's health."""
+
+    def __init__(self, tzinfo, capacity: int = 4096):
+        self.tzinfo = tzinfo
+        self._events = deque(maxlen=capacity)
+        self._next_id = 1
+        self._mark = ""  # newest alertDate ingested
+        self._at_mark = set()  # (location, category) ingested at exactly _mark
+        self._newest_first = False  # the last full scan found the history sorted newest first
+        self._latest = None
+        self._lock = threading.Lock()
+        self.last_poll = None  # datetime of the last successful fetch
+        self.last_error = None
+        self.last_status_code = None
+
+    def ingest(self, text: str) -> list[AlertEvent]:
+        """Append and return the alerts in a history document that are newer than the watermark."""
+        mark, at_mark = self._mark, self._at_mark
+        new_mark, new_at_mark = mark, set(at_mark)
+        fresh = []
+        prev = None
+        descending = True
+        stopped = False
+        for entry in iter_history(text):
+            if not isinstance(entry, dict):
+                continue
+            raw = entry.get("alertDate") or ""
+            if prev is not None and raw > prev:
+                descending = False
+            prev = raw
+            if raw < mark:
+                if self._newest_first:
+                    stopped = True
+                    break
+                continue
+            category = entry.get("category", entry.get("cat"))
+            for location in _locations(entry):
+                key = (location, category)
+                if raw == mark and key in at_mark:
+                    continue
+                t = parse_alert_time(raw, self.tzinfo)
+                if t is None:
+                    continue
+                fresh.append((t, location, category, entry.get("title"), raw))
+                if raw > new_mark:
+                    new_mark, new_at_mark = raw, set()
+                if raw == new_mark:
+                    new_at_mark.add(key)
+        if not stopped:
+            self._newest_first = descending
+        fresh.sort(key=lambda f: f[0])
+        with self._lock:
+            events = []
+            for t, location, category, title, raw in fresh:
+                e = AlertEvent(self._next_id, t, location, category, title, raw)
+                events.append(e)
+                self._next_id += 1
+                if self._latest is None or e.time >= self._latest.time:
+                    self._latest = e
+            self._events.extend(events)
+            self._mark, self._at_mark = new_mark, new_at_mark
+        return events
+
+    def mark_ok(self, now: datetime):
+        self.last_poll = now
+        self.last_error = None
+        self.last_status_code = 200
+
+    def mark_error(self, error: Exception, status_code: int | None = None):
+        self.last_error = str(error)
+        self.last_status_code = status_code
+
+    @property
+    def cursor(self) -> int:
+        """Id of the newest event (0 before any)."""
+        with self._lock:
+            return self._next_id - 1
+
+    def since(self, cursor: int, limit: int = 500) -> tuple[list[AlertEvent], bool]:
+        """Events with id > ``cursor`` (oldest first, at most ``limit``) and whether some were
+        already dropped from the ring (or the cursor is from before a restart), in which case
+        the client should reload in full."""
+        with self._lock:
+            if cursor > self._next_id - 1:
+                cursor, reset = 0, True
+            elif cursor == self._next_id - 1:
+                return [], False
+            else:
+                reset = False
+            if not self._events:
+                return [], reset
+            first = self._events[0].id
+            reset = reset or cursor < first - 1
+            start = max(0, cursor - first + 1)
+            events = [self._events[i] for i in range(start, min(len(self._events), start + limit))]
+        return events, reset
+
+    def latest(self, match=None) -> AlertEvent | None:
+        """Newest event, or the newest one whose location passes ``match(location)``."""
+        if match is None:
+            return self._latest
+        with self._lock:
+            events = list(self._events)
+        best = None
+        for e in reversed(events):
+            if (best is None or e.time > best.time) and match(e.location):
+                best = e
+        return best
+
+    def recent(self, now: datetime, seconds: float = ACTIVE_SECONDS, match=None) -> list[AlertEvent]:
+        """Events from the last ``seconds`` (only those ``match(location)`` accepts, if given), oldest first."""
+        cutoff = now.timestamp() - seconds
+        with self._lock:
+            out = []
+            for e in reversed(self._events):
+                if e.time.timestamp() < cutoff:
+                    break
+                if match is None or match(e.location):
+                    out.append(e)
+        out.reverse()
+        return out
+
+
+class AlertPoller:
+    """Daemon thread calling ``fetch()`` every ``interval`` seconds and feeding ``feed``.
+
+    ``fetch`` returns ``(text, modified)``; an unmodified document is not
+    looked at again. ``on_events`` (optional) is called with each non-empty
+    batch of new events. Failures back off exponentially up to a minute.
+    """
+
+    def __init__(self, fetch, feed: AlertFeed, interval: float = 2.0, on_events=None):
+        self.fetch = fetch
+        self.feed = feed
+        self.interval = interval
+        self.on_events = on_events
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="red-alert", daemon=True)
+            self._thread.start()
+
+    def poll_once(self):
+        data, modified = self.fetch()
+        if modified:
+            events = self.feed.ingest(data)
+            if events and self.on_events is not None:
+                self.on_events(events)
+        self.feed.mark_ok(datetime.now(self.feed.tzinfo))
+
+    def _loop(self):
+        failures = 0
+        while True:
+            try:
+                self.poll_once()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                response = getattr(e, "response", None)
+                self.feed.mark_error(e, getattr(response, "status_code", None))
+                if failures == 1:
+                    print(f"Red alert poll failed: {e}")
+            delay = self.interval if not failures else min(60.0, self.interval * 2 ** min(failures, 6))
+            time.sleep(delay)
@@ -0,0 +1,95 @@
+"""Day-rollover scheduling.
+
+Day-scoped payloads (today's zmanim, the holiday countdown, the Hebrew date,
+this week's Shabbat times) change at natural boundaries: civil midnight,
+sunset, havdalah. ``RolloverScheduler`` runs each registered job a little
+before its next boundary so the next period's payload can be computed ahead
+of time and swapped in exactly when the boundary passes.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from zmanim_calc import zmanim_for_dates
+
+
+def next_midnight(now: datetime, tzinfo) -> datetime:
+    """Start of the next civil day in ``tzinfo``."""
+    local = now.astimezone(tzinfo)
+    tomorrow = local.date() + timedelta(days=1)
+    return datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=tzinfo)
+
+
+def sunset(d: date, lat: float, lon: float, tzinfo) -> datetime | None:
+    return zmanim_for_dates([d], lat, lon, tzinfo)["sunset"][0]
+
+
+def next_sunset(now: datetime, lat: float, lon: float, tzinfo) -> datetime:
+    """First sunset strictly after ``now``; falls back to midnight where the sun does not set."""
+    local = now.astimezone(tzinfo)
+    for i in range(2):
+        s = sunset(local.date() + timedelta(days=i), lat, lon, tzinfo)
+        if s is not None and s > now:
+            return s
+    return next_midnight(now, tzinfo)
+
+
+class RolloverScheduler:
+    """One daemon thread that fires each job ``lead`` seconds before its boundary.
+
+    A job is ``(next_boundary, run)``: ``next_boundary(now)`` returns the first
+    boundary strictly after ``now`` and ``run(boundary)`` precomputes whatever
+    becomes current at that moment. Jobs can be added while running.
+    """
+
+    def __init__(self, lead_seconds: float = 60.0):
+        self.lead = lead_seconds
+        self._jobs = {}  # name -> [next_boundary, run, due boundary]
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, next_boundary, run):
+        """Add (or replace) job ``name``; its first run is before its next boundary."""
+        boundary = next_boundary(datetime.now(timezone.utc))
+        with self._lock:
+            self._jobs[name] = [next_boundary, run, boundary]
+        self._wake.set()
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._jobs
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="rollover", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                jobs = list(self._jobs.items())
+            now = datetime.now(timezone.utc)
+            wait = 3600.0
+            for name, (next_boundary, run, boundary) in jobs:
+                fire_at = boundary - timedelta(seconds=self.lead)
+                if fire_at <= now:
+                    try:
+                        run(boundary)
+                    except Exception as e:
+                        print(f"Rollover job {name} failed: {e}")
+                    # Schedule from just past this boundary, never from before it
+                    after = max(now, boundary) + timedelta(seconds=1)
+                    with self._lock:
+                        if name in self._jobs:
+                            self._jobs[name][2] = next_boundary(after)
+                    wait = 0.0
+                else:
+                    wait = min(wait, (fire_at - now).total_seconds())
+            self._wake.clear()
+            if wait > 0:
+                # Sleep in bounded steps so clock jumps (suspend, NTP) are noticed
+                self._wake.wait(min(wait, 300.0))
+            else:
+                time.sleep(0)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the red-alert archive
+Fills a temporary AlertArchive with six months of synthetic alerts (area
+names taken from the red-alert fixture) and times the queries behind
+/api/red-alert/history and /api/red-alert/stats, checking each against a
+plain scan of the same rows
+"""
+
+import json
+import random
+import sys
+import tempfile
+import timeit
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dateutil import tz  # noqa: E402
+from alert_archive import AlertArchive  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "red_alert_history.json"
+ISRAEL_TZ = tz.gettz("Asia/Jerusalem")
+DAYS = 180
+ALERTS = 300_000
+
+
+def synthetic(names):
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1, tzinfo=ISRAEL_TZ).timestamp()
+    seconds = sorted(rng.sample(range(DAYS * 86400), ALERTS))  # one alert per second at most
+    return [SimpleNamespace(time=datetime.fromtimestamp(start + s, ISRAEL_TZ), location=rng.choice(names), category=rng.choice((1, 1, 1, 2, 13)))
+            for s in seconds]
+
+
+def timed(fn, n=20):
+    return min(timeit.repeat(fn, number=n, repeat=3)) / n
+
+
+def main():
+    names = sorted({r["data"] for r in json.loads(FIXTURE.read_text(encoding="utf-8"))})
+    events = synthetic(names)
+    city = "אשקלון"
+    start = datetime(2024, 3, 1, tzinfo=ISRAEL_TZ)
+    end = datetime(2024, 4, 1, tzinfo=ISRAEL_TZ)
+
+    with tempfile.TemporaryDirectory() as d:
+        t0 = timeit.default_timer()
+        archive = AlertArchive(Path(d))
+        for i in range(0, len(events), 1000):
+            archive.append(events[i:i + 1000])
+        print(f"Archive: {len(archive)} alerts over {DAYS} days, {len(names)} areas, "
+              f"appended in {timeit.default_timer() - t0:.2f} s")
+        t0 = timeit.default_timer()
+        archive = AlertArchive(Path(d))
+        print(f"reload:                   {(timeit.default_timer() - t0) * 1e3:8.1f} ms")
+
+        # Re-appending the same alerts must not duplicate anything
+        if archive.append(events[-1000:]) != 0:
+            print("✗ re-appended alerts were archived twice")
+            sys.exit(1)
+
+        for label, fn in (
+            ("history, one month", lambda: archive.history(start, end)),
+            ("history, one month, city", lambda: archive.history(start, end, city)),
+            ("stats, six months", lambda: archive.stats(events[0].time, events[-1].time + timedelta(seconds=1))),
+            ("stats, one month, city", lambda: archive.stats(start, end, city)),
+        ):
+            print(f"{label + ':':26s}{timed(fn) * 1e3:8.2f} ms")
+
+        in_range = [e for e in events if start <= e.time < end]
+        expect_city = [e for e in in_range if e.location.startswith(city)]
+        expect_days = Counter(e.time.date().isoformat() for e in in_range)
+        stats = archive.stats(start, end)
+        checks = (
+            (archive.history(start, end)["count"], len(in_range), "history count"),
+            (archive.history(start, end, city)["count"], len(expect_city), "city history count"),
+            (stats["per_day"], dict(expect_days), "per-day counts"),
+            (stats["total"], len(in_range), "stats total"),
+        )
+        for got, want, what in checks:
+            if got != want:
+                print(f"✗ {what}: got {got}, expected {want}")
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
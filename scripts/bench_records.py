@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the parse-once calendar/email records
+Compares the per-event cost of the old reparse-everywhere handlers with
+normalizing each Google payload once into a record
+"""
+
+import sys
+import timeit
+import email.utils as eut
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from records import CalendarEvent, EmailMessage  # noqa: E402
+
+try:
+    from dateutil import tz
+    LOCAL_TZ = tz.gettz("Asia/Jerusalem")
+except Exception:
+    LOCAL_TZ = timezone.utc
+
+N_EVENTS = 500
+
+
+def make_events(n):
+    """Synthetic Google Calendar payloads: mostly timed, some all-day"""
+    base = datetime(2025, 9, 14, 7, 0, tzinfo=timezone.utc)
+    events = []
+    for i in range(n):
+        start = base + timedelta(minutes=37 * i)
+        if i % 7 == 0:
+            s = {"date": start.strftime("%Y-%m-%d")}
+            e = {"date": (start + timedelta(days=1)).strftime("%Y-%m-%d")}
+        else:
+            s = {"dateTime": start.isoformat().replace("+00:00", "Z")}
+            e = {"dateTime": (start + timedelta(hours=1)).isoformat().replace("+00:00", "Z")}
+        events.append({"summary": f"Event {i}", "location": "Office", "start": s, "end": e})
+    return events
+
+
+def make_messages(n):
+    """Synthetic Gmail metadata payloads"""
+    base = datetime(2025, 9, 14, 7, 0, tzinfo=timezone.utc)
+    msgs = []
+    for i in range(n):
+        headers = [
+            {"name": "From", "value": f"Sender {i} <s{i}@example.com>"},
+            {"name": "Subject", "value": f"Subject {i}"},
+            {"name": "Date", "value": eut.format_datetime(base - timedelta(minutes=13 * i))},
+        ]
+        msgs.append({"id": f"m{i}", "payload": {"headers": headers}})
+    return msgs
+
+
+def legacy_calendar(events):
+    """Old path: parse for the combined sort, again for bucketing, again for the per-day sort"""
+    def _parse_start(ev):
+        when = ev.get("start", {}).get("dateTime") or ev.get("start", {}).get("date")
+        try:
+            if len(when) > 10:
+                return datetime.fromisoformat(when.replace("Z", "+00:00"))
+            return datetime.fromisoformat(when).replace(tzinfo=LOCAL_TZ)
+        except Exception:
+            return datetime.max.replace(tzinfo=timezone.utc)
+
+    events = sorted(events, key=_parse_start)
+    buckets = {}
+    for ev in events:
+        s = ev.get("start", {})
+        when = s.get("dateTime") or s.get("date")
+        if "T" in when:
+            dt_local = datetime.fromisoformat(when.replace("Z", "+00:00")).astimezone(LOCAL_TZ)
+        else:
+            dt_local = datetime.fromisoformat(when).replace(tzinfo=LOCAL_TZ)
+        start, end = ev.get("start", {}), ev.get("end", {})
+        buckets.setdefault(dt_local.strftime("%Y-%m-%d"), []).append({
+            "title": ev.get("summary", "(no title)"),
+            "location": ev.get("location", ""),
+            "start": start.get("dateTime") or start.get("date"),
+            "end": end.get("dateTime") or end.get("date"),
+        })
+
+    def sort_key(item):
+        s = item.get("start")
+        if "T" in s:
+            return datetime.fromisoformat(s.replace("Z", "+00:00"))
+        return datetime.fromisoformat(s).replace(tzinfo=LOCAL_TZ)
+
+    for day in buckets.values():
+        day.sort(key=sort_key)
+    return buckets
+
+
+def records_calendar(events):
+    """New path: normalize once, then sort and bucket on pre-parsed fields"""
+    recs = sorted((CalendarEvent.from_google(ev, LOCAL_TZ) for ev in events), key=lambda ev: ev.start)
+    buckets = {}
+    for ev in recs:
+        buckets.setdefault(ev.day_key, []).append(ev)
+    for day in buckets.values():
+        day.sort(key=lambda ev: ev.start)
+    return {k: [ev.as_dict() for ev in v] for k, v in buckets.items()}
+
+
+def legacy_emails(msgs):
+    items = []
+    for msg in msgs:
+        headers = {h["name"].lower(): h["value"] for h in msg["payload"]["headers"]}
+        date_hdr = headers.get("date")
+        dt = eut.parsedate_to_datetime(date_hdr)
+        items.append({"from": headers.get("from", ""), "subject": headers.get("subject", "(no subject)"),
+                      "received": dt.isoformat(), "id": msg["id"],
+                      "account": "me@example.com", "account_type": "Personal"})
+
+    def _key(it):
+        d = it.get("received")
+        try:
+            return datetime.fromisoformat(d)
+        except Exception:
+            try:
+                return eut.parsedate_to_datetime(d)
+            except Exception:
+                return datetime.min
+
+    items.sort(key=_key, reverse=True)
+    return items
+
+
+def records_emails(msgs):
+    recs = [EmailMessage.from_gmail(m, "me@example.com", "Personal") for m in msgs]
+    recs.sort(key=lambda it: it.sort_ts, reverse=True)
+    return [it.as_dict() for it in recs]
+
+
+def bench(label, fn, payload, n):
+    runs = 50
+    best = min(timeit.repeat(lambda: fn(payload), number=1, repeat=runs))
+    print(f"{label:<28} {best * 1e3:8.2f} ms total  {best / n * 1e6:8.2f} µs/item")
+    return best
+
+
+def main():
+    print("Parse-once records microbenchmark")
+    print("=" * 40)
+    events = make_events(N_EVENTS)
+    msgs = make_messages(N_EVENTS)
+
+    old = bench("calendar (legacy)", legacy_calendar, events, N_EVENTS)
+    new = bench("calendar (records)", records_calendar, events, N_EVENTS)
+    print(f"  speedup: {old / new:.2f}x")
+
+    old = bench("email (legacy)", legacy_emails, msgs, N_EVENTS)
+    new = bench("email (records)", records_emails, msgs, N_EVENTS)
+    print(f"  speedup: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark for red-alert history processing
+Compares the old per-refresh path (parse the whole document, parse every
+alertDate, build a dict per alert, sort everything to take the newest) with
+the watermark-based AlertFeed: one cold ingest, then the steady state where
+each poll carries a few new alerts on top of an unchanged history
+The fixture is a synthetic three-day barrage (2000 entries) in the
+AlertsHistory.json format, newest first
+"""
+
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dateutil import tz  # noqa: E402
+from redalert import AlertFeed  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "red_alert_history.json"
+ISRAEL_TZ = tz.gettz("Asia/Jerusalem")
+NEW_PER_POLL = 10
+
+
+def legacy(text):
+    """Old api_red_alert path, minus the network"""
+    alert_data = json.loads(text)
+    valid_alerts = []
+    for alert in alert_data:
+        try:
+            alert_time_str = alert.get('alertDate', '')
+            if alert_time_str:
+                try:
+                    alert_time = datetime.fromisoformat(alert_time_str.replace('Z', '+00:00'))
+                except Exception:
+                    try:
+                        alert_time = datetime.strptime(alert_time_str, '%Y-%m-%d %H:%M:%S')
+                    except Exception:
+                        continue
+                alert_time = alert_time.astimezone(ISRAEL_TZ)
+                locations = alert.get('data', [])
+                if locations:
+                    valid_alerts.append({
+                        'time': alert_time,
+                        'time_str': alert_time.isoformat(),
+                        'locations': locations,
+                        'category': alert.get('cat', 1)
+                    })
+        except Exception:
+            continue
+    valid_alerts.sort(key=lambda x: x['time'], reverse=True)
+    return valid_alerts[0] if valid_alerts else None
+
+
+def with_new_alerts(rows, k):
+    """The next poll's document: ``k`` new alerts on top of the same history"""
+    newest = datetime.fromisoformat(rows[0]["alertDate"])
+    t = (newest + timedelta(seconds=30 + k)).strftime("%Y-%m-%d %H:%M:%S")
+    fresh = [dict(rows[i], alertDate=t) for i in range(NEW_PER_POLL)]
+    return json.dumps(fresh + rows, ensure_ascii=False)
+
+
+def main():
+    text = FIXTURE.read_text(encoding="utf-8")
+    rows = json.loads(text)
+    polls = [with_new_alerts(rows, k) for k in range(50)]
+    print(f"Fixture: {len(rows)} alerts, {len(text.encode()) / 1024:.0f} KiB")
+
+    n = 20
+    t_legacy = min(timeit.repeat(lambda: legacy(text), number=n, repeat=3)) / n
+    print(f"legacy full reparse:      {t_legacy * 1e3:8.2f} ms per refresh")
+
+    t_cold = min(timeit.repeat(lambda: AlertFeed(ISRAEL_TZ).ingest(text), number=n, repeat=3)) / n
+    print(f"AlertFeed cold ingest:    {t_cold * 1e3:8.2f} ms")
+
+    feed = AlertFeed(ISRAEL_TZ)
+    feed.ingest(text)
+    new = 0
+    start = timeit.default_timer()
+    for doc in polls:
+        new += len(feed.ingest(doc))
+    t_warm = (timeit.default_timer() - start) / len(polls)
+    print(f"AlertFeed per poll:       {t_warm * 1e3:8.2f} ms ({NEW_PER_POLL} new alerts, "
+          f"{t_legacy / t_warm:.0f}x faster than legacy)")
+
+    expected = NEW_PER_POLL * len(polls)
+    if new != expected:
+        print(f"✗ ingested {new} new alerts over {len(polls)} polls, expected {expected}")
+        sys.exit(1)
+    latest = max(r["alertDate"] for r in json.loads(polls[-1]))
+    if feed.latest().raw_time != latest:
+        print(f"✗ newest alert {feed.latest().raw_time}, expected {latest}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Validate red-alert area matching against the bundled area list
+Every key a name can be matched by must be the whole name or a locality of at
+least two words or three letters (never a sub-zone code like "ב" out of
+"אשדוד - א,ב,ד,ה"); every name must be found by searching its own beginning,
+with and without niqqud; and a subscription to a city must match all of its
+zones and nothing else
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from alert_areas import AREAS, AreaIndex, Subscriptions, area_parts, normalize_area  # noqa: E402
+
+# (subscription, location, expected match)
+CASES = (
+    ("אשקלון", "אשקלון - דרום", True),
+    ("אשקלון", "אשקלון - צפון", True),
+    ("אשקלון - דרום", "אשקלון - צפון", False),
+    ("אִיבִים", "שדרות, איבים, ניר עם", True),
+    ("ניר עם", "שדרות, איבים, ניר עם", True),
+    ("כרמי גת", "קריית גת, כרמי גת", True),
+    ("תל-אביב", "תל אביב - מרכז העיר", True),
+    ("ד", "אשדוד - א,ב,ד,ה", False),
+    ("יג", "אשדוד - ח,ט,י,יג,יד,טז", False),
+    ("מרינה", "אשדוד - יא,יב,טו,יז,מרינה,סיטי", False),
+)
+
+
+def main():
+    failures = 0
+    index = AreaIndex(AREAS)
+    for name in AREAS:
+        key = normalize_area(name)
+        for part in area_parts(name):
+            if part != key and " " not in part and len(part) < 3:
+                failures += 1
+                print(f"✗ {name}: matched by short part {part!r}")
+        if name not in index.search(name[:4], limit=len(AREAS)):
+            failures += 1
+            print(f"✗ {name}: not found by its prefix {name[:4]!r}")
+
+    subs = Subscriptions()
+    for area, location, expected in CASES:
+        subs.set("screen", [area])
+        if subs.wants("screen", location) != expected:
+            failures += 1
+            print(f"✗ subscription {area!r} vs {location!r}: expected {expected}")
+
+    for q in ("ד", "ב", "יג"):
+        hits = [n for n in index.search(q, limit=len(AREAS)) if n.startswith("אשדוד")]
+        if hits:
+            failures += 1
+            print(f"✗ search {q!r} suggests {hits}")
+
+    print(f"{len(AREAS)} areas, {len(CASES)} subscription cases, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
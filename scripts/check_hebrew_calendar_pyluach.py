@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Cross-check the offline Hebrew date converter against pyluach
+The fixture was generated with pyluach, an independent implementation of the
+calendar rules, not recorded from hebcal's converter. Checks Gregorian -> Hebrew and the reverse direction for every fixture row,
+and the Hebrew-mode display string (numerals, geresh/gershayim, month names)
+for rows that give one, then reports the per-conversion cost
+"""
+
+import json
+import sys
+import timeit
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hebrew_calendar import format_hebrew_date, from_hebrew, month_name, to_hebrew  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "hebrew_dates_pyluach.json"
+
+
+def main():
+    items = json.loads(FIXTURE.read_text(encoding="utf-8"))["items"]
+    failures = 0
+    for it in items:
+        g = date(it["gy"], it["gm"], it["gd"])
+        hy, hm, hd = to_hebrew(g)
+        got = (hy, month_name(hy, hm), hd)
+        want = (it["hy"], it["hm"], it["hd"])
+        if got != want:
+            failures += 1
+            print(f"✗ {g}: got {got}, expected {want}")
+            continue
+        if from_hebrew(hy, hm, hd) != g:
+            failures += 1
+            print(f"✗ {g}: round trip gave {from_hebrew(hy, hm, hd)}")
+        if "hebrew" in it and format_hebrew_date(g, "hebrew") != it["hebrew"]:
+            failures += 1
+            print(f"✗ {g}: got {format_hebrew_date(g, 'hebrew')}, expected {it['hebrew']}")
+
+    hebrew_rows = sum("hebrew" in it for it in items)
+    if not hebrew_rows:
+        failures += 1
+        print("✗ no fixture rows with Hebrew-mode output")
+    print(f"{len(items) - failures}/{len(items)} dates match pyluach ({hebrew_rows} with Hebrew-mode output)")
+
+    dates = [date(it["gy"], it["gm"], it["gd"]) for it in items]
+    n = len(dates)
+    best = min(timeit.repeat(lambda: [format_hebrew_date(d) for d in dates], number=1, repeat=20))
+    print(f"format_hebrew_date: {best / n * 1e6:.2f} µs per date")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Cross-check the offline luach against a parsha/holiday fixture generated with pyluach
+(not recorded from hebcal; the Israeli modern days are pyluach dates moved by the
+same weekday rules). Every fixture Shabbat must get the same parsha (or none on a
+holiday Shabbat) and every fixture holiday, including each Chanukah candle and
+the modern days of hebcal's mod=on list, must be on the listed date; also reports the cost
+of computing one year and of laying out the two-year day table from the cache
+"""
+
+import json
+import sys
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dateutil import tz  # noqa: E402
+from hebrew_calendar import to_hebrew  # noqa: E402
+import luach  # noqa: E402
+from luach import Luach, holidays_for_year, parsha_for_year, parsha_name, year_data  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "luach_pyluach.json"
+
+
+def main():
+    items = json.loads(FIXTURE.read_text(encoding="utf-8"))["items"]
+    schedules = {}
+    holidays = {}
+    failures = 0
+    for it in items:
+        d = date.fromisoformat(it["date"])
+        year = to_hebrew(d)[0]
+        if "parsha" in it:
+            if year not in schedules:
+                schedules[year] = parsha_for_year(year)
+            got = schedules[year].get(d)
+            got = parsha_name(got) if got else None
+            if got != it["parsha"]:
+                failures += 1
+                print(f"✗ {d}: got {got}, expected {it['parsha']}")
+        else:
+            if year not in holidays:
+                holidays[year] = holidays_for_year(year)
+            titles = [h.title for h in holidays[year] if h.date == d]
+            if not any(t.startswith(it["holiday"]) for t in titles):
+                failures += 1
+                print(f"✗ {d}: got {titles}, expected {it['holiday']}")
+
+    print(f"{len(items) - failures}/{len(items)} fixture rows match")
+
+    jlm = tz.gettz("Asia/Jerusalem")
+    best = min(timeit.repeat(lambda: year_data(5786, 31.7683, 35.2137, jlm),
+                             setup=luach._year_cache.clear, number=1, repeat=5))
+    print(f"year_data: {best * 1e3:.1f} ms per Hebrew year (cold)")
+    best = min(timeit.repeat(
+        lambda: Luach(date(2025, 1, 1), date(2026, 12, 31), 31.7683, 35.2137, jlm), number=1, repeat=5))
+    table = Luach(date(2025, 1, 1), date(2026, 12, 31), 31.7683, 35.2137, jlm)
+    print(f"Luach: {best * 1e3:.2f} ms to lay out two cached years, {table.nbytes / 1024:.1f} KiB day table")
+
+    d = table.start
+    while d <= table.end:
+        if table.hebrew_date(d) != to_hebrew(d):
+            failures += 1
+            print(f"✗ {d}: day table has {table.hebrew_date(d)}, expected {to_hebrew(d)}")
+        d += timedelta(days=1)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -364,7 +364,7 @@ async function refreshNews() {
 async function refreshAlerts() {
   const el = document.getElementById('alert-latest');
   const overlay = document.getElementById('red-alert-overlay');
-  const latest = await fetchJSON('/api/alerts');
+  const latest = await fetchJSON('/api/alerts' + screenQuery('?'));
   
   if (!latest || Object.keys(latest).length === 0) {
     el.textContent = 'No recent alerts';
@@ -394,6 +394,30 @@ async function refreshAlerts() {
   overlay.classList.add('active');
 }
 
+// Which display this is (`?screen=lobby`, remembered across reloads); alerts are limited to its subscribed areas
+function screenId() {
+  const fromUrl = new URLSearchParams(location.search).get('screen');
+  if (fromUrl) localStorage.setItem('screen', fromUrl);
+  return fromUrl || localStorage.getItem('screen') || '';
+}
+
+function screenQuery(sep = '&') {
+  const id = screenId();
+  return id ? `${sep}screen=${encodeURIComponent(id)}` : '';
+}
+
+// Poll the red-alert cursor every few seconds; `onChange` runs only when new alerts were ingested
+function watchRedAlerts(onChange, intervalMs = 3000) {
+  let cursor = -1;
+  setInterval(async () => {
+    const res = await fetchJSON(`/api/red-alert/since?cursor=${cursor}${screenQuery()}`);
+    if (!res || res.error) return;
+    const changed = cursor >= 0 && (res.reset || res.events.length > 0);
+    cursor = res.cursor;
+    if (changed) onChange(res.events);
+  }, intervalMs);
+}
+
 async function refreshEmailsPills() {
   const ul = document.getElementById('email-list');
   ul.innerHTML = '';
@@ -423,6 +447,27 @@ async function refreshEmailsPills() {
   }
 }
 
+function setUnreadBadge(id, count) {
+  const el = document.getElementById(id);
+  if (!el) return;
+  el.textContent = count > 0 ? String(count) : '';
+  el.style.display = count > 0 ? '' : 'none';
+}
+
+// Poll cheap label counters; only refetch the inbox list when a mailbox moved
+let emailCountsVersion = null;
+async function refreshEmailCounts() {
+  if (!document.getElementById('email-list')) return;
+  const qs = emailTabs.active !== 'combined' ? `?account=${encodeURIComponent(emailTabs.active)}` : '';
+  const counts = await fetchJSON('/api/emails/counts' + qs);
+  if (!counts) return;
+  setUnreadBadge('email-unread', counts.inbox_unread || 0);
+  if (emailCountsVersion !== null && counts.version !== emailCountsVersion) {
+    refreshEmailsPills();
+  }
+  emailCountsVersion = counts.version;
+}
+
 async function refreshStatus() {
   const s = await fetchJSON('/api/status');
   if (!s) return;
@@ -448,6 +493,7 @@ function schedule() {
   refreshAgenda();
   refreshNextMeetingAndWeather();
   refreshEmailsPills();
+  refreshEmailCounts();
   refreshNews();
   refreshStatus();
   refreshAlerts();
@@ -455,9 +501,11 @@ function schedule() {
   setInterval(refreshTime, 15 * 1000);
   setInterval(refreshAgenda, 60 * 1000);
   setInterval(refreshNextMeetingAndWeather, 5 * 60 * 1000);
-  setInterval(refreshEmailsPills, 60 * 1000);
+  setInterval(refreshEmailCounts, 10 * 1000);
+  setInterval(refreshEmailsPills, 5 * 60 * 1000);
   setInterval(refreshNews, 10 * 60 * 1000);
   setInterval(refreshAlerts, 30 * 1000);
+  watchRedAlerts(refreshAlerts);
 }
 
 document.addEventListener('DOMContentLoaded', schedule);
@@ -689,8 +737,26 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
   }
   
+  let countsVersion = null;
+  async function loadEmailCounts() {
+    const counts = await fetchJSON('/api/emails/counts');
+    if (!counts) return;
+    const unread = { Personal: 0, Business: 0 };
+    for (const row of counts.accounts || []) {
+      unread[row.account_type === 'Business' ? 'Business' : 'Personal'] += row.inbox_unread || 0;
+    }
+    setUnreadBadge('email-unread-personal', unread.Personal);
+    setUnreadBadge('email-unread-business', unread.Business);
+    if (countsVersion !== null && counts.version !== countsVersion) {
+      loadEmailPage();
+    }
+    countsVersion = counts.version;
+  }
+
   await loadEmailPage();
-  setInterval(loadEmailPage, 60 * 1000);
+  loadEmailCounts();
+  setInterval(loadEmailCounts, 10 * 1000);
+  setInterval(loadEmailPage, 5 * 60 * 1000);
 });
 
 // --- Calendar Week Page (Sun-Sat agenda with today highlighted) ---
@@ -1105,30 +1171,30 @@ document.addEventListener('DOMContentLoaded', async () => {
     
     // Homepage elements
     const zmanimElements = {
-      'zmanim-alot': zmanim.alot_hashachar,
+      'zmanim-alot': zmanim.alotHaShachar,
       'zmanim-sunrise': zmanim.sunrise,
-      'zmanim-shema': zmanim.sof_zman_shma_gra,
-      'zmanim-tefillah': zmanim.sof_zman_tfilla_gra,
+      'zmanim-shema': zmanim.sofZmanShma,
+      'zmanim-tefillah': zmanim.sofZmanTfilla,
       'zmanim-chatzot': zmanim.chatzot,
-      'zmanim-mincha-gedola': zmanim.mincha_gedola,
-      'zmanim-mincha-ketana': zmanim.mincha_ketana,
+      'zmanim-mincha-gedola': zmanim.minchaGedola,
+      'zmanim-mincha-ketana': zmanim.minchaKetana,
       'zmanim-sunset': zmanim.sunset,
-      'zmanim-tzeit': zmanim.tzeit_hakochavim
+      'zmanim-tzeit': zmanim.tzeit7083deg
     };
 
     // Full page elements
     const zmanimFullElements = {
-      'zmanim-alot-full': zmanim.alot_hashachar,
+      'zmanim-alot-full': zmanim.alotHaShachar,
       'zmanim-misheyakir-full': zmanim.misheyakir,
       'zmanim-sunrise-full': zmanim.sunrise,
-      'zmanim-shema-full': zmanim.sof_zman_shma_gra,
-      'zmanim-tefillah-full': zmanim.sof_zman_tfilla_gra,
+      'zmanim-shema-full': zmanim.sofZmanShma,
+      'zmanim-tefillah-full': zmanim.sofZmanTfilla,
       'zmanim-chatzot-full': zmanim.chatzot,
-      'zmanim-mincha-gedola-full': zmanim.mincha_gedola,
-      'zmanim-mincha-ketana-full': zmanim.mincha_ketana,
-      'zmanim-plag-full': zmanim.plag_hamincha,
+      'zmanim-mincha-gedola-full': zmanim.minchaGedola,
+      'zmanim-mincha-ketana-full': zmanim.minchaKetana,
+      'zmanim-plag-full': zmanim.plagHaMincha,
       'zmanim-sunset-full': zmanim.sunset,
-      'zmanim-tzeit-full': zmanim.tzeit_hakochavim
+      'zmanim-tzeit-full': zmanim.tzeit7083deg
     };
 
     // Update homepage elements
@@ -1148,9 +1214,38 @@ document.addEventListener('DOMContentLoaded', async () => {
     });
   }
 
+  // Week ahead in one columnar call; refetched only once today leaves the table
+  let zmanimWeek = null;
+  async function loadZmanimWeek() {
+    const body = document.getElementById('zmanim-week-body');
+    if (!body) return;
+    const today = new Date().toLocaleDateString('en-CA');
+    if (!zmanimWeek || !zmanimWeek.dates.includes(today)) {
+      zmanimWeek = await fetchJSON('/api/zmanim/range?days=7');
+      if (!zmanimWeek) return;
+    }
+    const cols = ['alotHaShachar', 'sunrise', 'sofZmanShma', 'chatzot', 'plagHaMincha', 'sunset', 'tzeit7083deg'];
+    body.innerHTML = '';
+    zmanimWeek.dates.forEach((d, i) => {
+      const tr = document.createElement('tr');
+      if (d === today) tr.className = 'today';
+      const label = document.createElement('td');
+      label.textContent = new Date(d + 'T12:00:00').toLocaleDateString('en-US', { weekday: 'short', day: 'numeric', month: 'short' });
+      tr.appendChild(label);
+      for (const key of cols) {
+        const td = document.createElement('td');
+        td.textContent = formatTime((zmanimWeek.zmanim[key] || [])[i]);
+        tr.appendChild(td);
+      }
+      body.appendChild(tr);
+    });
+  }
+
   await loadZmanim();
+  loadZmanimWeek();
   // Refresh every hour
   setInterval(loadZmanim, 60 * 60 * 1000);
+  setInterval(loadZmanimWeek, 60 * 60 * 1000);
 
   // Initialize tab switching functionality for Zmanim page
   const tabButtons = document.querySelectorAll('.tab-button');
@@ -1202,7 +1297,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   }
 
   async function loadRedAlert() {
-    const data = await fetchJSON('/api/red-alert');
+    const data = await fetchJSON('/api/red-alert' + screenQuery('?'));
     if (!data) return;
 
     const statusDot = document.getElementById('status-dot');
@@ -1214,9 +1309,13 @@ document.addEventListener('DOMContentLoaded', async () => {
     // Update status indicator
     if (statusDot && statusText) {
       statusDot.className = `status-dot ${data.status}`;
+      statusText.title = '';
       
-      // Show last alert time instead of just status
-      if (data.last_alert_display) {
+      // Show last alert time instead of just status, unless the data itself is in doubt
+      if (data.status === 'unknown' && data.error) {
+        statusText.textContent = 'Status Unknown';
+        statusText.title = data.error;
+      } else if (data.last_alert_display) {
         statusText.textContent = `Last: ${data.last_alert_display}`;
       } else {
         switch (data.status) {
@@ -1241,6 +1340,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     // Update last updated time
     if (lastUpdated) {
       lastUpdated.textContent = formatLastUpdated(data.last_updated);
+      if (data.status === 'unknown' && data.error) lastUpdated.textContent += ` — ${data.error}`;
     }
 
     // Update alert details
@@ -1261,8 +1361,9 @@ document.addEventListener('DOMContentLoaded', async () => {
   }
 
   await loadRedAlert();
-  // Refresh every 30 seconds for Red Alerts
+  // Full refresh every 30 seconds (alerts age out), immediately when new alerts arrive
   setInterval(loadRedAlert, 30 * 1000);
+  watchRedAlerts(loadRedAlert);
 });
 
 document.addEventListener('DOMContentLoaded', initDashboardToggle);
@@ -86,8 +86,25 @@ function getWindDirectionArrow(degrees) {
   return `<span class="wind-direction-arrow" style="transform: rotate(${degrees}deg);">↓</span>`;
 }
 
+function setDailyFields(daily, i, prefix) {
+  document.getElementById(`${prefix}-high`).textContent = Math.round(daily.max[i]);
+  document.getElementById(`${prefix}-low`).textContent = Math.round(daily.min[i]);
+  document.getElementById(`${prefix}-icon`).textContent = getWeatherIcon(daily.code[i]);
+  document.getElementById(prefix === 'today' ? 'uv-index' : `${prefix}-uv-index`).textContent = daily.uv_index[i] || '--';
+  document.getElementById(prefix === 'today' ? 'precipitation' : `${prefix}-precipitation`).textContent = daily.precipitation[i] || '0';
+
+  // Format sunrise/sunset times
+  if (daily.sunrise[i]) {
+    document.getElementById(prefix === 'today' ? 'sunrise' : `${prefix}-sunrise`).textContent = formatTime(daily.sunrise[i]);
+  }
+  if (daily.sunset[i]) {
+    document.getElementById(prefix === 'today' ? 'sunset' : `${prefix}-sunset`).textContent = formatTime(daily.sunset[i]);
+  }
+}
+
 async function refreshWeather() {
-  const wx = await fetchJSON('/api/weather');
+  // Columnar: one array per variable, indexed in step with daily.time / hourly.time
+  const wx = await fetchJSON('/api/weather?format=columnar');
   if (!wx) return;
   
   // Current weather
@@ -102,62 +119,31 @@ async function refreshWeather() {
     document.getElementById('pressure').textContent = Math.round(wx.current.pressure);
   }
   
-  // Today's forecast
-  if (wx.today) {
-    document.getElementById('today-high').textContent = Math.round(wx.today.max);
-    document.getElementById('today-low').textContent = Math.round(wx.today.min);
-    document.getElementById('today-icon').textContent = getWeatherIcon(wx.today.code);
-    document.getElementById('uv-index').textContent = wx.today.uv_index || '--';
-    document.getElementById('precipitation').textContent = wx.today.precipitation || '0';
-    
-    // Format sunrise/sunset times
-    if (wx.today.sunrise) {
-      document.getElementById('sunrise').textContent = formatTime(wx.today.sunrise);
-    }
-    if (wx.today.sunset) {
-      document.getElementById('sunset').textContent = formatTime(wx.today.sunset);
-    }
-  }
-  
-  // Tomorrow's forecast
-  if (wx.forecast && wx.forecast.length > 1) {
-    const tomorrow = wx.forecast[1]; // Second day in forecast is tomorrow
-    document.getElementById('tomorrow-high').textContent = Math.round(tomorrow.max);
-    document.getElementById('tomorrow-low').textContent = Math.round(tomorrow.min);
-    document.getElementById('tomorrow-icon').textContent = getWeatherIcon(tomorrow.code);
-    document.getElementById('tomorrow-uv-index').textContent = tomorrow.uv_index || '--';
-    document.getElementById('tomorrow-precipitation').textContent = tomorrow.precipitation || '0';
-    
-    // Format sunrise/sunset times for tomorrow
-    if (tomorrow.sunrise) {
-      document.getElementById('tomorrow-sunrise').textContent = formatTime(tomorrow.sunrise);
-    }
-    if (tomorrow.sunset) {
-      document.getElementById('tomorrow-sunset').textContent = formatTime(tomorrow.sunset);
-    }
-  }
+  // Today's and tomorrow's forecast (the daily arrays start at today)
+  const daily = wx.daily;
+  if (daily && daily.time.length > 0) setDailyFields(daily, 0, 'today');
+  if (daily && daily.time.length > 1) setDailyFields(daily, 1, 'tomorrow');
   
   // 7-day forecast
   const forecastContainer = document.getElementById('forecast-container');
   forecastContainer.innerHTML = '';
-  if (wx.forecast && wx.forecast.length > 0) {
-    wx.forecast.forEach(day => {
+  if (daily) {
+    const days = Math.min(7, daily.time.length);
+    for (let i = 0; i < days; i++) {
       const dayElement = document.createElement('div');
       dayElement.className = 'forecast-day';
       
-      const date = new Date(day.date);
-      const today = new Date();
-      const isToday = date.getDate() === today.getDate() && date.getMonth() === today.getMonth();
+      const date = new Date(daily.time[i]);
       
       dayElement.innerHTML = `
-        <div class="forecast-day-header">${isToday ? 'Today' : date.toLocaleDateString([], { weekday: 'short' })}</div>
-        <div class="forecast-day-icon">${getWeatherIcon(day.code)}</div>
-        <div class="forecast-day-temp">${Math.round(day.max)}°</div>
-        <div class="forecast-day-temp" style="color: var(--muted);">${Math.round(day.min)}°</div>
+        <div class="forecast-day-header">${i === 0 ? 'Today' : date.toLocaleDateString([], { weekday: 'short' })}</div>
+        <div class="forecast-day-icon">${getWeatherIcon(daily.code[i])}</div>
+        <div class="forecast-day-temp">${Math.round(daily.max[i])}°</div>
+        <div class="forecast-day-temp" style="color: var(--muted);">${Math.round(daily.min[i])}°</div>
       `;
       
       forecastContainer.appendChild(dayElement);
-    });
+    }
   }
   
   // Store hourly data globally for toggle functionality
@@ -185,45 +171,40 @@ function displayHourlyForecast(day, containerId) {
   const hourlyContainer = document.getElementById(containerId);
   hourlyContainer.innerHTML = '';
   
-  if (!window.weatherData || !window.weatherData.hourly || window.weatherData.hourly.length === 0) {
+  const hourly = window.weatherData && window.weatherData.hourly;
+  if (!hourly || hourly.time.length === 0) {
     return;
   }
   
+  // Local ISO dates sort as strings, so the selected day is a contiguous run of indices
+  const daily = window.weatherData.daily;
+  const targetDate = daily && daily.time[day === 'today' ? 0 : 1];
+  if (!targetDate) return;
   const now = new Date();
-  const targetDate = day === 'today' ? now : new Date(now.getTime() + 24 * 60 * 60 * 1000);
-  const targetDay = targetDate.getDate();
-  const targetMonth = targetDate.getMonth();
-  
-  // Filter hourly data for the selected day
-  const dayHours = window.weatherData.hourly.filter(hour => {
-    const hourDate = new Date(hour.time);
-    return hourDate.getDate() === targetDay && hourDate.getMonth() === targetMonth;
-  });
   
-  // For today, show only future hours
-  const filteredHours = day === 'today' 
-    ? dayHours.filter(hour => new Date(hour.time) >= now)
-    : dayHours;
-  
-  // Limit to next 24 hours
-  const displayHours = filteredHours.slice(0, 24);
-  
-  displayHours.forEach(hour => {
+  let shown = 0;
+  for (let i = 0; i < hourly.time.length && shown < 24; i++) {
+    const time = hourly.time[i];
+    if (time.slice(0, 10) !== targetDate) continue;
+    // For today, show only future hours
+    if (day === 'today' && new Date(time) < now) continue;
+    shown++;
+    
     const hourElement = document.createElement('div');
-    const precipitationPercent = Math.round((hour.precipitation || 0) * 10); // Convert mm to rough percentage
+    const precipitationPercent = Math.round((hourly.precipitation[i] || 0) * 10); // Convert mm to rough percentage
     const isHighPrecipitation = precipitationPercent > 50;
     
     hourElement.className = `hourly-item${isHighPrecipitation ? ' high-precipitation' : ''}`;
     
     hourElement.innerHTML = `
-      <div class="hourly-time">${formatHour(hour.time)}</div>
-      <div class="hourly-icon">${getWeatherIcon(hour.code)}</div>
-      <div class="hourly-temp">${Math.round(hour.temp)}°</div>
+      <div class="hourly-time">${formatHour(time)}</div>
+      <div class="hourly-icon">${getWeatherIcon(hourly.code[i])}</div>
+      <div class="hourly-temp">${Math.round(hourly.temp[i])}°</div>
       <div class="hourly-precipitation${isHighPrecipitation ? ' high' : ''}">${precipitationPercent}%</div>
     `;
     
     hourlyContainer.appendChild(hourElement);
-  });
+  }
 }
 
 function switchWeatherTab(activeTab) {
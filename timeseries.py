@@ -0,0 +1,179 @@
+"""Local weather and air-quality history.
+
+Each location (a weather grid cell) gets a fixed-size ring buffer of samples
+stored in a memory-mapped file, so trends survive restarts without a history
+API. The file is a small header followed by ``capacity`` rows of doubles
+(timestamp plus one column per ``FIELDS`` entry, NaN where a refresh did not
+observe that field); the row area is used directly as a flat ``'d'``
+memoryview.
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+FIELDS = ("temp", "humidity", "wind_speed", "pressure", "pm25", "aqi")
+ROW = 1 + len(FIELDS)  # doubles per sample: timestamp, then FIELDS
+_HEADER = struct.Struct("<4sIII")  # magic, capacity, count, next slot
+_MAGIC = b"WXR1"
+NAN = float("nan")
+
+
+class RingBuffer:
+    """Fixed-capacity sample log for one location, backed by ``path``."""
+
+    def __init__(self, path: Path, capacity: int):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        size = _HEADER.size + capacity * ROW * 8
+        fresh = not self.path.exists() or self.path.stat().st_size != size
+        self._file = open(self.path, "r+b" if not fresh else "w+b")
+        if fresh:
+            self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        magic, cap, count, head = _HEADER.unpack_from(self._mm, 0)
+        if fresh or magic != _MAGIC or cap != capacity or count > capacity or head >= capacity:
+            # New file, or one written with another layout: start empty
+            count, head = 0, 0
+            _HEADER.pack_into(self._mm, 0, _MAGIC, capacity, count, head)
+        self.capacity = capacity
+        self._count = count
+        self._head = head
+        self._rows = memoryview(self._mm)[_HEADER.size:].cast("d")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, sample: dict, ts: float | None = None):
+        """Record the ``FIELDS`` present in ``sample``; missing or None values are stored as NaN."""
+        row = [time.time() if ts is None else ts]
+        for name in FIELDS:
+            v = sample.get(name)
+            try:
+                row.append(NAN if v is None else float(v))
+            except (TypeError, ValueError):
+                row.append(NAN)
+        with self._lock:
+            at = self._head * ROW
+            for j, v in enumerate(row):
+                self._rows[at + j] = v
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            _HEADER.pack_into(self._mm, 0, _MAGIC, self.capacity, self._count, self._head)
+
+    def rows_since(self, since: float) -> list[tuple]:
+        """Samples with timestamp >= ``since``, oldest first."""
+        with self._lock:
+            start = (self._head - self._count) % self.capacity
+            out = []
+            for k in range(self._count):
+                at = ((start + k) % self.capacity) * ROW
+                if self._rows[at] >= since:
+                    out.append(tuple(self._rows[at:at + ROW]))
+            return out
+
+    def summary(self, hours: float, now: float | None = None) -> dict:
+        """Min, max, first, last and delta (last - first) of each field over the last ``hours``."""
+        now = time.time() if now is None else now
+        rows = self.rows_since(now - hours * 3600)
+        fields = {}
+        for i, name in enumerate(FIELDS, start=1):
+            points = [(r[0], r[i]) for r in rows if not math.isnan(r[i])]
+            if not points:
+                continue
+            values = [v for _, v in points]
+            fields[name] = {
+                "min": min(values),
+                "max": max(values),
+                "first": values[0],
+                "last": values[-1],
+                "delta": round(values[-1] - values[0], 3),
+                "samples": len(values),
+                "since": datetime.fromtimestamp(points[0][0], timezone.utc).isoformat(),
+            }
+        return {"hours": hours, "samples": len(rows), "fields": fields}
+
+    def flush(self):
+        with self._lock:
+            self._mm.flush()
+
+    def close(self):
+        with self._lock:
+            self._rows.release()
+            self._mm.close()
+            self._file.close()
+
+
+class TrendStore:
+    """One ``RingBuffer`` per location key, created on first write.
+
+    At most ``max_open`` buffers stay mapped (least recently used ones are
+    closed) and at most ``max_files`` ring files are kept on disk; creating
+    one more deletes the file that was written to longest ago, so clients
+    asking about arbitrary coordinates cannot grow either without bound.
+    Buffers are only touched under the store's lock, so one is never closed
+    while another thread is using it.
+    """
+
+    def __init__(self, directory: Path, capacity: int, max_open: int = 32, max_files: int = 256):
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.max_open = max_open
+        self.max_files = max_files
+        self._buffers = OrderedDict()  # key -> RingBuffer, least recently used first
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key.replace(',', '_')}.ring"
+
+    def _make_room_on_disk(self):
+        files = sorted(self.directory.glob("*.ring"), key=lambda p: p.stat().st_mtime)
+        open_paths = {buf.path for buf in self._buffers.values()}
+        for path in files[:max(0, len(files) - self.max_files + 1)]:
+            if path not in open_paths:
+                path.unlink(missing_ok=True)
+
+    def _get_locked(self, key: str, create: bool) -> RingBuffer | None:
+        buf = self._buffers.get(key)
+        if buf is not None:
+            self._buffers.move_to_end(key)
+            return buf
+        path = self._path(key)
+        if not path.exists():
+            if not create:
+                return None
+            self._make_room_on_disk()
+        buf = self._buffers[key] = RingBuffer(path, self.capacity)
+        while len(self._buffers) > self.max_open:
+            _, old = self._buffers.popitem(last=False)
+            old.close()
+        return buf
+
+    def record(self, key: str, sample: dict):
+        try:
+            with self._lock:
+                buf = self._get_locked(key, create=True)
+                buf.append(sample)
+                os.utime(buf.path)  # mmap writes do not reliably bump mtime; it orders eviction
+        except Exception as e:
+            print(f"Trend record failed for {key}: {e}")
+
+    def summary(self, key: str, hours: float) -> dict:
+        """``RingBuffer.summary`` for ``key``; empty when nothing was recorded there."""
+        with self._lock:
+            buf = self._get_locked(key, create=False)
+            if buf is None:
+                return {"hours": hours, "samples": 0, "fields": {}}
+            return buf.summary(hours)
+
+    def flush(self):
+        with self._lock:
+            for buf in self._buffers.values():
+                buf.flush()
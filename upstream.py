@@ -0,0 +1,126 @@
+"""Conditional GET bookkeeping for polled upstreams.
+
+For every URL the last ``ETag``/``Last-Modified`` validators are kept next to
+the value parsed from that response. The next request sends them back as
+``If-None-Match``/``If-Modified-Since``; on a 304 the caller reuses the stored
+value without downloading or parsing the body again, and the size of the body
+that was not re-sent is counted as saved.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+
+@dataclass(slots=True)
+class _Entry:
+    etag: str | None
+    last_modified: str | None
+    size: int
+    value: object
+
+
+@dataclass(slots=True)
+class UpstreamStats:
+    requests: int = 0
+    not_modified: int = 0
+    bytes_received: int = 0
+    bytes_saved: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "bytes_received": self.bytes_received,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+class ConditionalGet:
+    """Per-URL validators and last values (LRU-bounded), with per-upstream counters.
+
+    Counters are grouped by ``name`` when given, else by the URL's host.
+    """
+
+    def __init__(self, max_urls: int = 256):
+        self.max_urls = max_urls
+        self._entries = OrderedDict()  # url -> _Entry
+        self._stats = {}  # upstream name -> UpstreamStats
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _name(url: str, name: str | None) -> str:
+        return name or urlsplit(url).netloc or url
+
+    def headers(self, url: str) -> dict:
+        """Validator headers to send for ``url`` (empty until a response carried any)."""
+        with self._lock:
+            entry = self._entries.get(url)
+        out = {}
+        if entry is not None:
+            if entry.etag:
+                out["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                out["If-Modified-Since"] = entry.last_modified
+        return out
+
+    def not_modified(self, url: str, name: str | None = None):
+        """Record a 304 for ``url`` and return the value stored with its validators."""
+        with self._lock:
+            entry = self._entries.get(url)
+            stats = self._stats.setdefault(self._name(url, name), UpstreamStats())
+            stats.requests += 1
+            if entry is None:
+                return None
+            self._entries.move_to_end(url)
+            stats.not_modified += 1
+            stats.bytes_saved += entry.size
+            return entry.value
+
+    def update(self, url: str, response_headers, value, size: int, name: str | None = None, keep: bool = True,
+               received: int | None = None):
+        """Record a full response for ``url`` and remember ``value`` if it carried validators.
+
+        ``size`` is the whole body's size (what a later 304 saves); ``received``, if
+        given, is how much of it was actually read. With ``keep`` False (``value`` does not represent the whole response) the
+        response is only counted, and any validators held for ``url`` are dropped.
+        """
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        with self._lock:
+            stats = self._stats.setdefault(self._name(url, name), UpstreamStats())
+            stats.requests += 1
+            stats.bytes_received += size if received is None else received
+            if not keep or (not etag and not last_modified):
+                self._entries.pop(url, None)
+                return
+            self._entries[url] = _Entry(etag, last_modified, size, value)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_urls:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: s.as_dict() for name, s in self._stats.items()}
+
+
+def conditional_get(get, url: str, conditional: ConditionalGet, parse, name: str | None = None, **kwargs):
+    """``get(url)`` with validators; returns ``(value, modified)``.
+
+    ``parse(response)`` turns a 200 into the value to keep. A 304 returns the
+    kept value with ``modified`` False. Other statuses raise via
+    ``raise_for_status``.
+    """
+    base = kwargs.pop("headers", None) or {}
+    r = get(url, headers={**base, **conditional.headers(url)}, **kwargs)
+    if r.status_code == 304:
+        value = conditional.not_modified(url, name)
+        if value is not None:
+            return value, False
+        # The validators were evicted in the meantime: fetch unconditionally
+        r = get(url, headers=base, **kwargs)
+    r.raise_for_status()
+    value = parse(r)
+    conditional.update(url, r.headers, value, len(r.content), name)
+    return value, True
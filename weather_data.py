@@ -0,0 +1,156 @@
+"""Columnar handling of open-meteo forecasts.
+
+open-meteo already answers in columns (one array per variable, aligned with
+a ``time`` array). ``Forecast`` keeps them that way: numeric variables
+become ``array('d')`` with nulls as NaN, and the hour/day time stamps stay
+as open-meteo's local ISO strings, which sort lexicographically, so the
+current hour is a ``bisect`` on strings with no timestamp parsing. Windows
+are memoryview slices; values are only copied once, into the JSON lists.
+"""
+
+import bisect
+import math
+from array import array
+from datetime import datetime, timedelta, timezone
+
+NAN = float("nan")
+
+# Payload name -> open-meteo variable
+CURRENT_FIELDS = {
+    "temp": "temperature_2m",
+    "feels_like": "apparent_temperature",
+    "humidity": "relative_humidity_2m",
+    "code": "weather_code",
+    "wind_speed": "wind_speed_10m",
+    "wind_direction": "wind_direction_10m",
+    "pressure": "pressure_msl",
+}
+DAILY_FIELDS = {
+    "max": "temperature_2m_max",
+    "min": "temperature_2m_min",
+    "code": "weather_code",
+    "precipitation": "precipitation_sum",
+    "wind_speed_max": "wind_speed_10m_max",
+    "uv_index": "uv_index_max",
+}
+DAILY_TEXT_FIELDS = {"sunrise": "sunrise", "sunset": "sunset"}
+HOURLY_FIELDS = {
+    "temp": "temperature_2m",
+    "feels_like": "apparent_temperature",
+    "humidity": "relative_humidity_2m",
+    "code": "weather_code",
+    "wind_speed": "wind_speed_10m",
+    "wind_direction": "wind_direction_10m",
+    "precipitation": "precipitation",
+}
+# Fields the legacy row payload has always carried
+_LEGACY_HOURLY = ("temp", "feels_like", "humidity", "code", "wind_speed", "precipitation")
+_LEGACY_DAILY = ("max", "min", "code", "precipitation", "wind_speed_max")
+
+
+def to_column(values, n: int) -> array:
+    """open-meteo value list -> ``array('d')`` of length ``n``; nulls and gaps become NaN."""
+    values = (values or [])[:n]
+    try:
+        col = array("d", values)
+    except TypeError:
+        col = array("d", [NAN if v is None else v for v in values])
+    if len(col) < n:
+        col.extend([NAN] * (n - len(col)))
+    return col
+
+
+def to_json(view) -> list:
+    """Column slice -> JSON list, NaN back to None and whole numbers (codes, %) as ints."""
+    return [None if v != v else (int(v) if v.is_integer() else v) for v in view]
+
+
+def _scalar(v):
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return None
+    return int(v) if isinstance(v, float) and v.is_integer() else v
+
+
+class Forecast:
+    """One open-meteo response held as columns."""
+
+    __slots__ = ("current", "utc_offset", "daily_time", "daily", "daily_text", "hourly_time", "hourly")
+
+    def __init__(self, current: dict, utc_offset: int, daily_time: list, daily: dict, daily_text: dict,
+                 hourly_time: list, hourly: dict):
+        self.current = current
+        self.utc_offset = utc_offset
+        self.daily_time = daily_time
+        self.daily = daily
+        self.daily_text = daily_text
+        self.hourly_time = hourly_time
+        self.hourly = hourly
+
+    @classmethod
+    def from_open_meteo(cls, data: dict) -> "Forecast":
+        current = data.get("current") or {}
+        daily = data.get("daily") or {}
+        hourly = data.get("hourly") or {}
+        daily_time = daily.get("time") or []
+        hourly_time = hourly.get("time") or []
+        nd, nh = len(daily_time), len(hourly_time)
+        return cls(
+            current={name: current.get(src) for name, src in CURRENT_FIELDS.items()},
+            utc_offset=int(data.get("utc_offset_seconds") or 0),
+            daily_time=daily_time,
+            daily={name: to_column(daily.get(src), nd) for name, src in DAILY_FIELDS.items()},
+            daily_text={name: ((daily.get(src) or []) + [None] * nd)[:nd] for name, src in DAILY_TEXT_FIELDS.items()},
+            hourly_time=hourly_time,
+            hourly={name: to_column(hourly.get(src), nh) for name, src in HOURLY_FIELDS.items()},
+        )
+
+    def hour_index(self, now: datetime) -> int:
+        """Index of the hour containing ``now`` (binary search on the local time strings)."""
+        local = now.astimezone(timezone.utc) + timedelta(seconds=self.utc_offset)
+        key = local.strftime("%Y-%m-%dT%H:%M")
+        return max(0, bisect.bisect_right(self.hourly_time, key) - 1)
+
+    def day_index(self, now: datetime) -> int:
+        local = now.astimezone(timezone.utc) + timedelta(seconds=self.utc_offset)
+        return max(0, bisect.bisect_right(self.daily_time, local.strftime("%Y-%m-%d")) - 1)
+
+    def _daily_row(self, i: int, fields) -> dict:
+        return {name: _scalar(self.daily[name][i]) for name in fields}
+
+    def payload(self, now: datetime, hours: int = 24) -> dict:
+        """The row-oriented shape ``/api/weather`` has always returned."""
+        today = None
+        forecast = []
+        d0 = self.day_index(now)
+        if d0 < len(self.daily_time):
+            today = self._daily_row(d0, ("max", "min", "uv_index", "precipitation", "wind_speed_max", "code"))
+            today.update({name: col[d0] for name, col in self.daily_text.items()})
+        for i in range(d0, min(d0 + 7, len(self.daily_time))):
+            forecast.append({"date": self.daily_time[i], **self._daily_row(i, _LEGACY_DAILY)})
+
+        h0 = self.hour_index(now)
+        h1 = min(h0 + hours, len(self.hourly_time))
+        cols = {name: to_json(memoryview(self.hourly[name])[h0:h1]) for name in _LEGACY_HOURLY}
+        hourly = [
+            {"time": t, **{name: cols[name][k] for name in _LEGACY_HOURLY}}
+            for k, t in enumerate(self.hourly_time[h0:h1])
+        ]
+        return {"current": self.current, "today": today, "forecast": forecast, "hourly": hourly}
+
+    def columnar(self, now: datetime, hours: int = 48) -> dict:
+        """Arrays as open-meteo sends them, trimmed to today onwards and ``hours`` from now."""
+        d0 = self.day_index(now)
+        h0 = self.hour_index(now)
+        h1 = min(h0 + hours, len(self.hourly_time))
+        daily = {"time": self.daily_time[d0:]}
+        daily.update({name: to_json(memoryview(col)[d0:]) for name, col in self.daily.items()})
+        daily.update({name: col[d0:] for name, col in self.daily_text.items()})
+        hourly = {"time": self.hourly_time[h0:h1]}
+        hourly.update({name: to_json(memoryview(col)[h0:h1]) for name, col in self.hourly.items()})
+        return {
+            "format": "columnar",
+            "current": self.current,
+            "utc_offset_seconds": self.utc_offset,
+            "daily": daily,
+            "hourly": hourly,
+        }
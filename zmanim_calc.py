@@ -0,0 +1,143 @@
+"""Local halachic times (zmanim) from a NOAA solar-position model.
+
+Replaces hebcal's ``/zmanim`` endpoint. Output keys and definitions follow
+hebcal: sea-level sunrise/sunset, alot hashachar at 16.1°, misheyakir at
+11.5°/10.2°, GRA hours from sunrise to sunset, MGA hours from 72 minutes
+before sunrise to 72 minutes after sunset, and tzeit at 7.083°/8.5° or a
+fixed number of minutes. Times are rounded to the nearest minute.
+
+``zmanim_for_dates`` works on whole date arrays and returns columns, so a
+month or a year is computed in one call with the per-day solar terms shared
+across every zman of that day.
+"""
+
+import math
+from datetime import date, datetime, timedelta, timezone
+
+# Zenith angles (degrees from vertical) for the solar events we need
+SUNRISE_ZENITH = 90.833  # upper limb with standard refraction
+ZENITHS = {
+    "alotHaShachar": 90 + 16.1,
+    "misheyakir": 90 + 11.5,
+    "misheyakirMachmir": 90 + 10.2,
+    "dawn": 96.0,
+    "dusk": 96.0,
+    "tzeit7083deg": 90 + 7.083,
+    "tzeit85deg": 90 + 8.5,
+}
+
+# Ordered like hebcal's response
+ZMANIM_KEYS = [
+    "chatzotNight", "alotHaShachar", "misheyakir", "misheyakirMachmir", "dawn", "sunrise",
+    "sofZmanShmaMGA", "sofZmanShma", "sofZmanTfillaMGA", "sofZmanTfilla", "chatzot",
+    "minchaGedola", "minchaKetana", "plagHaMincha", "sunset", "dusk",
+    "tzeit7083deg", "tzeit85deg", "tzeit42min", "tzeit50min", "tzeit72min",
+]
+
+_J2000 = 2451545.0
+_UNIX_EPOCH_JD = 2440587.5
+
+
+def _solar_terms(t: float) -> tuple[float, float]:
+    """Equation of time (minutes) and declination (radians) at Julian century ``t``."""
+    l0 = math.radians((280.46646 + t * (36000.76983 + 0.0003032 * t)) % 360)
+    m = math.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    e = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    c = (math.sin(m) * (1.914602 - t * (0.004817 + 0.000014 * t))
+         + math.sin(2 * m) * (0.019993 - 0.000101 * t)
+         + math.sin(3 * m) * 0.000289)
+    omega = math.radians(125.04 - 1934.136 * t)
+    app_long = math.radians(math.degrees(l0) + c - 0.00569 - 0.00478 * math.sin(omega))
+    eps0 = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+    eps = math.radians(eps0 + 0.00256 * math.cos(omega))
+    decl = math.asin(math.sin(eps) * math.sin(app_long))
+    y = math.tan(eps / 2) ** 2
+    eq = 4 * math.degrees(
+        y * math.sin(2 * l0) - 2 * e * math.sin(m) + 4 * e * y * math.sin(m) * math.cos(2 * l0)
+        - 0.5 * y * y * math.sin(4 * l0) - 1.25 * e * e * math.sin(2 * m)
+    )
+    return eq, decl
+
+
+def _event_minutes(jd0: float, noon_terms, lat: float, lon: float, zenith: float, rising: bool) -> float | None:
+    """UTC minutes after 0h of the day for the sun crossing ``zenith``; None if it never does."""
+    eq, decl = noon_terms
+    t_min = 720 - 4 * lon - eq
+    lat_r = math.radians(lat)
+    for _ in range(2):
+        cos_ha = (math.cos(math.radians(zenith)) - math.sin(lat_r) * math.sin(decl)) / (math.cos(lat_r) * math.cos(decl))
+        if cos_ha < -1 or cos_ha > 1:
+            return None
+        ha = math.degrees(math.acos(cos_ha))
+        t_min = 720 - 4 * (lon + (-ha if not rising else ha)) - eq
+        # Refine with the solar terms at the event itself
+        eq, decl = _solar_terms((jd0 + t_min / 1440 - _J2000) / 36525)
+    return t_min
+
+
+def _to_local(jd0: float, minutes: float | None, tzinfo) -> datetime | None:
+    if minutes is None:
+        return None
+    ts = (jd0 - _UNIX_EPOCH_JD) * 86400 + minutes * 60
+    ts = round(ts / 60) * 60  # nearest minute, like hebcal
+    return datetime.fromtimestamp(ts, tz=timezone.utc).astimezone(tzinfo)
+
+
+def zmanim_for_dates(days, lat: float, lon: float, tzinfo) -> dict[str, list]:
+    """Columnar zmanim for every date in ``days``: ``{key: [datetime | None, ...]}``.
+
+    ``lon`` is degrees east. Each column is aligned with ``days``.
+    """
+    cols = {k: [] for k in ZMANIM_KEYS}
+    for d in days:
+        jd0 = d.toordinal() + 1721424.5
+        noon_terms = _solar_terms((jd0 + 0.5 - lon / 360 - _J2000) / 36525)
+
+        def ev(zenith, rising):
+            return _event_minutes(jd0, noon_terms, lat, lon, zenith, rising)
+
+        rise = ev(SUNRISE_ZENITH, True)
+        sset = ev(SUNRISE_ZENITH, False)
+        row = {
+            "alotHaShachar": ev(ZENITHS["alotHaShachar"], True),
+            "misheyakir": ev(ZENITHS["misheyakir"], True),
+            "misheyakirMachmir": ev(ZENITHS["misheyakirMachmir"], True),
+            "dawn": ev(ZENITHS["dawn"], True),
+            "sunrise": rise,
+            "sunset": sset,
+            "dusk": ev(ZENITHS["dusk"], False),
+            "tzeit7083deg": ev(ZENITHS["tzeit7083deg"], False),
+            "tzeit85deg": ev(ZENITHS["tzeit85deg"], False),
+        }
+        if rise is not None and sset is not None:
+            gra = (sset - rise) / 12
+            mga_start = rise - 72
+            mga = ((sset + 72) - mga_start) / 12
+            row.update({
+                "sofZmanShmaMGA": mga_start + 3 * mga,
+                "sofZmanShma": rise + 3 * gra,
+                "sofZmanTfillaMGA": mga_start + 4 * mga,
+                "sofZmanTfilla": rise + 4 * gra,
+                "chatzot": rise + 6 * gra,
+                "chatzotNight": rise + 6 * gra - 720,
+                "minchaGedola": rise + 6.5 * gra,
+                "minchaKetana": rise + 9.5 * gra,
+                "plagHaMincha": rise + 10.75 * gra,
+                "tzeit42min": sset + 42,
+                "tzeit50min": sset + 50,
+                "tzeit72min": sset + 72,
+            })
+        for k in ZMANIM_KEYS:
+            cols[k].append(_to_local(jd0, row.get(k), tzinfo))
+    return cols
+
+
+def zmanim_for_date(d: date, lat: float, lon: float, tzinfo) -> dict[str, str]:
+    """Single-day zmanim as ISO strings, in the shape of hebcal's ``times`` object."""
+    cols = zmanim_for_dates([d], lat, lon, tzinfo)
+    return {k: v[0].isoformat() for k, v in cols.items() if v[0] is not None}
+
+
+def date_range(start: date, end: date) -> list[date]:
+    """Inclusive list of dates from ``start`` to ``end``."""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]